@@ -0,0 +1,129 @@
+"""
+Async variants of the read tools
+
+django-mcp-server runs every tool through ``sync_to_async`` in thread
+sensitive mode, so all tool calls of a process share a single thread and
+one slow page tree holds up every other session. The read tools don't need
+that thread: they run in a bounded pool of worker threads instead, each
+with its own database connection, so one process can serve many sessions
+at once. Write tools keep the shared thread.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+
+from .conf import get_mcp_setting
+
+try:
+    # Internals of django-mcp-server, which pyproject.toml pins to the
+    # versions they were tested with
+    from mcp_server.djangomcp import _SyncToolCallWrapper, django_request_ctx
+except ImportError as e:
+    raise ImproperlyConfigured(
+        f'This version of django-mcp-server is not supported, djangocms_mcp needs 0.5.x: {e}'
+    ) from e
+
+
+# Attributes of the tool functions django-mcp-server sets up that
+# PooledToolCaller uses
+TOOL_CALLER_ATTRIBUTES = ('class_', 'method_name', 'context_kwarg', 'forward_context_kwarg')
+
+# Tools that only read and can run in the worker pool
+READ_TOOLS = (
+    'get_page_tree',
+    'get_page_detail',
+    'get_pages_detail',
+    'get_page_versions',
+    'search_pages',
+    'search_content',
+    'list_templates',
+    'list_plugin_types',
+    'get_languages',
+    'get_version_states',
+    'get_server_metrics',
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the thread pool the read tools run in, sized by ``ASYNC_WORKERS``"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_mcp_setting('ASYNC_WORKERS'), thread_name_prefix='djangocms-mcp',
+            )
+    return _executor
+
+
+def _call_with_connection_cleanup(func, *args, **kwargs):
+    # Worker threads live on, so their connections are handled like those
+    # of a request: dropped when they are unusable or too old
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """Run a synchronous function in the worker pool and return its result"""
+    call = sync_to_async(_call_with_connection_cleanup, thread_sensitive=False, executor=get_executor())
+    return await call(func, *args, **kwargs)
+
+
+class AsyncReadTools:
+    """Async variants of the read tools of a toolset
+
+    ``await AsyncReadTools(tools).get_page_tree(...)`` runs
+    ``tools.get_page_tree(...)`` in the worker pool.
+    """
+
+    def __init__(self, tools):
+        self.tools = tools
+
+    def __getattr__(self, name):
+        if name not in READ_TOOLS:
+            raise AttributeError(f'{name} is not a read tool')
+        method = getattr(self.tools, name)
+
+        async def call(*args, **kwargs):
+            return await run_in_pool(method, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+
+class PooledToolCaller:
+    """MCP tool function running a read tool in the worker pool
+
+    Replaces the function django-mcp-server sets up for each tool of a
+    toolset, creating the toolset instance for the call the same way.
+    """
+
+    def __init__(self, caller):
+        missing = [name for name in TOOL_CALLER_ATTRIBUTES if not hasattr(caller, name)]
+        if missing:
+            raise ImproperlyConfigured(
+                f'This version of django-mcp-server is not supported, its tool functions have no '
+                f'{", ".join(missing)}'
+            )
+        self.caller = caller
+
+    async def __call__(self, *args, **kwargs):
+        caller = self.caller
+        instance = caller.class_(
+            context=kwargs[caller.context_kwarg],
+            request=django_request_ctx.get(SimpleNamespace()),
+        )
+        if not caller.forward_context_kwarg:
+            del kwargs[caller.context_kwarg]
+        method = _SyncToolCallWrapper(getattr(instance, caller.method_name))
+        return await run_in_pool(method, *args, **kwargs)
@@ -14,7 +14,37 @@ class DjangoCmsMcpConfig(AppConfig):
         Called when the app is ready.
         This is where we can register any signals or perform other setup.
         """
-        pass
+        from django.db.models.signals import post_delete, post_migrate, post_save
+        from cms.models import Page, PageContent, PageUrl
+        from cms.signals import post_obj_operation
+
+        from . import checks  # noqa: F401
+        from .cache import invalidate_for_instance, invalidate_for_operation
+        from .indexes import setup_version_state_index
+        from .search import get_plugin_models, setup_search_index, update_for_instance, update_for_plugin
+
+        senders = [Page, PageContent, PageUrl]
+        try:
+            from djangocms_versioning.models import Version
+            senders.append(Version)
+        except ImportError:
+            pass
+
+        for sender in senders:
+            post_save.connect(invalidate_for_instance, sender=sender, dispatch_uid=f'djangocms_mcp_cache_save_{sender.__name__}')
+            post_delete.connect(invalidate_for_instance, sender=sender, dispatch_uid=f'djangocms_mcp_cache_delete_{sender.__name__}')
+        post_obj_operation.connect(invalidate_for_operation, dispatch_uid='djangocms_mcp_cache_operation')
+
+        # Keep the page search index up to date
+        for sender in senders[1:]:
+            post_save.connect(update_for_instance, sender=sender, dispatch_uid=f'djangocms_mcp_search_save_{sender.__name__}')
+            post_delete.connect(update_for_instance, sender=sender, dispatch_uid=f'djangocms_mcp_search_delete_{sender.__name__}')
+        # Plugins are saved as instances of their own models
+        for model in get_plugin_models():
+            post_save.connect(update_for_plugin, sender=model, dispatch_uid=f'djangocms_mcp_search_save_{model._meta.label}')
+            post_delete.connect(update_for_plugin, sender=model, dispatch_uid=f'djangocms_mcp_search_delete_{model._meta.label}')
+        post_migrate.connect(setup_search_index, sender=self, dispatch_uid='djangocms_mcp_search_setup')
+        post_migrate.connect(setup_version_state_index, sender=self, dispatch_uid='djangocms_mcp_version_state_index')
 
 
 def get_app_config(app_label):
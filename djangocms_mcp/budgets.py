@@ -0,0 +1,85 @@
+"""
+Per-tool query budgets
+
+``QUERY_BUDGETS`` maps tool names to the number of database queries a call
+may run. A call over its budget is handled according to
+``QUERY_BUDGET_MODE``: ``log`` logs a warning, ``warn`` also adds a
+``query_budget_warning`` to the response and ``abort`` stops the call at the
+first query over the budget and returns an error instead. In that mode
+calls run in a transaction, so what an aborted call wrote is rolled back
+even when the tool handles errors itself.
+"""
+import logging
+from contextlib import ExitStack
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+
+from .conf import get_mcp_setting
+
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODES = ('log', 'warn', 'abort')
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised by a query over the budget of a call in ``abort`` mode"""
+
+
+class QueryBudget:
+    """Database execute wrapper counting the queries of a call against a budget"""
+
+    def __init__(self, name, budget, abort=False):
+        self.name = name
+        self.budget = budget
+        self.abort = abort
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        if self.abort and self.queries > self.budget:
+            raise QueryBudgetExceeded(self.get_message())
+        return execute(sql, params, many, context)
+
+    def get_message(self):
+        if self.abort:
+            return f'{self.name} exceeded its budget of {self.budget} queries'
+        return f'{self.name} ran {self.queries} queries, over its budget of {self.budget}'
+
+
+def get_query_budget(name):
+    """Return the query budget of tool ``name``, ``None`` when it has none"""
+    return (get_mcp_setting('QUERY_BUDGETS') or {}).get(name)
+
+
+def enforce_query_budget(name, func, *args, **kwargs):
+    """Call tool ``name`` through ``func`` within its query budget"""
+    budget = get_query_budget(name)
+    if budget is None:
+        return func(*args, **kwargs)
+    mode = get_mcp_setting('QUERY_BUDGET_MODE')
+    if mode not in QUERY_BUDGET_MODES:
+        raise ImproperlyConfigured(f'QUERY_BUDGET_MODE must be one of {", ".join(QUERY_BUDGET_MODES)}')
+
+    counter = QueryBudget(name, budget, abort=mode == 'abort')
+    try:
+        with ExitStack() as stack:
+            if counter.abort:
+                stack.enter_context(transaction.atomic())
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            result = func(*args, **kwargs)
+            if counter.abort and counter.queries > budget:
+                # The tool caught the error of the query over the budget
+                raise QueryBudgetExceeded(counter.get_message())
+    except QueryBudgetExceeded as e:
+        logger.error(str(e))
+        return {'error': str(e)}
+
+    if counter.queries > budget:
+        message = counter.get_message()
+        logger.warning(message)
+        if mode == 'warn' and isinstance(result, dict):
+            result = {**result, 'query_budget_warning': message}
+    return result
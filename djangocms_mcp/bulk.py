@@ -0,0 +1,326 @@
+"""
+Batched writes behind the bulk MCP tools
+
+Creating objects one by one through ``cms.api`` costs a handful of queries
+and a transaction per object. The functions here build whole batches in
+memory and insert them with ``bulk_create``, one query per model (and per
+tree level for the tree nodes). ``bulk_create`` sends no save signals, so
+the cache and the search index are updated explicitly.
+"""
+from cms.models import CMSPlugin, Page, PageContent, PageUrl, Placeholder, TreeNode
+from cms.constants import VISIBILITY_ALL, X_FRAME_OPTIONS_INHERIT
+from cms.utils.permissions import get_clean_username
+from cms.utils.placeholder import get_placeholders
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .cache import invalidate
+from .search import schedule_page_update
+
+
+# Keys a page spec of create_page_tree may have
+PAGE_SPEC_KEYS = ('title', 'slug', 'template', 'meta_description', 'ref', 'children')
+
+# Paths checked for existing urls per query: each one adds a condition to an
+# OR, which SQLite limits to an expression tree depth of 1000
+PATH_LOOKUP_BATCH_SIZE = 250
+
+
+def _bulk_create(manager, objs):
+    """``bulk_create`` objects and return them with their primary keys set
+
+    MySQL, unlike PostgreSQL, MariaDB and SQLite, doesn't return the rows
+    of a bulk insert, so there the objects are inserted one at a time.
+    ``save_base`` skips the ``save`` of the model as ``bulk_create`` does,
+    but sends the save signals.
+    """
+    using = router.db_for_write(manager.model)
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        return manager.bulk_create(objs)
+    for obj in objs:
+        obj.save_base(using=using, force_insert=True)
+    return objs
+
+
+def iter_page_specs(specs, depth=0):
+    """Iterate over ``(spec, depth)`` of nested page specs in tree order"""
+    for spec in specs:
+        yield spec, depth
+        yield from iter_page_specs(spec.get('children') or [], depth + 1)
+
+
+def _get_available_paths(site_id, language, paths, taken):
+    """Return ``paths`` with a ``-2``, ``-3``... suffix where they are in use
+
+    Existing urls are read with one query per ``PATH_LOOKUP_BATCH_SIZE``
+    paths. ``taken`` holds the paths given out earlier in the batch and is
+    updated.
+    """
+    unique_paths = list(dict.fromkeys(paths))
+    existing = set()
+    for start in range(0, len(unique_paths), PATH_LOOKUP_BATCH_SIZE):
+        batch = unique_paths[start:start + PATH_LOOKUP_BATCH_SIZE]
+        used = Q(path__in=batch)
+        for path in batch:
+            used |= Q(path__startswith=f'{path}-')
+        existing.update(PageUrl.objects.filter(
+            used, page__node__site_id=site_id, language=language,
+        ).values_list('path', flat=True))
+
+    available = []
+    for path in paths:
+        candidate, suffix = path, 2
+        while candidate in existing or candidate in taken:
+            candidate = f'{path}-{suffix}'
+            suffix += 1
+        taken.add(candidate)
+        available.append(candidate)
+    return available
+
+
+def _get_last_step(path):
+    return TreeNode._str2int(path[-TreeNode.steplen:])
+
+
+def _get_next_steps(parents):
+    """Return the next free treebeard step below each parent node
+
+    ``parents`` maps node ids, or ``None`` for the root, to whether the node
+    was created in this batch and so has no children yet.
+    """
+    steps = {}
+    existing = [node_id for node_id, is_new in parents.items() if not is_new and node_id is not None]
+    if existing:
+        last_paths = TreeNode.objects.filter(parent_id__in=existing).values('parent_id').annotate(
+            last_path=Max('path'),
+        )
+        steps.update({row['parent_id']: _get_last_step(row['last_path']) + 1 for row in last_paths})
+    if None in parents:
+        last_root = TreeNode.get_last_root_node()
+        steps[None] = _get_last_step(last_root.path) + 1 if last_root else 1
+    return {node_id: steps.get(node_id, 1) for node_id in parents}
+
+
+@transaction.atomic
+def create_page_tree(specs, language, user, site_id, parent=None, default_template=None, versioning=False):
+    """Create the pages described by nested ``specs`` and return them in tree order
+
+    Each spec has a ``title`` and optionally a ``slug``, a ``template``,
+    which children inherit, a ``meta_description`` and ``children``. Top
+    level pages are added as the last children of ``parent`` or as roots of
+    the site. Returns ``(spec, page, parent page id, slug, content,
+    version)`` tuples, ``version`` being ``None`` without ``versioning``.
+    """
+    username = get_clean_username(user) if user else 'python-api'
+    parent_base = ''
+    if parent is not None and not parent.is_home:
+        parent_base = parent.get_path(language, fallback=True) or ''
+
+    # Tree nodes are inserted a level at a time so that the ids of the
+    # parents are known; the level items are (spec, parent node, is new
+    # parent, parent url path, template).
+    level = [
+        (spec, parent.node if parent is not None else None, False, parent_base, default_template)
+        for spec in specs
+    ]
+    created = []
+    taken_paths = set()
+    while level:
+        parents = {}
+        for _spec, parent_node, is_new, _base, _template in level:
+            parents[parent_node.pk if parent_node else None] = is_new
+        steps = _get_next_steps(parents)
+
+        nodes = []
+        for spec, parent_node, _is_new, _base, _template in level:
+            key = parent_node.pk if parent_node else None
+            depth = parent_node.depth + 1 if parent_node else 1
+            nodes.append(TreeNode(
+                site_id=site_id,
+                parent=parent_node,
+                depth=depth,
+                path=TreeNode._get_path(parent_node.path if parent_node else None, depth, steps[key]),
+                numchild=len(spec.get('children') or []),
+            ))
+            steps[key] += 1
+        _bulk_create(TreeNode.objects, nodes)
+
+        paths = _get_available_paths(site_id, language, [
+            f'{base}/{slugify(spec.get("slug") or spec["title"])}'.lstrip('/')
+            for spec, _parent_node, _is_new, base, _template in level
+        ], taken_paths)
+
+        next_level = []
+        for (spec, _parent_node, _is_new, _base, template), node, path in zip(level, nodes, paths):
+            template = spec.get('template') or template
+            created.append((spec, node, path, template))
+            next_level.extend(
+                (child, node, True, path, template) for child in spec.get('children') or []
+            )
+        level = next_level
+
+    created.sort(key=lambda item: item[1].path)
+    if parent is not None and specs:
+        TreeNode.objects.filter(pk=parent.node_id).update(numchild=F('numchild') + len(specs))
+
+    pages = _bulk_create(Page.objects, [
+        Page(node=node, created_by=username, changed_by=username, languages=language)
+        for _spec, node, _path, _template in created
+    ])
+    PageUrl.objects.bulk_create([
+        PageUrl(page=page, language=language, path=path, slug=path.rpartition('/')[2], managed=True)
+        for page, (_spec, _node, path, _template) in zip(pages, created)
+    ])
+    contents = _bulk_create(PageContent.admin_manager, [
+        PageContent(
+            page=page,
+            language=language,
+            title=spec['title'],
+            meta_description=spec.get('meta_description'),
+            template=template,
+            created_by=username,
+            changed_by=username,
+            in_navigation=False,
+            soft_root=False,
+            limit_visibility_in_menu=VISIBILITY_ALL,
+            xframe_options=X_FRAME_OPTIONS_INHERIT,
+        )
+        for page, (spec, _node, _path, template) in zip(pages, created)
+    ])
+
+    content_type = ContentType.objects.get_for_model(PageContent)
+    slots = {}
+    placeholders = []
+    for content in contents:
+        if content.template not in slots:
+            slots[content.template] = [placeholder.slot for placeholder in get_placeholders(content.template)]
+        placeholders.extend(
+            Placeholder(slot=slot, content_type=content_type, object_id=content.pk)
+            for slot in slots[content.template]
+        )
+    Placeholder.objects.bulk_create(placeholders)
+
+    versions = [None] * len(contents)
+    if versioning:
+        from djangocms_versioning.conf import LOCK_VERSIONS
+        from djangocms_versioning.constants import DRAFT
+        from djangocms_versioning.models import Version
+
+        versions = _bulk_create(Version.objects, [
+            Version(
+                content_type=content_type,
+                object_id=content.pk,
+                created_by=user,
+                number='1',
+                state=DRAFT,
+                locked_by=user if LOCK_VERSIONS else None,
+            )
+            for content in contents
+        ])
+
+    for page in pages:
+        schedule_page_update(page.pk, language)
+    invalidate(site_id)
+
+    page_ids = {page.node_id: page.pk for page in pages}
+    if parent is not None:
+        page_ids[parent.node_id] = parent.pk
+    return [
+        (spec, page, page_ids.get(node.parent_id), path.rpartition('/')[2], content, version)
+        for (spec, node, path, _template), page, content, version in zip(created, pages, contents, versions)
+    ]
+
+
+def get_placeholder_plugin_counts(placeholder, language):
+    """Return the number of plugins of each type in a placeholder and the last position, with one query"""
+    rows = placeholder.get_plugins(language).order_by().values('plugin_type').annotate(
+        count=Count('pk'), last_position=Max('position'),
+    )
+    counts = {row['plugin_type']: row['count'] for row in rows}
+    return counts, max((row['last_position'] for row in rows), default=0)
+
+
+def _insert_plugin_rows(model, plugins):
+    """Insert the rows of a plugin model's own table for plugins whose base row is saved
+
+    ``bulk_create`` refuses models with multi-table inheritance, so this uses
+    the batched insert it is built on, restricted to the model's own fields.
+    ``QuerySet._batched_insert`` is private Django API, which the tests of
+    ``save_plugins`` cover.
+    """
+    using = router.db_for_write(model)
+    fields = model._meta.local_concrete_fields
+    batch_size = connections[using].ops.bulk_batch_size(fields, plugins)
+    model._base_manager.using(using)._batched_insert(plugins, fields, batch_size)
+
+
+def save_plugins(plugins):
+    """Insert unsaved plugin instances that have their placeholder, language and position set
+
+    ``plugins`` are instances of the concrete plugin models with their
+    ``plugin_type`` and own fields set, in any number of placeholders. The
+    base rows are inserted with one query and the rows of each plugin model
+    with one more per table. Neither the cache nor the search index is
+    updated.
+    """
+    if not plugins:
+        return plugins
+    now = timezone.now()
+    for plugin in plugins:
+        plugin.creation_date = plugin.changed_date = now
+
+    base_fields = [field.attname for field in CMSPlugin._meta.concrete_fields if not field.primary_key]
+    bases = _bulk_create(CMSPlugin.objects, [
+        CMSPlugin(**{field: getattr(plugin, field) for field in base_fields}) for plugin in plugins
+    ])
+
+    by_model = {}
+    for plugin, base in zip(plugins, bases):
+        model = plugin._meta.concrete_model
+        # The pks of the tables of all the models in the inheritance chain
+        for cls in [model] + model._meta.get_parent_list():
+            setattr(plugin, cls._meta.pk.attname, base.pk)
+        by_model.setdefault(model, []).append(plugin)
+    for model, model_plugins in by_model.items():
+        # Tables between CMSPlugin and the model first
+        for cls in reversed([model] + model._meta.get_parent_list()):
+            if cls is not CMSPlugin:
+                _insert_plugin_rows(cls, model_plugins)
+        for plugin in model_plugins:
+            plugin._state.adding = False
+            plugin._state.db = bases[0]._state.db
+    return plugins
+
+
+@transaction.atomic
+def insert_plugins(placeholder, language, plugins, position, versioning=False):
+    """Append unsaved plugin instances to the top level of a placeholder
+
+    ``plugins`` are instances of the concrete plugin models with their
+    ``plugin_type`` and own fields set; they get consecutive positions after
+    ``position`` and are inserted with ``save_plugins``. A page content
+    holding the placeholder, and with ``versioning`` its version, is marked
+    as changed, as the placeholder operations of the admin do.
+    """
+    for offset, plugin in enumerate(plugins, start=1):
+        plugin.placeholder = placeholder
+        plugin.language = language
+        plugin.position = position + offset
+    save_plugins(plugins)
+
+    source = placeholder.source
+    if isinstance(source, PageContent):
+        now = timezone.now()
+        PageContent.admin_manager.filter(pk=source.pk).update(changed_date=now)
+        if versioning:
+            from djangocms_versioning.models import Version
+
+            Version.objects.filter(
+                content_type=ContentType.objects.get_for_model(PageContent), object_id=source.pk,
+            ).update(modified=now)
+        schedule_page_update(source.page_id, source.language)
+        placeholder.clear_cache(language, site_id=source.page.node.site_id)
+    return plugins
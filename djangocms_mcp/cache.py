@@ -0,0 +1,126 @@
+"""
+Caching of MCP tool responses
+
+Responses are stored under keys that embed generation tokens for the whole
+cache, the site and the site's language. Saving or deleting pages, page
+contents, urls or versions replaces the matching token, so every response
+built from the old data becomes unreachable at once. Tokens are random
+rather than counters so that an evicted token can never be recreated with a
+value that matches entries built before the change.
+"""
+import hashlib
+import logging
+import uuid
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+from .conf import get_mcp_setting
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'djangocms_mcp'
+
+
+def _generation_keys(site_id, language):
+    return [
+        f'{CACHE_PREFIX}:generation',
+        f'{CACHE_PREFIX}:generation:{site_id}',
+        f'{CACHE_PREFIX}:generation:{site_id}:{language}',
+    ]
+
+
+def _get_generations(site_id, language):
+    keys = _generation_keys(site_id, language)
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            generation = uuid.uuid4().hex
+            cache.add(key, generation, None)
+            # A cache that stores nothing, such as DummyCache, returns None
+            generations[key] = cache.get(key) or generation
+    return [generations[key] for key in keys]
+
+
+def get_generation(site_id, language):
+    """Return a token that changes whenever the data of a site's language changes"""
+    return ':'.join(_get_generations(site_id, language))
+
+
+def get_cached_response(tool, site_id, language, state, params, build):
+    """Return the cached response of ``tool`` or build and cache it
+
+    ``params`` holds any other arguments the response depends on. Error
+    and not modified responses are never cached.
+    """
+    timeout = get_mcp_setting('CACHE_TIMEOUT')
+    if not timeout:
+        return build()
+
+    params_hash = hashlib.md5(repr(params).encode(), usedforsecurity=False).hexdigest()
+    key = f'{CACHE_PREFIX}:{tool}:{site_id}:{language}:{state}:{get_generation(site_id, language)}:{params_hash}'
+
+    response = cache.get(key)
+    if response is None:
+        response = build()
+        if 'error' not in response and 'not_modified' not in response:
+            cache.set(key, response, timeout)
+    return response
+
+
+def invalidate(site_id=None, language=None):
+    """Invalidate cached responses for a site's language, a site or everything"""
+    if site_id is None:
+        key = _generation_keys(None, None)[0]
+    elif language is None:
+        key = _generation_keys(site_id, None)[1]
+    else:
+        key = _generation_keys(site_id, language)[2]
+
+    def bump():
+        cache.set(key, uuid.uuid4().hex, None)
+
+    bump()
+    # Responses built by other requests while the transaction was still open
+    # saw the old data, so they are thrown away again once it is committed.
+    transaction.on_commit(bump)
+
+
+def _get_site_and_language(instance):
+    """Find the site and language whose responses are affected by ``instance``
+
+    Returns ``None`` for versions of anything other than page contents.
+    """
+    from cms.models import Page, PageContent, PageUrl
+
+    if isinstance(instance, Page):
+        return instance.node.site_id, None
+    if isinstance(instance, (PageContent, PageUrl)):
+        return instance.page.node.site_id, instance.language
+
+    # A djangocms-versioning Version
+    content = instance.content
+    if not isinstance(content, PageContent):
+        return None
+    return content.page.node.site_id, content.language
+
+
+def invalidate_for_instance(sender, instance, **kwargs):
+    """Signal receiver invalidating the responses affected by a saved or deleted object"""
+    try:
+        affected = _get_site_and_language(instance)
+    except (ObjectDoesNotExist, AttributeError):
+        # The related objects are already gone, so play safe
+        affected = (None, None)
+    if affected is not None:
+        invalidate(*affected)
+
+
+def invalidate_for_operation(sender, obj=None, **kwargs):
+    """Signal receiver for cms operations, such as page moves, that bypass save signals"""
+    if obj is None:
+        invalidate()
+    else:
+        invalidate_for_instance(sender, obj)
@@ -0,0 +1,32 @@
+"""
+System checks of the MCP server settings
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .conf import get_mcp_setting
+
+
+# Cache backends kept in the memory of each process
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def check_cache_backend(app_configs, **kwargs):
+    """Warn when responses are cached in a cache other processes don't share
+
+    Invalidation replaces a token in the cache, which only reaches the
+    processes that share it: the others keep serving their cached responses
+    until they expire.
+    """
+    if not get_mcp_setting('CACHE_TIMEOUT'):
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'DJANGO_CMS_MCP CACHE_TIMEOUT is set but the default cache is local to each process, '
+        'so a change is only seen by the process that made it until the cached responses expire.',
+        hint='Use a shared cache backend such as Redis or Memcached, or set CACHE_TIMEOUT to 0.',
+        id='djangocms_mcp.W001',
+    )]
@@ -0,0 +1,42 @@
+from django.conf import settings
+
+
+DEFAULTS = {
+    # Seconds tool responses are cached, 0 disables the cache. Invalidation
+    # only reaches the processes sharing the cache, so enable it with a
+    # shared backend such as Redis or Memcached.
+    'CACHE_TIMEOUT': 0,
+    # Number of results the search tools return when no limit is given
+    'SEARCH_LIMIT': 20,
+    # Upper bound of the number of results the search tools return
+    'MAX_SEARCH_RESULTS': 50,
+    # Number of versions the version history of a page returns per batch
+    'VERSIONS_LIMIT': 100,
+    # Upper bound of the number of pages get_pages_detail returns in one call
+    'MAX_PAGES_DETAIL_PER_REQUEST': 100,
+    # Upper bound of the number of pages create_pages creates in one call
+    'MAX_PAGES_PER_REQUEST': 500,
+    # Upper bound of the number of plugins add_plugins adds in one call
+    'MAX_PLUGINS_PER_REQUEST': 50,
+    # Upper bound of the number of versions publish_versions publishes in one call
+    'MAX_VERSIONS_PER_REQUEST': 500,
+    # Versions publish_versions publishes per transaction, None for one transaction
+    'PUBLISH_CHUNK_SIZE': None,
+    # Worker threads the read tools run in
+    'ASYNC_WORKERS': 8,
+    # Record the calls, queries and response sizes of each tool
+    'METRICS_ENABLED': True,
+    # Maximum number of database queries of a call of each tool, by tool name
+    'QUERY_BUDGETS': {},
+    # What a call over its query budget does: 'log', 'warn' in the response or 'abort'
+    'QUERY_BUDGET_MODE': 'log',
+    # Profile every tool call, as the profile argument of a call does
+    'DEBUG_MODE': False,
+    # Directory of the profiling dumps; calls are only profiled once it is set
+    'PROFILE_DIR': None,
+}
+
+
+def get_mcp_setting(name):
+    """Return a ``DJANGO_CMS_MCP`` setting, falling back to its default"""
+    return getattr(settings, 'DJANGO_CMS_MCP', {}).get(name, DEFAULTS.get(name))
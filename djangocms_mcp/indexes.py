@@ -0,0 +1,72 @@
+"""
+Indexes on the tables of other apps
+
+The version table of djangocms-versioning gets an index serving the
+correlated lookups of a page's versions in a state and the newest of them.
+It belongs to neither app's migration state: migration 0003 adds it, and as
+a djangocms-versioning migration that makes SQLite rebuild the table drops
+it, it is added again after every ``migrate`` while 0003 is applied.
+"""
+import logging
+
+from django.apps import apps
+from django.db import DatabaseError, connections, models
+from django.db.migrations.recorder import MigrationRecorder
+
+
+logger = logging.getLogger(__name__)
+
+# The migration adding the index
+VERSION_STATE_MIGRATION = ('djangocms_mcp', '0003_version_state_index')
+
+# djangocms-versioning only indexes the content
+VERSION_STATE_INDEX = models.Index(
+    fields=['content_type', 'object_id', 'state', 'id'],
+    name='djangocms_mcp_version_state',
+)
+
+
+def get_version_model(connection):
+    """Return the Version model when djangocms-versioning is installed and its table exists"""
+    if not apps.is_installed('djangocms_versioning'):
+        return None
+    Version = apps.get_model('djangocms_versioning', 'Version')
+    if Version._meta.db_table not in connection.introspection.table_names():
+        return None
+    return Version
+
+
+def has_index(connection, model, index):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return index.name in constraints
+
+
+def add_version_state_index(schema_editor):
+    """Add the version state index unless it exists"""
+    Version = get_version_model(schema_editor.connection)
+    if Version is not None and not has_index(schema_editor.connection, Version, VERSION_STATE_INDEX):
+        schema_editor.add_index(Version, VERSION_STATE_INDEX)
+
+
+def remove_version_state_index(schema_editor):
+    """Remove the version state index if it exists"""
+    Version = get_version_model(schema_editor.connection)
+    if Version is not None and has_index(schema_editor.connection, Version, VERSION_STATE_INDEX):
+        schema_editor.remove_index(Version, VERSION_STATE_INDEX)
+
+
+def setup_version_state_index(sender, using='default', **kwargs):
+    """``post_migrate`` receiver adding the version state index back where a migration dropped it
+
+    Nothing is added unless migration 0003 is applied, so that migrating
+    back before it removes the index.
+    """
+    connection = connections[using]
+    if VERSION_STATE_MIGRATION not in MigrationRecorder(connection).applied_migrations():
+        return
+    try:
+        with connection.schema_editor() as schema_editor:
+            add_version_state_index(schema_editor)
+    except DatabaseError:
+        logger.exception('Could not add the index of the version table')
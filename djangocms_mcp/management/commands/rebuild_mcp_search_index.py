@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from djangocms_mcp.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index used by the search_pages MCP tool'
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} page contents'))
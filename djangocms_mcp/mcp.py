@@ -1,15 +1,41 @@
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional
 
 from mcp_server import ModelQueryToolset, MCPToolset
 
-from cms.models import Page, Placeholder
+from cms.models import Page, PageContent, PageUrl, Placeholder, TreeNode
 from cms.api import create_page
 from cms.plugin_pool import plugin_pool
 from cms.models.pluginmodel import CMSPlugin
 from cms.utils.placeholder import get_placeholder_conf
+from cms.utils.plugins import downcast_plugins
 from cms.utils.conf import get_cms_setting, get_languages
+from cms.utils.i18n import get_fallback_languages
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Subquery, Sum, Window
+from django.db.models.functions import RowNumber
+
+from .aio import READ_TOOLS, PooledToolCaller
+from .bulk import (
+    PAGE_SPEC_KEYS,
+    create_page_tree,
+    get_placeholder_plugin_counts,
+    insert_plugins,
+    iter_page_specs,
+)
+from .cache import get_cached_response
+from .conf import get_mcp_setting
+from .metrics import get_metrics, get_metrics_since, measure_query_toolset, measure_tool_responses, measure_tools
+from .models import PageSearchDocument, PluginSearchDocument
+from .search import get_search_backend
 
 
 logger = logging.getLogger(__name__)
@@ -18,36 +44,481 @@ logger = logging.getLogger(__name__)
 try:
     from djangocms_versioning.models import Version
     from djangocms_versioning.constants import DRAFT, PUBLISHED, UNPUBLISHED, ARCHIVED
+    from djangocms_versioning.exceptions import ConditionFailed
     from djangocms_versioning.helpers import version_list_url
     VERSIONING_ENABLED = True
 except ImportError as e:
     logger.exception(f"Error importing djangocms-versioning models: {e}")
     VERSIONING_ENABLED = False
-    Version = None
+    Version = ConditionFailed = None
     DRAFT = PUBLISHED = UNPUBLISHED = ARCHIVED = None
 
+# Optional sections of the get_pages_detail response
+PAGES_DETAIL_SECTIONS = ('versions', 'placeholders')
+
+# Fields that can be requested with the ``fields`` parameter of the page tools
+PAGE_VERSION_FIELDS = (
+    'version_id', 'version_state', 'version_number', 'is_published', 'is_draft', 'is_archived',
+    'created_by', 'created', 'modified',
+)
+PAGE_TREE_FIELDS = ('id', 'parent_id', 'title', 'slug', 'template', 'level', 'url') + PAGE_VERSION_FIELDS
+PAGE_DETAIL_FIELDS = (
+    'id', 'language', 'title', 'slug', 'meta_description', 'template', 'creation_date', 'changed_date',
+    'all_versions', 'placeholders',
+) + PAGE_VERSION_FIELDS
+SEARCH_PAGES_FIELDS = ('id', 'title', 'slug', 'url', 'rank', 'version_id', 'version_state', 'is_published')
+
+# Latest version annotations needed by each response field
+VERSION_FIELD_ANNOTATIONS = {
+    'version_state': 'state',
+    'version_number': 'number',
+    'is_published': 'state',
+    'is_draft': 'state',
+    'is_archived': 'state',
+    'url': 'state',
+    'created_by': 'created_by',
+    'created': 'created',
+    'modified': 'modified',
+}
+
+
+def _get_requested_fields(fields, available):
+    """Return the set of response fields to compute, all of them by default
+
+    ``id`` is always included. Raises ``ValueError`` for unknown fields.
+    """
+    if fields is None:
+        return set(available)
+    unknown = set(fields) - set(available)
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(sorted(unknown))}')
+    return set(fields) | {'id'}
+
+
+def _get_search_limit(limit):
+    """Return the number of search results to return, from 1 to ``MAX_SEARCH_RESULTS``"""
+    return max(1, min(limit or get_mcp_setting('SEARCH_LIMIT'), get_mcp_setting('MAX_SEARCH_RESULTS')))
+
+
+def _get_version_token(pages_qs, language=None, plugins=False, params=()):
+    """Return a token that changes whenever the pages of ``pages_qs`` change
+
+    The token hashes the number of pages, page contents and versions, their
+    latest modification and a checksum of the parents and depths of the
+    pages, all aggregated by a single query. Only contents and versions in
+    ``language`` are considered when it is given. With ``plugins`` the
+    number of plugins of the contents and their latest change are included,
+    for responses that hold them. Reordering siblings without saving them
+    goes unnoticed.
+
+    ``params`` holds the other arguments the response depends on, such as
+    a cursor, so that the token of one response never matches another.
+    """
+    in_language = Q(pagecontent_set__language=language) if language else None
+    aggregates = {
+        'pages': Count('pk', distinct=True),
+        'changed': Max('changed_date'),
+        'tree': Sum(F('node_id') * F('node__depth')),
+        'parents': Sum(F('node_id') * F('node__parent_id')),
+        'contents': Count('pagecontent_set', distinct=True, filter=in_language),
+        'contents_changed': Max('pagecontent_set__changed_date', filter=in_language),
+    }
+    if VERSIONING_ENABLED:
+        aggregates.update({
+            'versions': Count('pagecontent_set__versions', distinct=True, filter=in_language),
+            'versions_modified': Max('pagecontent_set__versions__modified', filter=in_language),
+        })
+    if plugins:
+        aggregates.update({
+            'plugins': Count('pagecontent_set__placeholders__cmsplugin', distinct=True, filter=in_language),
+            'plugins_changed': Max('pagecontent_set__placeholders__cmsplugin__changed_date', filter=in_language),
+        })
+    values = pages_qs.order_by().aggregate(**aggregates)
+    return hashlib.md5(repr((sorted(values.items()), params)).encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def _validate_page_specs(pages, templates):
+    """Return an error message for the first invalid spec of create_pages"""
+    if not isinstance(pages, list):
+        return 'pages must be a list'
+    for spec, _depth in iter_page_specs(pages):
+        if not isinstance(spec, dict) or not spec.get('title'):
+            return 'Every page needs a title'
+        unknown = sorted(set(spec) - set(PAGE_SPEC_KEYS))
+        if unknown:
+            return f'Unknown page keys: {", ".join(unknown)}'
+        if spec.get('template') and spec['template'] not in templates:
+            return f'Unknown template: {spec["template"]}'
+        if not isinstance(spec.get('children') or [], list):
+            return 'children must be a list'
+    return None
+
+
+def _build_plugin(spec):
+    """Return an unsaved plugin instance for an add_plugins spec
+
+    Raises ``ValueError`` when the spec is invalid. Relations are not
+    checked here; the database does when the plugin is inserted.
+    """
+    if not isinstance(spec, dict) or not spec.get('plugin_type'):
+        raise ValueError('Every plugin needs a plugin_type')
+    plugin_type = spec['plugin_type']
+    try:
+        plugin_class = plugin_pool.get_plugin(plugin_type)
+    except KeyError:
+        raise ValueError(f'Unknown plugin type: {plugin_type}')
+    if plugin_class.require_parent:
+        raise ValueError(f'{plugin_type} can only be added inside another plugin')
+
+    model = plugin_class.model
+    base_fields = {field.name for field in CMSPlugin._meta.concrete_fields}
+    own_fields = [
+        field for field in model._meta.concrete_fields
+        if field.name not in base_fields and not field.primary_key and not getattr(field, 'parent_link', False)
+    ]
+    # Relations are given by their id
+    allowed = {field.attname for field in own_fields}
+    data = spec.get('data') or {}
+    unknown = sorted(set(data) - allowed)
+    if unknown:
+        raise ValueError(f'Unknown fields for {plugin_type}: {", ".join(unknown)}')
+
+    plugin = model(plugin_type=plugin_type, **data)
+    try:
+        plugin.clean_fields(exclude=[
+            field.name for field in model._meta.fields if field not in own_fields or field.is_relation
+        ])
+    except ValidationError as e:
+        errors = '; '.join(f'{field}: {" ".join(messages)}' for field, messages in e.message_dict.items())
+        raise ValueError(f'Invalid {plugin_type}: {errors}')
+    return plugin
+
+
+def _check_plugin_limits(placeholder, plugins, counts):
+    """Raise ``ValueError`` when adding ``plugins`` exceeds the placeholder's limits"""
+    source = placeholder.source
+    template = source.get_template() if hasattr(source, 'get_template') else None
+    limits = get_placeholder_conf('limits', placeholder.slot, template) or {}
+
+    global_limit = limits.get('global')
+    if global_limit and sum(counts.values()) + len(plugins) > global_limit:
+        raise ValueError(f'The placeholder can hold at most {global_limit} plugins')
+    for plugin_type, count in Counter(plugin.plugin_type for plugin in plugins).items():
+        type_limit = limits.get(plugin_type)
+        if type_limit and counts.get(plugin_type, 0) + count > type_limit:
+            raise ValueError(f'The placeholder can hold at most {type_limit} {plugin_type} plugins')
+
+
+# Version columns the version lists are serialized from
+VERSION_HISTORY_COLUMNS = ('pk', 'number', 'state', 'created', 'modified', 'created_by__username')
+
+
+def _rank_versions(versions, key):
+    """Annotate versions with their ``recency``, 1 for the newest, among those with the same ``key``"""
+    return versions.annotate(
+        recency=Window(RowNumber(), partition_by=key, order_by=F('pk').desc()),
+    )
+
+
+def _get_version_history(versions, limit=None, cursor=None):
+    """Return a batch of versions, newest first, and the cursor of the next batch
+
+    Versions are read as dicts holding just the serialized columns, the
+    creator's username included, with one query. ``cursor`` is the id of
+    the last version of the previous batch and ``limit`` defaults to the
+    ``VERSIONS_LIMIT`` setting.
+    """
+    if not limit:
+        limit = get_mcp_setting('VERSIONS_LIMIT')
+    versions = versions.order_by('-pk')
+    if cursor:
+        versions = versions.filter(pk__lt=cursor)
+    rows = versions.values(*VERSION_HISTORY_COLUMNS)
+    if not limit:
+        return list(rows), None
+    rows = list(rows[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]['pk']
+    return rows, None
+
+
+def _get_version_histories(versions, key, limit=None):
+    """Map each ``key`` value to its batch of versions and the cursor of the next batch
+
+    Like ``_get_version_history`` for many groups of versions, e.g. those of
+    each page, with a single query that only reads ``limit`` versions of
+    each group plus one.
+    """
+    if not limit:
+        limit = get_mcp_setting('VERSIONS_LIMIT')
+    versions = versions.annotate(history_key=key).order_by('history_key', '-pk')
+    if limit:
+        versions = _rank_versions(versions, key).filter(recency__lte=limit + 1)
+
+    histories = {}
+    for row in versions.values('history_key', *VERSION_HISTORY_COLUMNS):
+        histories.setdefault(row['history_key'], []).append(row)
+    return {
+        group: (rows[:limit], rows[limit - 1]['pk']) if limit and len(rows) > limit else (rows, None)
+        for group, rows in histories.items()
+    }
+
+
+def _serialize_version_row(row):
+    """Serialize a version dict of ``_get_version_history`` for the version list of the page detail tools"""
+    return {
+        'id': row['pk'],
+        'number': row['number'],
+        'state': row['state'],
+        'created': row['created'].isoformat(),
+        'created_by': row['created_by__username'],
+    }
+
+
+def _get_not_modified(token):
+    return {'not_modified': True, 'version_token': token}
+
+
+def _get_page_columns(fields):
+    """Return the page columns to load for the requested response fields"""
+    columns = ['node', 'node__path', 'node__depth', 'node__parent']
+    if fields & {'slug', 'url'}:
+        # Used to resolve the language fallbacks and the home page URL
+        columns += ['languages', 'is_home', 'node__site']
+    return columns
+
+
+def _get_page_contents(pages_qs, pages, language):
+    """Map page id to the title and template of its content for ``language``"""
+    if not pages:
+        return {}
+    contents = PageContent.admin_manager.latest_content(
+        page__in=pages_qs.values('pk'),
+        language=language,
+    )
+    return {
+        content['page_id']: content
+        for content in contents.values('page_id', 'title', 'template')
+    }
+
+
+def _prefetch_page_urls(pages_qs, pages, languages):
+    """Fill the per-page url caches so slug and URL lookups in ``languages`` do not hit the database"""
+    if not pages:
+        return
+    languages = list(dict.fromkeys(
+        _language for language in languages for _language in [language, *get_fallback_languages(language)]
+    ))
+    page_urls = PageUrl.objects.filter(
+        page__in=pages_qs.values('pk'),
+        language__in=languages,
+    )
+    urls_by_page = {}
+    for page_url in page_urls:
+        urls_by_page.setdefault(page_url.page_id, {})[page_url.language] = page_url
+
+    for page in pages:
+        page.urls_cache.update(urls_by_page.get(page.pk, {}))
+        for _language in languages:
+            page.urls_cache.setdefault(_language, None)
+
+
+def _annotate_latest_version(pages_qs, language, state=None, fields=None):
+    """Annotate pages with the values of their latest version for ``language``
+
+    Every page gets ``latest_version_*`` attributes computed by correlated
+    subqueries, so the version metadata of any number of pages is loaded in
+    the same query as the pages. When ``state`` is given, only versions in
+    that state are considered and pages without one are excluded. With
+    ``fields`` only the annotations those response fields need are added;
+    ``latest_version_id`` always is.
+    """
+    versions = Version.objects.filter(
+        cms_pagecontent__page=OuterRef('pk'),
+        cms_pagecontent__language=language,
+    )
+    if state:
+        versions = versions.filter(state=state)
+        pages_qs = pages_qs.filter(Exists(versions))
+
+    latest = versions.order_by('-pk')
+    annotations = {
+        'id': 'pk',
+        'state': 'state',
+        'number': 'number',
+        'created_by': 'created_by__username',
+        'created': 'created',
+        'modified': 'modified',
+    }
+    if fields is not None:
+        names = {'id'} | {VERSION_FIELD_ANNOTATIONS[field] for field in fields if field in VERSION_FIELD_ANNOTATIONS}
+        annotations = {name: column for name, column in annotations.items() if name in names}
+    return pages_qs.annotate(**{
+        f'latest_version_{name}': Subquery(latest.values(column)[:1])
+        for name, column in annotations.items()
+    })
+
+
+def _serialize_latest_version(page):
+    """Serialize the ``latest_version_*`` annotations of a page"""
+    state = getattr(page, 'latest_version_state', None)
+    created = getattr(page, 'latest_version_created', None)
+    modified = getattr(page, 'latest_version_modified', None)
+    return {
+        'version_id': page.latest_version_id,
+        'version_state': state,
+        'version_number': getattr(page, 'latest_version_number', None),
+        'is_published': state == PUBLISHED,
+        'is_draft': state == DRAFT,
+        'is_archived': state == ARCHIVED,
+        'created_by': getattr(page, 'latest_version_created_by', None),
+        'created': created.isoformat() if created else None,
+        'modified': modified.isoformat() if modified else None,
+    }
+
+
+def _get_page_tree_queryset(site_id, language, state=None, root_page_id=None, max_depth=None, fields=None):
+    """Return the pages of a site's tree or branch and the treebeard depth it starts at
+
+    The branch below ``root_page_id`` is selected by its path prefix and
+    ``max_depth`` by a depth range, so no recursion is needed. Pages are
+    annotated with their parent page id and, with versioning, their latest
+    version. Raises ``Page.DoesNotExist`` for a root page unknown on the site.
+    """
+    pages_qs = Page.objects.filter(node__site_id=site_id)
+    start_depth = 1
+    if root_page_id:
+        root_node = Page.objects.select_related('node').get(pk=root_page_id, node__site_id=site_id).node
+        pages_qs = pages_qs.filter(node__path__startswith=root_node.path)
+        start_depth = root_node.depth
+
+    if max_depth:
+        pages_qs = pages_qs.filter(node__depth__lt=start_depth + max_depth)
+
+    if VERSIONING_ENABLED:
+        pages_qs = _annotate_latest_version(pages_qs, language, state, fields)
+
+    if fields is None or 'parent_id' in fields:
+        pages_qs = pages_qs.annotate(
+            parent_page_id=Subquery(
+                Page.objects.filter(node=OuterRef('node__parent')).values('pk')[:1]
+            ),
+        )
+    return pages_qs, start_depth
+
+
+def _get_detached_parents(pages_qs, pages, start_depth, state=None):
+    """Return the node ids of parents that are outside of a batch of pages
+
+    When a tree is fetched in batches, the first nodes of a batch may
+    continue a branch from an earlier one. With a ``state`` filter such a
+    branch is only continued when none of its ancestors was filtered out,
+    which is checked with one query on their paths.
+    """
+    batch_node_ids = {page.node_id for page in pages}
+    detached = [
+        page for page in pages
+        if page.node.depth > start_depth and page.node.parent_id not in batch_node_ids
+    ]
+    if not detached:
+        return set()
+    if not (VERSIONING_ENABLED and state):
+        return {page.node.parent_id for page in detached}
+
+    steplen = TreeNode.steplen
+    ancestor_paths = {
+        page.node.path: [
+            page.node.path[:depth * steplen]
+            for depth in range(start_depth, page.node.depth)
+        ]
+        for page in detached
+    }
+    matching_paths = set(
+        pages_qs.filter(
+            node__path__in={path for paths in ancestor_paths.values() for path in paths},
+        ).values_list('node__path', flat=True)
+    )
+    return {
+        page.node.parent_id for page in detached
+        if matching_paths.issuperset(ancestor_paths[page.node.path])
+    }
+
+
+def iter_page_tree_records(
+    language: Optional[str] = None,
+    state: Optional[str] = None,
+    root_page_id: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    site_id: Optional[int] = None,
+    chunk_size: int = 2000,
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over the page tree as flat node records in tree order
+
+    Unlike ``get_page_tree`` nothing is accumulated: pages are read with a
+    chunked ``.iterator()`` and titles and slugs are loaded per chunk, so
+    memory use does not grow with the size of the site. Each record holds
+    ``id``, ``parent_id``, ``depth``, ``title``, ``slug`` and ``state``.
+    Raises ``Page.DoesNotExist`` right away for an unknown root page.
+    """
+    if not language:
+        language = settings.LANGUAGE_CODE
+    if not site_id:
+        site_id = settings.SITE_ID
+
+    pages_qs, start_depth = _get_page_tree_queryset(site_id, language, state, root_page_id, max_depth)
+    pages = pages_qs.select_related('node').order_by('node__path').iterator(chunk_size=chunk_size)
+    return _iter_page_tree_records(pages, language, start_depth, chunk_size)
+
+
+def _iter_page_tree_records(pages, language, start_depth, chunk_size):
+    # Paths of the included ancestors of the current node. With a state
+    # filter a node is only included when its parent is, and as pages come
+    # in path order this stack is all that needs to be remembered.
+    included_paths = []
+    while True:
+        chunk = list(islice(pages, chunk_size))
+        if not chunk:
+            return
+
+        chunk_qs = Page.objects.filter(pk__in=[page.pk for page in chunk])
+        contents = _get_page_contents(chunk_qs, chunk, language)
+        slugs = dict(
+            PageUrl.objects.filter(page__in=chunk_qs, language=language).values_list('page_id', 'slug')
+        )
+
+        for page in chunk:
+            path = page.node.path
+            while included_paths and not path.startswith(included_paths[-1]):
+                included_paths.pop()
+            if page.node.depth > start_depth and len(included_paths) != page.node.depth - start_depth:
+                # Parent was filtered out, so is the whole branch
+                continue
+            included_paths.append(path)
+
+            yield {
+                'id': page.pk,
+                'parent_id': page.parent_page_id,
+                'depth': page.node.depth,
+                'title': contents.get(page.pk, {}).get('title'),
+                'slug': slugs.get(page.pk),
+                'state': page.latest_version_state if VERSIONING_ENABLED else None,
+            }
 
 
+@measure_query_toolset
 class PageQueryTool(ModelQueryToolset):
     """Query Django CMS pages with versioning support"""
-    
-    def __init__(self):
-        super().__init__()
-        self.model = Page
+
+    model = Page
 
     def get_queryset(self):
         """Filter pages based on versioning status"""
         if VERSIONING_ENABLED:
-            # Get pages that have versions (versioned content)
-            # Use a different approach that's compatible with Django CMS 4.1+
-            try:
-                # Try to get pages with versions using the content relationship
-                from djangocms_versioning.models import Version
-                versioned_page_ids = Version.objects.values_list('content_object_id', flat=True).distinct()
-                return Page.objects.filter(id__in=versioned_page_ids).distinct()
-            except Exception:
-                # Fallback to all pages if version filtering fails
-                return Page.objects.all()
+            # Pages with versioned content. A correlated EXISTS on the
+            # versions of each page's contents stops at the first one and
+            # needs no DISTINCT over the whole version table.
+            return Page.objects.filter(Exists(Version.objects.filter(cms_pagecontent__page=OuterRef('pk'))))
         else:
             # Fallback to standard Django CMS behavior
             # Use a more compatible approach for Django CMS 4.1+
@@ -59,95 +530,238 @@ class PageQueryTool(ModelQueryToolset):
                 return Page.objects.all()
 
 
+@measure_query_toolset
 class VersionQueryTool(ModelQueryToolset):
     """Query Django CMS versions when versioning is enabled"""
-    
-    def __init__(self):
-        super().__init__()
+
+    model = Version if VERSIONING_ENABLED else None
+
+    def __init__(self, context=None, request=None):
+        super().__init__(context=context, request=request)
         self.model = Version if VERSIONING_ENABLED else None
 
     def get_queryset(self):
         if not VERSIONING_ENABLED:
             return None
-        return Version.objects.select_related('content_object')
+        # The content is a generic relation that select_related can't
+        # follow: prefetching it loads the contents of each content type
+        # with one query, while the users are joined in
+        return Version.objects.select_related('content_type', 'created_by').prefetch_related('content')
 
 
+@measure_query_toolset
 class PlaceholderQueryTool(ModelQueryToolset):
     """Query Django CMS placeholders"""
-    
-    def __init__(self):
-        super().__init__()
-        self.model = Placeholder
+
+    model = Placeholder
 
     def get_queryset(self):
         return Placeholder.objects.all()
 
 
+@measure_query_toolset
 class CMSPluginQueryTool(ModelQueryToolset):
     """Query Django CMS plugins"""
-    
-    def __init__(self):
-        super().__init__()
-        self.model = CMSPlugin
+
+    model = CMSPlugin
 
     def get_queryset(self):
         return CMSPlugin.objects.all()
 
 
+def _convert_plugin_value(value):
+    """Convert a plugin field value by inspecting it"""
+    if hasattr(value, 'isoformat'):  # datetime
+        return value.isoformat()
+    if hasattr(value, 'url'):  # file/image fields
+        return value.url
+    return str(value)
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _file_url(value):
+    return value.url if value else ''
+
+
+def _get_value_converter(field):
+    """Pick the converter for the values of ``field`` once per field"""
+    if isinstance(field, (models.DateField, models.TimeField)):
+        return _isoformat
+    if isinstance(field, models.FileField):
+        return _file_url
+    if isinstance(field, (models.CharField, models.TextField, models.IntegerField, models.BooleanField)):
+        return str
+    return _convert_plugin_value
+
+
+@lru_cache(maxsize=None)
+def _get_plugin_serializer(model):
+    """Return the serializer for the instances of a plugin model
+
+    The field names and value converters are resolved once per model class,
+    so serializing an instance only reads its fields. Loaded field values
+    are read from the instance dict, relations are only followed when they
+    are set and deferred fields are still loaded through the model.
+    """
+    fields = tuple(
+        (field.name, field.attname, field.is_relation, _get_value_converter(field))
+        for field in model._meta.fields
+    )
+
+    def serialize(plugin_instance):
+        values = plugin_instance.__dict__
+        data = {}
+        for name, attname, is_relation, convert in fields:
+            if attname not in values or (is_relation and values[attname] is not None):
+                value = getattr(plugin_instance, name, None)
+            else:
+                value = values[attname]
+            if value is not None:
+                data[name] = convert(value)
+        return data
+
+    return serialize
+
+
+@measure_tools
 class DjangoCMSVersioningTools(MCPToolset):
     """Django CMS management tools with versioning support"""
     
-    def __init__(self):
-        super().__init__()
-
-    def get_page_tree(self, language: Optional[str] = None, state: Optional[str] = None) -> Dict[str, Any]:
-        """Get the hierarchical page structure with versioning information"""
+    def __init__(self, context=None, request=None):
+        super().__init__(context=context, request=request)
+
+    def _add_tools_to(self, tool_manager):
+        tools = super()._add_tools_to(tool_manager)
+        for tool in tools:
+            measure_tool_responses(tool)
+            if tool.name in READ_TOOLS:
+                # Read tools don't need the thread shared by all tool calls
+                tool.fn = PooledToolCaller(tool.fn)
+        return tools
+
+    def get_page_tree(
+        self,
+        language: Optional[str] = None,
+        state: Optional[str] = None,
+        root_page_id: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        site_id: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        if_none_match: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Get the hierarchical page structure with versioning information
+
+        ``root_page_id`` restricts the tree to the branch below that page and
+        ``max_depth`` to that many levels from the top of the tree or branch.
+        With ``limit`` the nodes are returned in batches in tree order; pass
+        the returned ``next_cursor`` to fetch the following batch. Nodes whose
+        parent was returned in an earlier batch are listed at the top level.
+        ``site_id`` defaults to the current site. ``fields`` limits the node
+        attributes to compute, e.g. ``['title']`` for a tree of ids and titles.
+
+        The response has a ``version_token`` of the site's pages. Passing it
+        back as ``if_none_match`` returns just ``not_modified`` while nothing
+        has changed.
+        """
         if not language:
             language = settings.LANGUAGE_CODE
+        if not site_id:
+            site_id = settings.SITE_ID
+
+        if limit is not None and limit < 1:
+            return {'error': 'limit must be at least 1'}
+        if max_depth is not None and max_depth < 1:
+            return {'error': 'max_depth must be at least 1'}
+        try:
+            requested_fields = _get_requested_fields(fields, PAGE_TREE_FIELDS)
+        except ValueError as e:
+            return {'error': str(e)}
+
+        params = (state, root_page_id, max_depth, limit, cursor, sorted(requested_fields))
+
+        def build():
+            token = _get_version_token(Page.objects.filter(node__site_id=site_id), language, params=params)
+            if if_none_match == token:
+                return _get_not_modified(token)
+            response = self._get_page_tree(
+                site_id, language, state, root_page_id, max_depth, limit, cursor, requested_fields,
+            )
+            return response if 'error' in response else {**response, 'version_token': token}
+
+        response = get_cached_response('get_page_tree', site_id, language, state, params, build)
+        if if_none_match and response.get('version_token') == if_none_match:
+            return _get_not_modified(if_none_match)
+        return response
 
-        def build_tree(page, level=0):
+    def _get_page_tree(self, site_id, language, state, root_page_id, max_depth, limit, cursor, fields):
+        try:
+            pages_qs, start_depth = _get_page_tree_queryset(
+                site_id, language, state, root_page_id, max_depth, fields,
+            )
+        except Page.DoesNotExist:
+            return {'error': f'Page with id {root_page_id} not found'}
+
+        # Load the pages in tree order with one query; a parent's path is
+        # always a prefix of its children's, so parents are seen first.
+        batch_qs = pages_qs.select_related('node').only(*_get_page_columns(fields)).order_by('node__path')
+        if cursor:
+            batch_qs = batch_qs.filter(node__path__gt=cursor)
+
+        next_cursor = None
+        if limit:
+            pages = list(batch_qs[:limit + 1])
+            if len(pages) > limit:
+                pages = pages[:limit]
+                next_cursor = pages[-1].node.path
+            # A sliced queryset can't be used as a subquery everywhere
+            batch_qs = Page.objects.filter(pk__in=[page.pk for page in pages])
+        else:
+            pages = list(batch_qs)
+
+        contents = {}
+        if fields & {'title', 'template'}:
+            contents = _get_page_contents(batch_qs, pages, language)
+        if fields & {'slug', 'url'}:
+            _prefetch_page_urls(batch_qs, pages, [language])
+        detached_parents = _get_detached_parents(pages_qs, pages, start_depth, state)
+
+        tree = []
+        nodes = {}
+        for page in pages:
+            parent_node_id = page.node.parent_id
+            if page.node.depth == start_depth or parent_node_id in detached_parents:
+                siblings = tree
+            elif parent_node_id in nodes:
+                siblings = nodes[parent_node_id]['children']
+            else:
+                # Parent was filtered out, so is the whole branch
+                continue
+
+            content = contents.get(page.pk, {})
             page_data = {
                 'id': page.pk,
-                'title': page.get_title(language=language) if hasattr(page, 'get_title') else str(page),
-                'slug': page.get_slug(language=language) if hasattr(page, 'get_slug') else '',
-                'template': getattr(page, 'template', ''),
-                'level': level,
-                'children': []
+                'parent_id': getattr(page, 'parent_page_id', None),
+                'title': content.get('title'),
+                'slug': page.get_slug(language=language) if 'slug' in fields else None,
+                'template': content.get('template', ''),
+                'level': page.node.depth - 1,
             }
 
             if VERSIONING_ENABLED:
-                # Get versioning information
-                try:
-                    versions = Version.objects.filter(content_object=page)
-                    if state:
-                        versions = versions.filter(state=state)
-
-                    latest_version = versions.order_by('-pk').first()
-                    if latest_version:
-                        page_data.update({
-                            'version_id': latest_version.pk,
-                            'version_state': latest_version.state,
-                            'version_number': latest_version.number,
-                            'is_published': latest_version.state == PUBLISHED,
-                            'is_draft': latest_version.state == DRAFT,
-                            'is_archived': latest_version.state == ARCHIVED,
-                            'created_by': latest_version.created_by.username if latest_version.created_by else None,
-                            'created': latest_version.created.isoformat(),
-                            'modified': latest_version.modified.isoformat(),
-                        })
-
-                        # Add URL for published versions
-                        if latest_version.state == PUBLISHED:
-                            page_data['url'] = page.get_absolute_url(language=language) if hasattr(page, 'get_absolute_url') else ''
-                        else:
-                            page_data['url'] = None
+                if page.latest_version_id:
+                    page_data.update(_serialize_latest_version(page))
+
+                    # Add URL for published versions
+                    if page_data['is_published'] and 'url' in fields:
+                        page_data['url'] = page.get_absolute_url(language=language)
                     else:
-                        page_data.update({
-                            'version_state': 'unknown',
-                            'is_published': False,
-                        })
-                except Exception as e:
-                    logger.warning(f"Error getting version info for page {page.pk}: {e}")
+                        page_data['url'] = None
+                else:
                     page_data.update({
                         'version_state': 'unknown',
                         'is_published': False,
@@ -155,145 +769,228 @@ class DjangoCMSVersioningTools(MCPToolset):
             else:
                 # Fallback to standard Django CMS behavior
                 page_data.update({
-                    'url': page.get_absolute_url(language=language) if hasattr(page, 'get_absolute_url') else '',
+                    'url': page.get_absolute_url(language=language) if 'url' in fields else None,
                     'is_published': page.is_published(language) if hasattr(page, 'is_published') else False,
                 })
 
-            # Get children
-            if hasattr(page, 'get_children'):
-                children = page.get_children()
-                if VERSIONING_ENABLED and state:
-                    # Filter children by version state
-                    children = [
-                        child for child in children
-                        if Version.objects.filter(content_object=child, state=state).exists()
-                    ]
-
-                for child in children:
-                    page_data['children'].append(build_tree(child, level + 1))
-
-            return page_data
-
-        # Get root pages
-        if VERSIONING_ENABLED:
-            # Get pages with versions
-            root_pages = Page.objects.filter(
-                node__depth=1,  # Root level in treebeard
-            ).distinct()
-
-            if state:
-                root_pages = [
-                    page for page in root_pages
-                    if Version.objects.filter(content_object=page, state=state).exists()
-                ]
-        else:
-            try:
-                root_pages = Page.objects.filter(level=0, publisher_is_draft=True).published()
-            except Exception:
-                # If the old fields don't exist, get all root pages
-                root_pages = Page.objects.filter(node__depth=1)
+            page_data = {key: value for key, value in page_data.items() if key in fields}
+            page_data['children'] = []
+            nodes[page.node_id] = page_data
+            siblings.append(page_data)
 
         return {
-            'tree': [build_tree(page) for page in root_pages],
+            'tree': tree,
             'language': language,
             'versioning_enabled': VERSIONING_ENABLED,
             'state_filter': state,
+            'next_cursor': next_cursor,
         }
 
-    def get_page_detail(self, page_id: int, language: Optional[str] = None, version_id: Optional[int] = None) -> Dict[str, Any]:
-        """Retrieve full page content with versioning information"""
+    def get_page_detail(
+        self,
+        page_id: int,
+        language: Optional[str] = None,
+        version_id: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        if_none_match: Optional[str] = None,
+        languages: Optional[List[str]] = None,
+        include_versions: bool = True,
+    ) -> Dict[str, Any]:
+        """Retrieve full page content with versioning information
+
+        ``fields`` limits the attributes to compute; the version list and the
+        placeholders are only loaded when ``all_versions`` and
+        ``placeholders`` are requested, and ``include_versions=False`` leaves
+        out the version list whatever the fields. It holds the newest
+        versions; ``all_versions_next_cursor`` is set when there are more,
+        which ``get_page_versions`` returns. Passing the returned
+        ``version_token`` as ``if_none_match`` returns just ``not_modified``
+        while the page hasn't changed.
+
+        With ``languages`` the latest content of the page in each of them is
+        returned in a ``languages`` map instead, loaded with the same number
+        of queries as a single language. Their version lists only hold the
+        versions in their language: pass the language to
+        ``get_page_versions`` with the cursor.
+        """
         if not language:
             language = settings.LANGUAGE_CODE
 
+        try:
+            fields = _get_requested_fields(fields, PAGE_DETAIL_FIELDS)
+        except ValueError as e:
+            return {'error': str(e)}
+        if not include_versions:
+            fields.discard('all_versions')
+
+        token = _get_version_token(
+            Page.objects.filter(pk=page_id),
+            plugins='placeholders' in fields,
+            params=(language, version_id, sorted(fields), languages),
+        )
+        if if_none_match == token:
+            return _get_not_modified(token)
+
         try:
             page = Page.objects.get(pk=page_id)
-            result = {
+        except Page.DoesNotExist:
+            return {'error': f'Page with id {page_id} not found'}
+
+        if languages is not None:
+            if not languages:
+                return {'error': 'languages must not be empty'}
+            if version_id:
+                return {'error': 'version_id can only be used with a single language'}
+            return {
                 'id': page.pk,
-                'language': language
+                'languages': self._serialize_page_detail_languages(page, languages, fields),
+                'versioning_enabled': VERSIONING_ENABLED,
+                'version_token': token,
             }
 
-            if VERSIONING_ENABLED:
-                # Get specific version or latest
-                if version_id:
-                    try:
-                        version = Version.objects.get(pk=version_id, content_object=page)
-                    except Version.DoesNotExist:
-                        return {'error': f'Version {version_id} not found for page {page_id}'}
-                else:
-                    version = Version.objects.filter(content_object=page).order_by('-pk').first()
+        if VERSIONING_ENABLED:
+            # Get specific version or latest
+            versions = Version.objects.filter(cms_pagecontent__page=page)
+            if 'created_by' in fields:
+                versions = versions.select_related('created_by')
+            if version_id:
+                try:
+                    version = versions.get(pk=version_id)
+                except Version.DoesNotExist:
+                    return {'error': f'Version {version_id} not found for page {page_id}'}
+            else:
+                version = versions.filter(cms_pagecontent__language=language).order_by('-pk').first()
 
-                if not version:
-                    return {'error': f'No versions found for page {page_id}'}
+            if not version:
+                return {'error': f'No versions found for page {page_id}'}
 
-                # Get content from the specific version
-                versioned_page = version.content_object
-                result.update({
-                    'version_id': version.pk,
-                    'version_state': version.state,
-                    'version_number': version.number,
-                    'is_published': version.state == PUBLISHED,
-                    'is_draft': version.state == DRAFT,
-                    'is_archived': version.state == ARCHIVED,
-                    'created_by': version.created_by.username if version.created_by else None,
-                    'created': version.created.isoformat(),
-                    'modified': version.modified.isoformat(),
-                    'title': versioned_page.get_title(language=language) if hasattr(versioned_page, 'get_title') else str(versioned_page),
-                    'slug': versioned_page.get_slug(language=language) if hasattr(versioned_page, 'get_slug') else '',
-                    'meta_description': versioned_page.get_meta_description(language=language) if hasattr(versioned_page, 'get_meta_description') else '',
-                    'template': getattr(versioned_page, 'template', ''),
-                })
+            # Get content from the specific version
+            content = version.content
+            result = self._serialize_page_detail(page, language, content, version, fields)
 
-                # Get all versions for this page
-                all_versions = Version.objects.filter(content_object=page).order_by('-created')
-                result['all_versions'] = [
-                    {
-                        'id': v.pk,
-                        'number': v.number,
-                        'state': v.state,
-                        'created': v.created.isoformat(),
-                        'created_by': v.created_by.username if v.created_by else None,
-                    }
-                    for v in all_versions
-                ]
+            # Get the newest versions of this page
+            if 'all_versions' in fields:
+                rows, next_cursor = _get_version_history(versions)
+                result['all_versions'] = [_serialize_version_row(row) for row in rows]
+                result['all_versions_next_cursor'] = next_cursor
+        else:
+            # Fallback to standard Django CMS
+            content = PageContent.admin_manager.filter(page=page, language=language).first()
+            result = self._serialize_page_detail(page, language, content, fields=fields)
 
-            else:
-                # Fallback to standard Django CMS
-                result.update({
-                    'title': page.get_title(language=language),
-                    'slug': page.get_slug(language=language),
-                    'meta_description': page.get_meta_description(language=language),
-                    'template': page.template,
-                    'is_published': page.is_published(language),
-                    'creation_date': page.creation_date.isoformat(),
-                    'changed_date': page.changed_date.isoformat(),
-                })
+        # Get placeholders and plugins
+        if 'placeholders' in fields:
+            placeholders = list(Placeholder.objects.get_for_obj(content)) if content else []
+            result['placeholders'] = self._serialize_placeholders(placeholders, language)
+        result['version_token'] = token
+        return result
 
-            # Get placeholders and plugins
-            placeholders_data = []
-            for placeholder in page.placeholders.all():
-                plugins_data = []
-                plugins = placeholder.get_plugins(language=language)
-
-                for plugin in plugins:
-                    plugin_instance = plugin.get_plugin_instance()[0]
-                    if plugin_instance:
-                        plugins_data.append({
-                            'id': plugin.pk,
-                            'plugin_type': plugin.plugin_type,
-                            'position': plugin.position,
-                            'data': self._serialize_plugin(plugin_instance)
-                        })
-
-                placeholders_data.append({
-                    'slot': placeholder.slot,
-                    'plugins': plugins_data
-                })
+    def get_pages_detail(
+        self,
+        page_ids: List[int],
+        language: Optional[str] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Retrieve the content of many pages at once
+
+        Returns the same data as ``get_page_detail`` for the latest version
+        of each page, keyed by page id, with an ``error`` entry for pages that
+        can't be found. ``include`` selects the optional sections,
+        ``versions`` and ``placeholders``; both are included by default.
+        Every kind of object is loaded with one query for the whole batch.
+        At most ``MAX_PAGES_DETAIL_PER_REQUEST`` pages can be requested.
+        """
+        if not language:
+            language = settings.LANGUAGE_CODE
 
-            result['placeholders'] = placeholders_data
-            return result
+        if not isinstance(page_ids, list) or not all(isinstance(pk, int) for pk in page_ids):
+            return {'error': 'page_ids must be a list of ids'}
+        max_pages = get_mcp_setting('MAX_PAGES_DETAIL_PER_REQUEST')
+        if len(page_ids) > max_pages:
+            return {'error': f'Too many pages: {len(page_ids)}, at most {max_pages} can be retrieved at once'}
 
-        except Page.DoesNotExist:
-            return {'error': f'Page with id {page_id} not found'}
+        if include is None:
+            include = PAGES_DETAIL_SECTIONS
+        unknown = set(include) - set(PAGES_DETAIL_SECTIONS)
+        if unknown:
+            return {'error': f'Unknown sections: {", ".join(sorted(unknown))}'}
+
+        pages_qs = Page.objects.filter(pk__in=page_ids)
+        pages = {page.pk: page for page in pages_qs.select_related('node')}
+        _prefetch_page_urls(pages_qs, list(pages.values()), [language])
+
+        latest_versions = {}
+        if VERSIONING_ENABLED:
+            versions = _rank_versions(Version.objects.filter(
+                cms_pagecontent__page__in=pages_qs,
+                cms_pagecontent__language=language,
+            ), F('cms_pagecontent__page')).filter(recency=1).select_related('created_by').annotate(
+                page_id=F('cms_pagecontent__page'),
+            )
+            for version in versions:
+                latest_versions[version.page_id] = version
+            contents_qs = PageContent.admin_manager.filter(
+                pk__in=[version.object_id for version in latest_versions.values()],
+            )
+        else:
+            contents_qs = PageContent.admin_manager.filter(page__in=pages_qs, language=language)
+        contents = {content.page_id: content for content in contents_qs}
+
+        all_versions = {}
+        if VERSIONING_ENABLED and 'versions' in include:
+            all_versions = _get_version_histories(
+                Version.objects.filter(cms_pagecontent__page__in=pages_qs), F('cms_pagecontent__page'),
+            )
+
+        placeholders = {}
+        plugins_data = {}
+        if 'placeholders' in include:
+            placeholders_qs = Placeholder.objects.filter(
+                content_type=ContentType.objects.get_for_model(PageContent),
+                object_id__in=[content.pk for content in contents.values()],
+            )
+            for placeholder in placeholders_qs:
+                placeholders.setdefault(placeholder.object_id, []).append(placeholder)
+            plugins_data = self._get_plugins_data(
+                [placeholder for group in placeholders.values() for placeholder in group], [language],
+            )
+
+        results = {}
+        for page_id in page_ids:
+            page = pages.get(page_id)
+            if not page:
+                results[page_id] = {'error': f'Page with id {page_id} not found'}
+                continue
+
+            content = contents.get(page_id)
+            if VERSIONING_ENABLED:
+                version = latest_versions.get(page_id)
+                if not version:
+                    results[page_id] = {'error': f'No versions found for page {page_id}'}
+                    continue
+                result = self._serialize_page_detail(page, language, content, version)
+                if 'versions' in include:
+                    rows, next_cursor = all_versions.get(page_id, ([], None))
+                    result['all_versions'] = [_serialize_version_row(row) for row in rows]
+                    result['all_versions_next_cursor'] = next_cursor
+            else:
+                result = self._serialize_page_detail(page, language, content)
+
+            if 'placeholders' in include:
+                result['placeholders'] = [
+                    {
+                        'slot': placeholder.slot,
+                        'plugins': plugins_data.get(placeholder.pk, [])
+                    }
+                    for placeholder in placeholders.get(content.pk if content else None, [])
+                ]
+            results[page_id] = result
+
+        return {
+            'pages': results,
+            'language': language,
+            'versioning_enabled': VERSIONING_ENABLED,
+        }
 
     def create_page(
         self,
@@ -309,6 +1006,10 @@ class DjangoCMSVersioningTools(MCPToolset):
         if not language:
             language = settings.LANGUAGE_CODE
 
+        user = self._get_user()
+        if VERSIONING_ENABLED and user is None:
+            return {'error': 'Creating versioned pages requires an authenticated user'}
+
         try:
             parent = None
             if parent_id:
@@ -320,19 +1021,22 @@ class DjangoCMSVersioningTools(MCPToolset):
                 language=language,
                 slug=slug,
                 parent=parent,
-                meta_description=meta_description
+                meta_description=meta_description,
+                created_by=user or 'python-api',
             )
 
             result = {
                 'success': True,
                 'page_id': page.pk,
-                'title': page.get_title(language=language),
+                'title': title,
                 'slug': page.get_slug(language=language),
             }
 
             if VERSIONING_ENABLED:
                 # Get the version that was created
-                version = Version.objects.filter(content_object=page).first()
+                version = Version.objects.filter(
+                    cms_pagecontent__page=page, cms_pagecontent__language=language,
+                ).order_by('-pk').first()
                 if version:
                     result.update({
                         'version_id': version.pk,
@@ -353,6 +1057,82 @@ class DjangoCMSVersioningTools(MCPToolset):
             logger.error(f"Error creating page: {e}")
             return {'error': str(e)}
 
+    def create_pages(
+        self,
+        pages: List[Dict[str, Any]],
+        language: Optional[str] = None,
+        parent_id: Optional[int] = None,
+        template: Optional[str] = None,
+        site_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Create a tree of pages in one transaction
+
+        ``pages`` lists page specs with a ``title`` and optionally a
+        ``slug``, ``template``, ``meta_description``, a ``ref`` returned with
+        the result and ``children``, a list of specs of the same form. Top
+        level pages are added below ``parent_id`` or at the root of the site.
+        Pages without a template use their parent spec's, else ``template``,
+        else the first CMS template. Returns the new pages in tree order.
+        """
+        if not language:
+            language = settings.LANGUAGE_CODE
+
+        templates = [name for name, _label in get_cms_setting('TEMPLATES')]
+        error = _validate_page_specs(pages, templates)
+        if error:
+            return {'error': error}
+        if template and template not in templates:
+            return {'error': f'Unknown template: {template}'}
+        count = sum(1 for _spec in iter_page_specs(pages))
+        max_pages = get_mcp_setting('MAX_PAGES_PER_REQUEST')
+        if count > max_pages:
+            return {'error': f'Too many pages: {count}, at most {max_pages} can be created at once'}
+
+        user = self._get_user()
+        if VERSIONING_ENABLED and user is None:
+            return {'error': 'Creating versioned pages requires an authenticated user'}
+
+        parent = None
+        if parent_id:
+            try:
+                parent = Page.objects.select_related('node').get(pk=parent_id)
+            except Page.DoesNotExist:
+                return {'error': f'Page with id {parent_id} not found'}
+            site_id = parent.node.site_id
+        if not site_id:
+            site_id = settings.SITE_ID
+
+        try:
+            created = create_page_tree(
+                pages, language, user, site_id, parent,
+                default_template=template or templates[0],
+                versioning=VERSIONING_ENABLED,
+            )
+        except Exception as e:
+            logger.error(f"Error creating pages: {e}")
+            return {'error': str(e)}
+
+        results = []
+        for spec, page, parent_page_id, slug, content, version in created:
+            result = {
+                'page_id': page.pk,
+                'parent_id': parent_page_id,
+                'title': content.title,
+                'slug': slug,
+            }
+            if 'ref' in spec:
+                result['ref'] = spec['ref']
+            if version is not None:
+                result.update({'version_id': version.pk, 'version_state': version.state})
+            results.append(result)
+
+        return {
+            'success': True,
+            'pages': results,
+            'count': len(results),
+            'language': language,
+        }
+
     def publish_version(self, version_id: int, language: Optional[str] = None) -> Dict[str, Any]:
         """Publish a specific version"""
         if not VERSIONING_ENABLED:
@@ -361,24 +1141,26 @@ class DjangoCMSVersioningTools(MCPToolset):
         if not language:
             language = settings.LANGUAGE_CODE
 
+        user = self._get_user()
+        if user is None:
+            return {'error': 'Publishing requires an authenticated user'}
+
         try:
             version = Version.objects.get(pk=version_id)
 
             if version.state != DRAFT:
                 return {'error': f'Version {version_id} is not in draft state (current: {version.state})'}
 
-            # Publish the version
-            version.publish(language)
-
-            # Refresh from database
-            version.refresh_from_db()
+            with transaction.atomic():
+                version.publish(user)
 
+            page = getattr(version.content, 'page', None)
             return {
                 'success': True,
                 'version_id': version.pk,
                 'new_state': version.state,
-                'page_id': version.content_object.pk,
-                'published_url': version.content_object.get_absolute_url(language=language) if hasattr(version.content_object, 'get_absolute_url') else None
+                'page_id': page.pk if page else None,
+                'published_url': page.get_absolute_url(language=language) if page else None,
             }
 
         except Version.DoesNotExist:
@@ -387,21 +1169,105 @@ class DjangoCMSVersioningTools(MCPToolset):
             logger.error(f"Error publishing version: {e}")
             return {'error': str(e)}
 
+    def publish_versions(
+        self,
+        version_ids: List[int],
+        language: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Publish many draft versions at once
+
+        Versions are published in one transaction, or in transactions of
+        ``chunk_size`` versions (default ``PUBLISH_CHUNK_SIZE``). Each chunk
+        is loaded and locked with one query, in id order so that concurrent
+        calls can't deadlock. A version that fails is rolled back on its own
+        and the result lists the outcome of every version in the order given.
+        """
+        if not VERSIONING_ENABLED:
+            return {'error': 'Versioning is not enabled'}
+        if not language:
+            language = settings.LANGUAGE_CODE
+
+        if not isinstance(version_ids, list) or not all(isinstance(pk, int) for pk in version_ids):
+            return {'error': 'version_ids must be a list of ids'}
+        max_versions = get_mcp_setting('MAX_VERSIONS_PER_REQUEST')
+        if len(version_ids) > max_versions:
+            return {'error': f'Too many versions: {len(version_ids)}, at most {max_versions} can be published at once'}
+        if chunk_size is not None and chunk_size < 1:
+            return {'error': 'chunk_size must be at least 1'}
+        user = self._get_user()
+        if user is None:
+            return {'error': 'Publishing requires an authenticated user'}
+
+        ids = sorted(set(version_ids))
+        chunk_size = chunk_size or get_mcp_setting('PUBLISH_CHUNK_SIZE') or len(ids) or 1
+        results = {}
+        for start in range(0, len(ids), chunk_size):
+            with transaction.atomic():
+                results.update(self._publish_version_chunk(ids[start:start + chunk_size], user, language))
+
+        results = [results[pk] for pk in dict.fromkeys(version_ids)]
+        published = sum(1 for result in results if result.get('success'))
+        return {
+            'results': results,
+            'published': published,
+            'failed': len(results) - published,
+            'language': language,
+        }
+
+    def _publish_version_chunk(self, ids, user, language):
+        versions = {
+            version.pk: version
+            # Only the versions are locked, not the content type rows shared by every chunk
+            for version in Version.objects.select_for_update(of=('self',)).filter(pk__in=ids).order_by('pk')
+            .select_related('content_type').prefetch_related('content')
+        }
+        results = {}
+        for pk in ids:
+            version = versions.get(pk)
+            if version is None:
+                results[pk] = {'version_id': pk, 'error': f'Version with id {pk} not found'}
+                continue
+            if version.state != DRAFT:
+                results[pk] = {
+                    'version_id': pk,
+                    'error': f'Version {pk} is not in draft state (current: {version.state})',
+                }
+                continue
+            try:
+                with transaction.atomic():
+                    version.publish(user)
+            except Exception as e:
+                logger.error(f"Error publishing version {pk}: {e}")
+                results[pk] = {'version_id': pk, 'error': str(e)}
+                continue
+            results[pk] = {
+                'version_id': pk,
+                'success': True,
+                'page_id': getattr(version.content, 'page_id', None),
+                'new_state': version.state,
+            }
+        return results
+
     def create_version(self, page_id: int, copy_from_version_id: Optional[int] = None) -> Dict[str, Any]:
         """Create a new version of a page"""
         if not VERSIONING_ENABLED:
             return {'error': 'Versioning is not enabled'}
 
+        user = self._get_user()
+        if user is None:
+            return {'error': 'Creating versions requires an authenticated user'}
+
         try:
             page = Page.objects.get(pk=page_id)
 
             # Get the source version
             if copy_from_version_id:
-                source_version = Version.objects.get(pk=copy_from_version_id, content_object=page)
+                source_version = Version.objects.get(pk=copy_from_version_id, cms_pagecontent__page=page)
             else:
                 # Use the latest published version
                 source_version = Version.objects.filter(
-                    content_object=page,
+                    cms_pagecontent__page=page,
                     state=PUBLISHED
                 ).order_by('-pk').first()
 
@@ -409,7 +1275,7 @@ class DjangoCMSVersioningTools(MCPToolset):
                 return {'error': f'No published version found to copy from for page {page_id}'}
 
             # Create new version
-            new_version = source_version.copy()
+            new_version = source_version.copy(user)
 
             return {
                 'success': True,
@@ -426,31 +1292,63 @@ class DjangoCMSVersioningTools(MCPToolset):
             logger.error(f"Error creating version: {e}")
             return {'error': str(e)}
 
-    def get_page_versions(self, page_id: int) -> Dict[str, Any]:
-        """Get all versions of a page"""
+    def get_page_versions(
+        self,
+        page_id: int,
+        if_none_match: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[int] = None,
+        language: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Get the versions of a page, newest first
+
+        Versions are returned in batches of ``limit``, by default the
+        ``VERSIONS_LIMIT`` setting; pass the returned ``next_cursor`` to fetch
+        the following batch. ``language`` restricts the list to the versions
+        of the page in that language, as the version lists of
+        ``get_page_detail`` with ``languages`` are. Passing the returned
+        ``version_token`` as ``if_none_match`` returns just ``not_modified``
+        while the page hasn't changed.
+        """
         if not VERSIONING_ENABLED:
             return {'error': 'Versioning is not enabled'}
+        if limit is not None and limit < 1:
+            return {'error': 'limit must be at least 1'}
+
+        token = _get_version_token(Page.objects.filter(pk=page_id), language, params=(limit, cursor))
+        if if_none_match == token:
+            return _get_not_modified(token)
 
         try:
             page = Page.objects.get(pk=page_id)
-            versions = Version.objects.filter(content_object=page).order_by('-created')
+            versions = Version.objects.filter(cms_pagecontent__page=page)
+            if language:
+                versions = versions.filter(cms_pagecontent__language=language)
+            rows, next_cursor = _get_version_history(versions, limit, cursor)
 
             versions_data = []
-            for version in versions:
+            for row in rows:
                 versions_data.append({
-                    'id': version.pk,
-                    'number': version.number,
-                    'state': version.state,
-                    'created': version.created.isoformat(),
-                    'modified': version.modified.isoformat(),
-                    'created_by': version.created_by.username if version.created_by else None,
-                    'is_current': version.state in [DRAFT, PUBLISHED],
+                    'id': row['pk'],
+                    'number': row['number'],
+                    'state': row['state'],
+                    'created': row['created'].isoformat(),
+                    'modified': row['modified'].isoformat(),
+                    'created_by': row['created_by__username'],
+                    'is_current': row['state'] in [DRAFT, PUBLISHED],
                 })
 
+            if next_cursor or cursor:
+                total_versions = versions.count()
+            else:
+                total_versions = len(versions_data)
             return {
                 'page_id': page_id,
+                'language': language,
                 'versions': versions_data,
-                'total_versions': len(versions_data),
+                'total_versions': total_versions,
+                'next_cursor': next_cursor,
+                'version_token': token,
             }
 
         except Page.DoesNotExist:
@@ -461,21 +1359,29 @@ class DjangoCMSVersioningTools(MCPToolset):
         if not VERSIONING_ENABLED:
             return {'error': 'Versioning is not enabled'}
 
+        user = self._get_user()
+        if user is None:
+            return {'error': 'Archiving requires an authenticated user'}
+
         try:
             version = Version.objects.get(pk=version_id)
 
             if version.state == ARCHIVED:
                 return {'error': f'Version {version_id} is already archived'}
 
-            # Archive the version
-            version.state = ARCHIVED
-            version.save()
+            try:
+                version.check_archive(user)
+            except ConditionFailed as e:
+                return {'error': f'Version {version_id} can not be archived: {e}'}
+
+            with transaction.atomic():
+                version.archive(user)
 
             return {
                 'success': True,
                 'version_id': version.pk,
                 'new_state': version.state,
-                'page_id': version.content_object.pk,
+                'page_id': getattr(version.content, 'page_id', None),
             }
 
         except Version.DoesNotExist:
@@ -502,6 +1408,72 @@ class DjangoCMSVersioningTools(MCPToolset):
 
         return {'templates': template_list}
 
+    def add_plugins(
+        self,
+        placeholder_id: int,
+        plugins: List[Dict[str, Any]],
+        language: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Append many plugins to a placeholder in one transaction
+
+        ``plugins`` lists ``{'plugin_type': ..., 'data': {...}}`` where
+        ``data`` holds values of the plugin model's fields, relations by
+        their id. Plugins are added in order at the end of the placeholder.
+        At most ``MAX_PLUGINS_PER_REQUEST`` plugins can be added per call and
+        the placeholder's plugin limits apply. With djangocms-versioning the
+        placeholder must belong to a draft the user can modify.
+        """
+        if not language:
+            language = settings.LANGUAGE_CODE
+
+        if not isinstance(plugins, list) or not plugins:
+            return {'error': 'plugins must be a non-empty list'}
+        max_plugins = get_mcp_setting('MAX_PLUGINS_PER_REQUEST')
+        if len(plugins) > max_plugins:
+            return {'error': f'Too many plugins: {len(plugins)}, at most {max_plugins} can be added at once'}
+
+        try:
+            instances = [_build_plugin(spec) for spec in plugins]
+        except ValueError as e:
+            return {'error': str(e)}
+
+        try:
+            placeholder = Placeholder.objects.get(pk=placeholder_id)
+        except Placeholder.DoesNotExist:
+            return {'error': f'Placeholder with id {placeholder_id} not found'}
+
+        if VERSIONING_ENABLED and isinstance(placeholder.source, PageContent):
+            user = self._get_user()
+            if user is None:
+                return {'error': 'Adding plugins to versioned pages requires an authenticated user'}
+            try:
+                Version.objects.get_for_content(placeholder.source).check_modify(user)
+            except (Version.DoesNotExist, ConditionFailed) as e:
+                return {'error': f'Placeholder {placeholder_id} can not be edited: {e}'}
+
+        counts, position = get_placeholder_plugin_counts(placeholder, language)
+        try:
+            _check_plugin_limits(placeholder, instances, counts)
+        except ValueError as e:
+            return {'error': str(e)}
+
+        try:
+            insert_plugins(placeholder, language, instances, position, versioning=VERSIONING_ENABLED)
+        except Exception as e:
+            logger.error(f"Error adding plugins: {e}")
+            return {'error': str(e)}
+
+        return {
+            'success': True,
+            'placeholder_id': placeholder.pk,
+            'language': language,
+            'plugins': [
+                {'id': plugin.pk, 'plugin_type': plugin.plugin_type, 'position': plugin.position}
+                for plugin in instances
+            ],
+            'count': len(instances),
+        }
+
     def list_plugin_types(self) -> Dict[str, Any]:
         """Get available plugin types in Django CMS"""
         plugins = []
@@ -521,83 +1493,164 @@ class DjangoCMSVersioningTools(MCPToolset):
         query: str,
         language: Optional[str] = None,
         state: Optional[str] = None,
+        site_id: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fuzzy: bool = False,
     ) -> Dict[str, Any]:
-        """Search pages by title with versioning support"""
+        """Search pages by title, slug, meta description and plugin text
+
+        Results are ranked by relevance and returned ``limit`` at a time from
+        ``offset``; ``total`` is the number of matching pages. ``limit`` is
+        capped by the ``MAX_SEARCH_RESULTS`` setting. ``fields`` limits the
+        attributes computed for each result.
+
+        With ``fuzzy`` only titles are searched, tolerating typos: ``rank`` is
+        the trigram similarity of the title to the query and ``total`` is not
+        computed.
+        """
         if not language:
             language = settings.LANGUAGE_CODE
+        if not site_id:
+            site_id = settings.SITE_ID
+        limit = _get_search_limit(limit)
+        offset = max(offset or 0, 0)
 
-        if VERSIONING_ENABLED:
-            # Search in versioned content
-            try:
-                # Get pages with versions using a compatible approach
-                from djangocms_versioning.models import Version
-                versioned_page_ids = Version.objects.values_list('content_object_id', flat=True).distinct()
-                pages = Page.objects.filter(id__in=versioned_page_ids).distinct()
-            except Exception:
-                # Fallback if version filtering fails
-                pages = Page.objects.all()
-
-            if state:
-                # Filter by version state
-                versioned_page_ids_with_state = Version.objects.filter(state=state).values_list('content_object_id', flat=True).distinct()
-                pages = pages.filter(id__in=versioned_page_ids_with_state)
-
-            # Search in titles
-            title_matches = pages.filter(
-                title_set__title__icontains=query,
-                title_set__language=language
-            ).distinct()
-
-            results = []
-            for page in title_matches:
-                # Get the version info
-                version_qs = Version.objects.filter(content_object=page)
-                if state:
-                    version_qs = version_qs.filter(state=state)
-
-                latest_version = version_qs.order_by('-pk').first()
-                if latest_version:
-                    results.append({
-                        'id': page.pk,
-                        'title': page.get_title(language=language),
-                        'slug': page.get_slug(language=language),
-                        'url': page.get_absolute_url(language=language) if latest_version.state == PUBLISHED else None,
-                        'version_id': latest_version.pk,
-                        'version_state': latest_version.state,
-                        'is_published': latest_version.state == PUBLISHED,
-                    })
+        try:
+            requested_fields = _get_requested_fields(fields, SEARCH_PAGES_FIELDS)
+        except ValueError as e:
+            return {'error': str(e)}
 
+        return get_cached_response(
+            'search_pages', site_id, language, state, (query, sorted(requested_fields), limit, offset, fuzzy),
+            lambda: self._search_pages(query, language, state, site_id, requested_fields, limit, offset, fuzzy),
+        )
+
+    def _search_pages(self, query, language, state, site_id, fields, limit, offset, fuzzy=False):
+        documents = PageSearchDocument.objects.filter(language=language, page__node__site_id=site_id)
+        if VERSIONING_ENABLED and state:
+            documents = documents.filter(Exists(Version.objects.filter(
+                cms_pagecontent__page=OuterRef('page'),
+                cms_pagecontent__language=language,
+                state=state,
+            )))
+        if fuzzy:
+            # Only the best offset + limit titles are ranked
+            scores = get_search_backend().fuzzy_search(documents, query, offset + limit)
+            scores = dict(scores[offset:])
+            titles = dict(documents.filter(page_id__in=scores).values_list('page_id', 'title'))
+            matches = [(page_id, titles.get(page_id), score) for page_id, score in scores.items()]
+            total = None
         else:
-            # Fallback to standard Django CMS
-            try:
-                pages = Page.objects.filter(publisher_is_draft=True)
-            except Exception:
-                # If old field doesn't exist, use all pages
-                pages = Page.objects.all()
-            
-            title_matches = pages.filter(
-                title_set__title__icontains=query,
-                title_set__language=language
-            ).distinct()
-
-            results = []
-            for page in title_matches:
-                results.append({
-                    'id': page.pk,
-                    'title': page.get_title(language=language),
-                    'slug': page.get_slug(language=language),
-                    'url': page.get_absolute_url(language=language),
-                    'is_published': page.is_published(language)
+            matches, total = get_search_backend().search(documents, query, limit, offset)
+            matches = [(document.page_id, document.title, rank) for document, rank, _snippet in matches]
+        documents = {page_id: (title, rank) for page_id, title, rank in matches}
+
+        pages_qs = Page.objects.filter(pk__in=documents)
+        if VERSIONING_ENABLED:
+            pages_qs = _annotate_latest_version(pages_qs, language, state, fields)
+        pages = {page.pk: page for page in pages_qs.select_related('node').only(*_get_page_columns(fields))}
+        if fields & {'slug', 'url'}:
+            _prefetch_page_urls(pages_qs, list(pages.values()), [language])
+
+        results = []
+        for page_id, (title, rank) in documents.items():
+            page = pages.get(page_id)
+            if page is None:
+                continue
+
+            result = {
+                'id': page.pk,
+                'title': title,
+                'slug': page.get_slug(language=language) if 'slug' in fields else None,
+                'rank': rank,
+            }
+            if VERSIONING_ENABLED:
+                if not page.latest_version_id:
+                    continue
+                version_state = getattr(page, 'latest_version_state', None)
+                is_published = version_state == PUBLISHED
+                result.update({
+                    'url': page.get_absolute_url(language=language) if is_published and 'url' in fields else None,
+                    'version_id': page.latest_version_id,
+                    'version_state': version_state,
+                    'is_published': is_published,
+                })
+            else:
+                # Fallback to standard Django CMS
+                result.update({
+                    'url': page.get_absolute_url(language=language) if 'url' in fields else None,
+                    'is_published': page.is_published(language) if hasattr(page, 'is_published') else False,
                 })
+            results.append({key: value for key, value in result.items() if key in fields})
 
         return {
             'results': results,
             'count': len(results),
+            'total': total,
+            'limit': limit,
+            'offset': offset,
             'query': query,
             'versioning_enabled': VERSIONING_ENABLED,
             'state_filter': state,
         }
 
+    def search_content(
+        self,
+        query: str,
+        language: Optional[str] = None,
+        site_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Search the text inside plugins, such as the body of text plugins
+
+        Returns the best matching plugins with their page, placeholder slot
+        and a snippet with the matches highlighted. ``limit`` is capped by the
+        ``MAX_SEARCH_RESULTS`` setting.
+        """
+        if not language:
+            language = settings.LANGUAGE_CODE
+        if not site_id:
+            site_id = settings.SITE_ID
+        limit = _get_search_limit(limit)
+
+        return get_cached_response(
+            'search_content', site_id, language, None, (query, limit),
+            lambda: self._search_content(query, language, site_id, limit),
+        )
+
+    def _search_content(self, query, language, site_id, limit):
+        documents = PluginSearchDocument.objects.filter(language=language, page__node__site_id=site_id)
+        matches, _total = get_search_backend(PluginSearchDocument).search(
+            documents, query, limit, snippet_field='text', count=False,
+        )
+        titles = dict(
+            PageSearchDocument.objects.filter(
+                page__in=[document.page_id for document, _rank, _snippet in matches],
+                language=language,
+            ).values_list('page_id', 'title')
+        )
+
+        results = [
+            {
+                'page_id': document.page_id,
+                'page_title': titles.get(document.page_id),
+                'slot': document.slot,
+                'plugin_id': document.plugin_id,
+                'plugin_type': document.plugin_type,
+                'snippet': snippet,
+                'rank': rank,
+            }
+            for document, rank, snippet in matches
+        ]
+        return {
+            'results': results,
+            'count': len(results),
+            'query': query,
+            'language': language,
+        }
+
     def get_languages(self) -> Dict[str, Any]:
         """Get configured languages for the CMS"""
         return dict(
@@ -624,8 +1677,169 @@ class DjangoCMSVersioningTools(MCPToolset):
             }
         }
 
+    def get_server_metrics(self) -> Dict[str, Any]:
+        """Get the call count, wall time, database queries and time and response size of each tool
+
+        The counters are totals since ``since`` for this server process.
+        """
+        return {
+            'tools': get_metrics(),
+            'since': datetime.fromtimestamp(get_metrics_since(), tz=timezone.utc).isoformat(),
+            'metrics_enabled': get_mcp_setting('METRICS_ENABLED'),
+        }
+
+    def _get_user(self):
+        """Return the authenticated user of the MCP request, if any"""
+        user = getattr(self.request, 'user', None)
+        return user if user is not None and user.is_authenticated else None
+
+    def _serialize_page_detail(self, page, language, content, version=None, fields=PAGE_DETAIL_FIELDS):
+        """Serialize the page fields shared by the page detail tools"""
+        result = {
+            'id': page.pk,
+            'language': language
+        }
+        slug = page.get_slug(language=language) if 'slug' in fields else None
+        if version:
+            result.update({
+                'version_id': version.pk,
+                'version_state': version.state,
+                'version_number': version.number,
+                'is_published': version.state == PUBLISHED,
+                'is_draft': version.state == DRAFT,
+                'is_archived': version.state == ARCHIVED,
+                'created_by': version.created_by.username if 'created_by' in fields and version.created_by else None,
+                'created': version.created.isoformat(),
+                'modified': version.modified.isoformat(),
+                'title': content.title,
+                'slug': slug,
+                'meta_description': content.meta_description,
+                'template': content.template,
+            })
+        else:
+            result.update({
+                'title': content.title if content else None,
+                'slug': slug,
+                'meta_description': content.meta_description if content else None,
+                'template': content.template if content else None,
+                'is_published': page.is_published(language) if hasattr(page, 'is_published') else False,
+                'creation_date': page.creation_date.isoformat(),
+                'changed_date': page.changed_date.isoformat(),
+            })
+        return {key: value for key, value in result.items() if key in fields}
+
+    def _serialize_page_detail_languages(self, page, languages, fields):
+        """Map each of ``languages`` to the detail of the latest content of ``page`` in it
+
+        The versions, contents, urls, placeholders and plugins of all the
+        languages are each loaded with one query.
+        """
+        languages = list(dict.fromkeys(languages))
+        if 'slug' in fields:
+            _prefetch_page_urls(Page.objects.filter(pk=page.pk), [page], languages)
+
+        latest_versions = {}
+        all_versions = {}
+        if VERSIONING_ENABLED:
+            versions = Version.objects.filter(cms_pagecontent__page=page, cms_pagecontent__language__in=languages)
+            latest = _rank_versions(versions, F('cms_pagecontent__language')).filter(recency=1).annotate(
+                language=F('cms_pagecontent__language'),
+            )
+            if 'created_by' in fields:
+                latest = latest.select_related('created_by')
+            latest_versions = {version.language: version for version in latest}
+            if 'all_versions' in fields:
+                all_versions = _get_version_histories(versions, F('cms_pagecontent__language'))
+            contents_qs = PageContent.admin_manager.filter(
+                pk__in=[version.object_id for version in latest_versions.values()],
+            )
+        else:
+            contents_qs = PageContent.admin_manager.filter(page=page, language__in=languages)
+        contents = {content.language: content for content in contents_qs}
+
+        placeholders = {}
+        plugins_data = {}
+        if 'placeholders' in fields:
+            placeholders_qs = Placeholder.objects.filter(
+                content_type=ContentType.objects.get_for_model(PageContent),
+                object_id__in=[content.pk for content in contents.values()],
+            )
+            for placeholder in placeholders_qs:
+                placeholders.setdefault(placeholder.object_id, []).append(placeholder)
+            plugins_data = self._get_plugins_data(
+                [placeholder for group in placeholders.values() for placeholder in group], languages,
+            )
+
+        results = {}
+        for language in languages:
+            content = contents.get(language)
+            if VERSIONING_ENABLED:
+                version = latest_versions.get(language)
+                if not version:
+                    results[language] = {'error': f'No versions found for page {page.pk} in {language}'}
+                    continue
+                result = self._serialize_page_detail(page, language, content, version, fields)
+                if 'all_versions' in fields:
+                    rows, next_cursor = all_versions.get(language, ([], None))
+                    result['all_versions'] = [_serialize_version_row(row) for row in rows]
+                    result['all_versions_next_cursor'] = next_cursor
+            else:
+                result = self._serialize_page_detail(page, language, content, fields=fields)
+
+            if 'placeholders' in fields:
+                result['placeholders'] = [
+                    {
+                        'slot': placeholder.slot,
+                        'plugins': plugins_data.get(placeholder.pk, [])
+                    }
+                    for placeholder in placeholders.get(content.pk if content else None, [])
+                ]
+            results[language] = result
+        return results
+
+    def _serialize_placeholders(self, placeholders, language):
+        """Serialize placeholders with their plugins for ``language``"""
+        plugins_data = self._get_plugins_data(placeholders, [language])
+        return [
+            {
+                'slot': placeholder.slot,
+                'plugins': plugins_data.get(placeholder.pk, [])
+            }
+            for placeholder in placeholders
+        ]
+
+    def _get_plugins_data(self, placeholders, languages):
+        """Map placeholder id to its serialized plugins in ``languages``
+
+        The plugins of all placeholders are loaded with one query and then
+        downcast with one query per plugin model, instead of one query per
+        plugin.
+        """
+        plugins = list(
+            CMSPlugin.objects.filter(placeholder__in=placeholders, language__in=languages).order_by('position')
+        )
+        instances = {instance.pk: instance for instance in downcast_plugins(plugins, placeholders)}
+
+        plugins_data = {}
+        for plugin in plugins:
+            plugin_instance = instances.get(plugin.pk)
+            if plugin_instance:
+                plugins_data.setdefault(plugin.placeholder_id, []).append({
+                    'id': plugin.pk,
+                    'plugin_type': plugin.plugin_type,
+                    'position': plugin.position,
+                    'data': self._serialize_plugin(plugin_instance)
+                })
+        return plugins_data
+
     def _serialize_plugin(self, plugin_instance):
         """Serialize plugin instance data"""
+        if isinstance(plugin_instance, models.Model):
+            return _get_plugin_serializer(type(plugin_instance))(plugin_instance)
+        return self._serialize_plugin_fields(plugin_instance)
+
+    def _serialize_plugin_fields(self, plugin_instance):
+        """Serialize plugin data by introspecting the fields of the instance"""
         data = {}
         if plugin_instance and hasattr(plugin_instance, '_meta'):
             for field in plugin_instance._meta.fields:
@@ -645,10 +1859,5 @@ class DjangoCMSVersioningTools(MCPToolset):
                     if isinstance(field_name, str):
                         value = getattr(plugin_instance, field_name, None)
                         if value is not None:
-                            if hasattr(value, 'isoformat'):  # datetime
-                                data[field_name] = value.isoformat()
-                            elif hasattr(value, 'url'):  # file/image fields
-                                data[field_name] = value.url
-                            else:
-                                data[field_name] = str(value)
+                            data[field_name] = _convert_plugin_value(value)
         return data
@@ -0,0 +1,243 @@
+"""
+Per-tool metrics
+
+Each MCP tool call is counted with its wall time, the number and time of
+its database queries and the size of its JSON response. The counters are
+kept per process and updating them costs a wrapper around each query and a
+few additions under a lock per call, so they can stay on in production.
+Responses are measured where the MCP server turns them into JSON text, so
+they are never serialized a second time; calls made from Python, outside
+the MCP server, add no response size.
+They are read with the ``get_server_metrics`` tool and, in the Prometheus
+text format, from ``MetricsView``.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import ExitStack
+from typing import ClassVar
+
+from django.db import connections
+from django.db.models import QuerySet
+
+from .budgets import enforce_query_budget
+from .conf import get_mcp_setting
+from .profiling import is_profiling, profile_call
+
+
+# Counters kept for each tool, with their Prometheus name and help
+METRICS = (
+    ('calls', 'djangocms_mcp_tool_calls_total', 'Number of calls of the tool'),
+    ('errors', 'djangocms_mcp_tool_errors_total', 'Number of calls that raised or returned an error'),
+    ('wall_time', 'djangocms_mcp_tool_seconds_total', 'Wall time spent in the tool'),
+    ('db_queries', 'djangocms_mcp_tool_db_queries_total', 'Number of database queries of the tool'),
+    ('db_time', 'djangocms_mcp_tool_db_seconds_total', 'Time spent in the database queries of the tool'),
+    ('response_bytes', 'djangocms_mcp_tool_response_bytes_total', 'Size of the JSON responses the MCP server sent'),
+)
+
+_metrics = {}
+_lock = threading.Lock()
+_since = time.time()
+
+
+class QueryTimer:
+    """Database execute wrapper counting the queries and the time spent in them"""
+
+    def __init__(self):
+        self.queries = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.queries += 1
+
+
+def _get_counters(name):
+    # Called with the lock held
+    counters = _metrics.get(name)
+    if counters is None:
+        counters = _metrics[name] = dict.fromkeys((field for field, _name, _help in METRICS), 0)
+    return counters
+
+
+def record(name, wall_time, db_queries=0, db_time=0.0, response_bytes=0, error=False):
+    """Add a call of tool ``name`` to its counters"""
+    with _lock:
+        counters = _get_counters(name)
+        counters['calls'] += 1
+        counters['errors'] += int(error)
+        counters['wall_time'] += wall_time
+        counters['db_queries'] += db_queries
+        counters['db_time'] += db_time
+        counters['response_bytes'] += response_bytes
+
+
+def record_response(name, response_bytes):
+    """Add the size of a response of tool ``name`` to its counters"""
+    with _lock:
+        _get_counters(name)['response_bytes'] += response_bytes
+
+
+def measure(name, func, *args, **kwargs):
+    """Call ``func`` and record the call as one of tool ``name``
+
+    The queries are counted on all the database connections of the thread
+    the call runs in.
+    """
+    if not get_mcp_setting('METRICS_ENABLED'):
+        return func(*args, **kwargs)
+
+    timer = QueryTimer()
+    start = time.perf_counter()
+    result = None
+    error = True
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            result = func(*args, **kwargs)
+        error = isinstance(result, dict) and 'error' in result
+        return result
+    finally:
+        record(name, time.perf_counter() - start, timer.queries, timer.time, error=error)
+
+
+def measure_tools(cls):
+    """Class decorator recording the calls of the public methods of a toolset
+
+    The calls are also held to their ``QUERY_BUDGETS`` and the methods get a
+    ``profile`` argument, which profiles the call like ``DEBUG_MODE``.
+    """
+    for name, method in list(vars(cls).items()):
+        if inspect.isfunction(method) and not name.startswith('_'):
+            setattr(cls, name, _get_measured_method(name, method))
+    return cls
+
+
+def _get_measured_method(name, method):
+    def call(*args, **kwargs):
+        return measure(name, enforce_query_budget, name, method, *args, **kwargs)
+
+    @functools.wraps(method)
+    def measured(*args, profile=False, **kwargs):
+        if is_profiling(profile):
+            return profile_call(name, call, *args, **kwargs)
+        return call(*args, **kwargs)
+
+    # The MCP tools take their parameters from the signature
+    signature = inspect.signature(method)
+    measured.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter('profile', inspect.Parameter.KEYWORD_ONLY, default=False, annotation=bool),
+    ])
+    return measured
+
+
+def _get_content_size(content):
+    """Return the size of the text blocks of a tool result converted by FastMCP"""
+    if isinstance(content, tuple):
+        # The text blocks and the structured content they were made from
+        content = content[0]
+    content = getattr(content, 'content', content)
+    return sum(len(block.text.encode()) for block in content if getattr(block, 'type', None) == 'text')
+
+
+class MeasuredFuncMetadataMixin:
+    """Record the size of the JSON text FastMCP makes of each result of tool ``metrics_name``"""
+
+    def convert_result(self, result):
+        content = super().convert_result(result)
+        if get_mcp_setting('METRICS_ENABLED'):
+            record_response(self.metrics_name, _get_content_size(content))
+        return content
+
+
+@functools.lru_cache(maxsize=None)
+def _get_measured_metadata_class(metadata_class, name):
+    return type(metadata_class.__name__, (MeasuredFuncMetadataMixin, metadata_class), {
+        '__annotations__': {'metrics_name': ClassVar[str]},
+        'metrics_name': name,
+    })
+
+
+def measure_tool_responses(tool):
+    """Record the size of the responses of an MCP tool where FastMCP serializes them"""
+    metadata = tool.fn_metadata
+    metadata.__class__ = _get_measured_metadata_class(type(metadata), tool.name)
+
+
+class MeasuredQuerySetMixin:
+    """Record each evaluation of a queryset as a call of ``metrics_name``"""
+
+    metrics_name = None
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            measure(self.metrics_name, self._fetch_results)
+        super()._fetch_all()
+
+    def _fetch_results(self):
+        super()._fetch_all()
+        return self._result_cache
+
+
+@functools.lru_cache(maxsize=None)
+def _get_measured_queryset_class(queryset_class, name):
+    # The name is kept on the class, which the clones of a queryset share
+    return type(queryset_class.__name__, (MeasuredQuerySetMixin, queryset_class), {'metrics_name': name})
+
+
+def measure_query_toolset(cls):
+    """Class decorator recording the evaluations of the queryset of a ``ModelQueryToolset``
+
+    ``ModelQueryToolset`` returns the rows of its queryset to the MCP query
+    tool, so each evaluation counts as a call named after the toolset.
+    """
+    get_queryset = cls.get_queryset
+
+    @functools.wraps(get_queryset)
+    def measured_get_queryset(self):
+        queryset = get_queryset(self)
+        if isinstance(queryset, QuerySet):
+            queryset = queryset.all()
+            queryset.__class__ = _get_measured_queryset_class(type(queryset), cls.__name__)
+        return queryset
+
+    cls.get_queryset = measured_get_queryset
+    return cls
+
+
+def get_metrics():
+    """Return a copy of the counters of each tool"""
+    with _lock:
+        return {name: dict(counters) for name, counters in sorted(_metrics.items())}
+
+
+def get_metrics_since():
+    """Return the time the counters started at, as a timestamp"""
+    return _since
+
+
+def reset_metrics():
+    """Reset the counters of all tools"""
+    global _since
+    with _lock:
+        _metrics.clear()
+        _since = time.time()
+
+
+def render_prometheus():
+    """Return the counters in the Prometheus text exposition format"""
+    metrics = get_metrics()
+    lines = []
+    for field, metric, help_text in METRICS:
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for name, counters in metrics.items():
+            lines.append(f'{metric}{{tool="{name}"}} {counters[field]}')
+    return '\n'.join(lines) + '\n'
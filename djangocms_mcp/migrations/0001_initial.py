@@ -0,0 +1,44 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:32
+
+import django.db.models.deletion
+import djangocms_mcp.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cms', '0034_remove_pagecontent_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MCPServerPlugin',
+            fields=[
+                ('cmsplugin_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, related_name='%(app_label)s_%(class)s', serialize=False, to='cms.cmsplugin')),
+                ('title', models.CharField(default='MCP Server', max_length=200)),
+                ('description', models.TextField(blank=True, help_text='Description of MCP server functionality')),
+                ('enabled', models.BooleanField(default=True, help_text='Enable/disable MCP server')),
+            ],
+            bases=('cms.cmsplugin',),
+        ),
+        migrations.CreateModel(
+            name='PageSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=15)),
+                ('title', models.CharField(max_length=255)),
+                ('slug', models.CharField(blank=True, max_length=255)),
+                ('meta_description', models.TextField(blank=True)),
+                ('text', models.TextField(blank=True, help_text="Text of the page's plugins, without markup")),
+                ('search_vector', djangocms_mcp.models.SearchVectorField(editable=False, null=True)),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='cms.page')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='pagesearchdocument',
+            constraint=models.UniqueConstraint(fields=('page', 'language'), name='djangocms_mcp_unique_page_document'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:39
+
+import django.db.models.deletion
+import djangocms_mcp.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0034_remove_pagecontent_placeholders'),
+        ('djangocms_mcp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PluginSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=15)),
+                ('slot', models.CharField(max_length=255)),
+                ('plugin_type', models.CharField(max_length=50)),
+                ('text', models.TextField(help_text='Text of the plugin, without markup')),
+                ('search_vector', djangocms_mcp.models.SearchVectorField(editable=False, null=True)),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='cms.page')),
+                ('plugin', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='cms.cmsplugin')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['page', 'language'], name='djangocms_mcp_plugin_doc_page')],
+            },
+        ),
+    ]
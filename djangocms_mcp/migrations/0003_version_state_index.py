@@ -0,0 +1,29 @@
+from django.apps import apps as global_apps
+from django.db import migrations
+
+from djangocms_mcp.indexes import add_version_state_index, remove_version_state_index
+
+
+def add_index(apps, schema_editor):
+    add_version_state_index(schema_editor)
+
+
+def remove_index(apps, schema_editor):
+    remove_version_state_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangocms_mcp', '0002_plugin_search_document'),
+    ]
+    if global_apps.is_installed('djangocms_versioning'):
+        # The migration adding the state of versions. The index is outside
+        # the migration state of djangocms-versioning, so when one of its
+        # later migrations rebuilds the table on SQLite, the post_migrate
+        # receiver of djangocms_mcp.indexes adds it back.
+        dependencies.append(('djangocms_versioning', '0004_auto_20180730_1135'))
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-17 10:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangocms_mcp', '0003_version_state_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagesearchdocument',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -1,7 +1,22 @@
+from django.contrib.postgres import search
 from django.db import models
 from django.core.exceptions import ValidationError
 from cms.models import CMSPlugin
 
+
+class SearchVectorField(search.SearchVectorField):
+    """``tsvector`` column on PostgreSQL and an unused text column elsewhere
+
+    Only PostgreSQL has the type, and a column must exist on every database
+    as the field is loaded and saved with the rest of the document.
+    """
+
+    def db_type(self, connection):
+        if connection.vendor == 'postgresql':
+            return super().db_type(connection)
+        return models.TextField().db_type(connection)
+
+
 class MCPServerPlugin(CMSPlugin):
     """Plugin to enable MCP server functionality in Django CMS"""
     title = models.CharField(max_length=200, default="MCP Server")
@@ -21,3 +36,45 @@ class MCPServerPlugin(CMSPlugin):
 
     def __str__(self):
         return self.title
+
+
+class PageSearchDocument(models.Model):
+    """Searchable text of a page in one language, kept up to date by signals"""
+    page = models.ForeignKey('cms.Page', on_delete=models.CASCADE, related_name='+')
+    language = models.CharField(max_length=15)
+    title = models.CharField(max_length=255)
+    slug = models.CharField(max_length=255, blank=True)
+    meta_description = models.TextField(blank=True)
+    text = models.TextField(blank=True, help_text="Text of the page's plugins, without markup")
+    # Only filled on PostgreSQL, where it carries the GIN index
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Tells the in-process trigram indexes of the titles they are out of date
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['page', 'language'], name='djangocms_mcp_unique_page_document'),
+        ]
+
+    def __str__(self):
+        return f'{self.title} ({self.language})'
+
+
+class PluginSearchDocument(models.Model):
+    """Searchable text of a plugin on a page, kept up to date by signals"""
+    plugin = models.OneToOneField(CMSPlugin, on_delete=models.CASCADE, related_name='+')
+    page = models.ForeignKey('cms.Page', on_delete=models.CASCADE, related_name='+')
+    language = models.CharField(max_length=15)
+    slot = models.CharField(max_length=255)
+    plugin_type = models.CharField(max_length=50)
+    text = models.TextField(help_text="Text of the plugin, without markup")
+    # Only filled on PostgreSQL, where it carries the GIN index
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['page', 'language'], name='djangocms_mcp_plugin_doc_page'),
+        ]
+
+    def __str__(self):
+        return f'{self.plugin_type} {self.plugin_id} ({self.language})'
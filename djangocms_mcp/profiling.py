@@ -0,0 +1,167 @@
+"""
+Profiling dumps of tool calls
+
+With the ``DEBUG_MODE`` setting on, or when a call passes ``profile=True``,
+the tool runs under cProfile with its SQL captured. Each call leaves a
+directory in ``PROFILE_DIR`` holding the profile as ``profile.pstats``, for
+``python -m pstats`` or any viewer of that format, a summary of it in
+``profile.txt`` and the timings and queries of the call in ``call.json``.
+The response of the call gets a ``profile_dump`` key with the path of the
+directory.
+
+The dumps contain the arguments and the SQL parameters of the calls, so
+the directory should be no more readable than the database. Nothing is
+profiled until ``PROFILE_DIR`` is set, and the directories are created
+readable by their owner only.
+
+cProfile can only profile one call of a process at a time from Python 3.12
+on, so a call made while another is profiled runs without a profile.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.utils import timezone
+
+from .conf import get_mcp_setting
+
+
+logger = logging.getLogger(__name__)
+
+# Functions listed in profile.txt, by cumulative time
+PROFILE_SUMMARY_LIMIT = 50
+
+# Held while a call is profiled
+_profile_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """Database execute wrapper recording each query with its parameters and time"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'database': context['connection'].alias,
+                'sql': sql,
+                'params': params,
+                'many': many,
+                'time': time.perf_counter() - start,
+            })
+
+
+class DumpEncoder(DjangoJSONEncoder):
+    """JSON encoder falling back to ``repr`` for values JSON has no type for"""
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return repr(o)
+
+
+def get_profile_dir():
+    """Return the directory of the profiling dumps, None when it isn't set"""
+    return get_mcp_setting('PROFILE_DIR') or None
+
+
+def is_profiling(profile=False):
+    """Return whether a call asking for ``profile`` is profiled"""
+    return bool(profile or get_mcp_setting('DEBUG_MODE'))
+
+
+def _write_dump(profile_dir, name, started, profiler, recorder, wall_time, arguments, error):
+    os.makedirs(profile_dir, mode=0o700, exist_ok=True)
+    path = os.path.join(profile_dir, f'{started:%Y%m%d-%H%M%S}-{name}-{uuid.uuid4().hex[:8]}')
+    os.mkdir(path, mode=0o700)
+    profiler.dump_stats(os.path.join(path, 'profile.pstats'))
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_SUMMARY_LIMIT)
+    with open(os.path.join(path, 'profile.txt'), 'w') as f:
+        f.write(summary.getvalue())
+
+    with open(os.path.join(path, 'call.json'), 'w') as f:
+        json.dump({
+            'tool': name,
+            'started': started,
+            'arguments': arguments,
+            'wall_time': wall_time,
+            'db_queries': len(recorder.queries),
+            'db_time': sum(query['time'] for query in recorder.queries),
+            'error': error,
+            'queries': recorder.queries,
+        }, f, cls=DumpEncoder, indent=2)
+    return path
+
+
+def profile_call(name, func, *args, **kwargs):
+    """Call tool ``name`` through ``func`` under cProfile and dump the profile, SQL and timings
+
+    ``func`` takes the arguments of the toolset method, of which those after
+    the instance are recorded. A call that raises is dumped too. Without
+    ``PROFILE_DIR``, or while another call is profiled, ``func`` is called
+    without a profile.
+    """
+    profile_dir = get_profile_dir()
+    if profile_dir is None:
+        logger.warning(f'Not profiling {name}: the PROFILE_DIR setting is not set')
+        return func(*args, **kwargs)
+    if not _profile_lock.acquire(blocking=False):
+        logger.info(f'Not profiling {name}: another call is being profiled')
+        return func(*args, **kwargs)
+    try:
+        profiler = cProfile.Profile()
+        # Check no other profiler, such as a debugger's, is active
+        try:
+            profiler.enable()
+        except ValueError as e:
+            logger.info(f'Not profiling {name}: {e}')
+            return func(*args, **kwargs)
+        profiler.disable()
+        return _profile_call(profile_dir, profiler, name, func, *args, **kwargs)
+    finally:
+        _profile_lock.release()
+
+
+def _profile_call(profile_dir, profiler, name, func, *args, **kwargs):
+    recorder = QueryRecorder()
+    started = timezone.now()
+    start = time.perf_counter()
+    result = None
+    error = 'The call raised an exception'
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            result = profiler.runcall(func, *args, **kwargs)
+        error = result.get('error') if isinstance(result, dict) else None
+    finally:
+        wall_time = time.perf_counter() - start
+        try:
+            path = _write_dump(
+                profile_dir, name, started, profiler, recorder, wall_time, {'args': args[1:], 'kwargs': kwargs}, error,
+            )
+        except OSError as e:
+            logger.error(f'Error writing the profile of {name}: {e}')
+            path = None
+        else:
+            logger.info(f'Profile of {name} written to {path}')
+
+    if isinstance(result, dict) and path is not None:
+        result = {**result, 'profile_dump': path}
+    return result
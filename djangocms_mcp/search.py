@@ -0,0 +1,537 @@
+"""
+Full-text search index of pages and plugins
+
+Each page gets one ``PageSearchDocument`` per language holding the title,
+slug, meta description and the text of its plugins, and one
+``PluginSearchDocument`` per plugin with text. Documents are updated from
+save and delete signals once the transaction commits, so a page is indexed
+at most once per transaction however many of its objects changed.
+
+The documents are searched by the backend matching the database:
+PostgreSQL uses a GIN-indexed ``tsvector``, SQLite an FTS5 table kept in
+sync by triggers, and other databases fall back to ``icontains`` lookups.
+"""
+import heapq
+import html
+import logging
+import re
+import threading
+from functools import lru_cache
+
+from cms.models import CMSPlugin, Page, PageContent, PageUrl, Placeholder
+from cms.utils.plugins import downcast_plugins
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, connections, models, transaction
+from django.db.models import Count, F, Max, Q
+from django.utils.html import strip_tags
+
+from .cache import invalidate
+from .models import PageSearchDocument, PluginSearchDocument
+
+
+logger = logging.getLogger(__name__)
+
+# Indexed fields of the search documents and their weight, from A (highest) to D
+SEARCH_FIELDS = {
+    PageSearchDocument: (
+        ('title', 'A'),
+        ('slug', 'A'),
+        ('meta_description', 'B'),
+        ('text', 'C'),
+    ),
+    PluginSearchDocument: (
+        ('text', 'A'),
+    ),
+}
+
+# Minimum trigram similarity of fuzzy matches, the default of pg_trgm
+FUZZY_THRESHOLD = 0.3
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+# Number of words around the matches in a snippet
+SNIPPET_WORDS = 16
+
+_pending = threading.local()
+
+# In-process trigram indexes by the documents they were built from
+_trigram_indexes = {}
+
+
+def get_search_terms(query):
+    """Split a search query into lower case words, ignoring any operators"""
+    return re.findall(r'\w+', query.lower())
+
+
+def get_trigrams(text):
+    """Return the set of trigrams of ``text`` the way pg_trgm extracts them"""
+    trigrams = set()
+    for word in re.findall(r'[^\W_]+', text.lower()):
+        padded = f'  {word} '
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to the titles containing them"""
+
+    def __init__(self, titles):
+        self.sizes = {}
+        self.postings = {}
+        for key, title in titles:
+            trigrams = get_trigrams(title)
+            self.sizes[key] = len(trigrams)
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, []).append(key)
+
+    def search(self, query, limit, threshold=FUZZY_THRESHOLD):
+        """Return the ``limit`` best ``(key, similarity)`` pairs, best first
+
+        Similarity is the number of shared trigrams divided by the number of
+        trigrams in either, as in pg_trgm. Trigrams are counted from the
+        rarest to the most common, and no new candidates are admitted once
+        the ones held can't be beaten by a title matching only the trigrams
+        left; after that only the counts of the candidates are completed.
+        """
+        trigrams = sorted(
+            (trigram for trigram in get_trigrams(query) if trigram in self.postings),
+            key=lambda trigram: len(self.postings[trigram]),
+        )
+        query_size = len(get_trigrams(query))
+        if not query_size:
+            return []
+
+        shared = {}
+        admitting = True
+        for i, trigram in enumerate(trigrams):
+            if admitting and len(shared) >= limit:
+                # An unseen title shares at most the remaining trigrams
+                best_unseen = (len(trigrams) - i) / query_size
+                kth_best = heapq.nlargest(limit, (
+                    count / (query_size + self.sizes[key] - count) for key, count in shared.items()
+                ))[-1]
+                admitting = best_unseen > kth_best
+            for key in self.postings[trigram]:
+                if key in shared:
+                    shared[key] += 1
+                elif admitting:
+                    shared[key] = 1
+
+        scores = (
+            (key, count / (query_size + self.sizes[key] - count)) for key, count in shared.items()
+        )
+        return heapq.nlargest(
+            limit,
+            ((key, score) for key, score in scores if score >= threshold),
+            key=lambda item: (item[1], -item[0]),
+        )
+
+
+def get_trigram_index(documents):
+    """Return the trigram index of the titles of ``documents``
+
+    Indexes are kept in process and rebuilt when the number of documents or
+    the time the last of them was modified changes. These come from the
+    database, so every process sees the changes of the others whether or
+    not the responses are cached.
+    """
+    sql, params = documents.values('page_id', 'title').query.sql_with_params()
+    key = (documents.db, sql, params)
+    state = documents.aggregate(count=Count('pk'), modified=Max('modified'))
+    cached = _trigram_indexes.get(key)
+    if cached is None or cached[0] != state:
+        cached = (state, TrigramIndex(documents.values_list('page_id', 'title').iterator()))
+        _trigram_indexes[key] = cached
+    return cached[1]
+
+
+@lru_cache(maxsize=None)
+def _get_text_fields(model):
+    """Return the names of the text fields a plugin model adds to ``CMSPlugin``"""
+    base_fields = {field.name for field in CMSPlugin._meta.fields}
+    return tuple(
+        field.name for field in model._meta.concrete_fields
+        if isinstance(field, (models.CharField, models.TextField))
+        and field.name not in base_fields
+        and not field.choices
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_indexed_fields(model):
+    """Return the names of the fields of a plugin model whose changes affect the search documents"""
+    return {'placeholder', 'placeholder_id', 'language', 'position', 'plugin_type', *_get_text_fields(model)}
+
+
+def get_plugin_text(plugin_instance):
+    """Return the text content of a plugin with any markup stripped"""
+    values = (getattr(plugin_instance, name) for name in _get_text_fields(type(plugin_instance)))
+    text = ' '.join(html.unescape(strip_tags(value)) for value in values if value)
+    return ' '.join(text.split())
+
+
+def get_plugin_texts(placeholders, language):
+    """Return ``(plugin, text)`` for the plugins with text in ``placeholders``
+
+    Plugins are loaded with one query and downcast with one per plugin model.
+    """
+    plugins = CMSPlugin.objects.filter(placeholder__in=placeholders, language=language).order_by('position')
+    texts = ((plugin, get_plugin_text(plugin)) for plugin in downcast_plugins(plugins, placeholders))
+    return [(plugin, text) for plugin, text in texts if text]
+
+
+def update_page_document(page_id, language):
+    """Create, update or delete the search documents of a page's language
+
+    The latest content is indexed, the same one the page tools report.
+    """
+    PluginSearchDocument.objects.filter(page_id=page_id, language=language).delete()
+    # Filtered first: the arguments of latest_content only filter the
+    # outer query, leaving the subquery to group the versions of every page
+    content = PageContent.admin_manager.filter(page_id=page_id, language=language).latest_content().first()
+    if content is None:
+        PageSearchDocument.objects.filter(page_id=page_id, language=language).delete()
+        return
+
+    placeholders = {placeholder.pk: placeholder for placeholder in Placeholder.objects.get_for_obj(content)}
+    plugin_texts = get_plugin_texts(list(placeholders.values()), language)
+    slug = PageUrl.objects.filter(page_id=page_id, language=language).values_list('slug', flat=True).first()
+    PageSearchDocument.objects.update_or_create(
+        page_id=page_id,
+        language=language,
+        defaults={
+            'title': content.title,
+            'slug': slug or '',
+            'meta_description': content.meta_description or '',
+            'text': ' '.join(text for _plugin, text in plugin_texts),
+        },
+    )
+    PluginSearchDocument.objects.bulk_create([
+        PluginSearchDocument(
+            plugin_id=plugin.pk,
+            page_id=page_id,
+            language=language,
+            slot=placeholders[plugin.placeholder_id].slot,
+            plugin_type=plugin.plugin_type,
+            text=text,
+        )
+        for plugin, text in plugin_texts
+    ])
+
+    for model in SEARCH_FIELDS:
+        get_search_backend(model).update_documents(model.objects.filter(page_id=page_id, language=language))
+
+
+def rebuild_search_index(chunk_size=500):
+    """Index the latest content of every page and return the number of page documents"""
+    PageSearchDocument.objects.all().delete()
+    PluginSearchDocument.objects.all().delete()
+    contents = PageContent.admin_manager.latest_content().values_list('page_id', 'language')
+    count = 0
+    for page_id, language in contents.iterator(chunk_size=chunk_size):
+        update_page_document(page_id, language)
+        count += 1
+    return count
+
+
+def _flush_pending():
+    """Update the pending documents, logging any that fail
+
+    This runs after the commit, so an error would surface from the save
+    that already succeeded and skip the other pages and on_commit callbacks.
+    """
+    pending = getattr(_pending, 'pages', set())
+    _pending.pages = set()
+    for page_id, language in pending:
+        try:
+            with transaction.atomic():
+                update_page_document(page_id, language)
+        except Exception:
+            logger.exception(f'Could not update the search document of page {page_id} ({language})')
+        # Search responses include the indexed text, which any plugin
+        # change can affect, so the cache can't be relied on for them
+        site_id = Page.objects.filter(pk=page_id).values_list('node__site_id', flat=True).first()
+        if site_id is not None:
+            invalidate(site_id, language)
+
+
+def schedule_page_update(page_id, language):
+    """Update the search document of a page's language once the transaction commits"""
+    if not hasattr(_pending, 'pages'):
+        _pending.pages = set()
+    _pending.pages.add((page_id, language))
+    # Registered every time: after a rollback the earlier callback is gone
+    # while the page is still pending. Callbacks after the first are no-ops.
+    transaction.on_commit(_flush_pending)
+
+
+def _get_content_page_and_language(content_id):
+    content = PageContent.admin_manager.filter(pk=content_id).values('page_id', 'language').first()
+    return (content['page_id'], content['language']) if content else None
+
+
+def _get_page_and_language(instance):
+    """Find the page and language whose search document ``instance`` affects"""
+    if isinstance(instance, (PageContent, PageUrl)):
+        return instance.page_id, instance.language
+
+    if isinstance(instance, CMSPlugin):
+        # One query from the placeholder to the page content, if it is one
+        placeholders = Placeholder.objects.filter(
+            pk=instance.placeholder_id, content_type=ContentType.objects.get_for_model(PageContent),
+        )
+        content = PageContent.admin_manager.filter(pk__in=placeholders.values('object_id')).values(
+            'page_id', 'language',
+        ).first()
+        return (content['page_id'], content['language']) if content else None
+
+    # A djangocms-versioning Version
+    if instance.content_type.model_class() is not PageContent:
+        return None
+    return _get_content_page_and_language(instance.object_id)
+
+
+def update_for_instance(sender, instance, **kwargs):
+    """Signal receiver scheduling the search document update for a saved or deleted object"""
+    if kwargs.get('raw'):
+        return
+    affected = _get_page_and_language(instance)
+    if affected is not None:
+        schedule_page_update(*affected)
+
+
+def get_plugin_models():
+    """Return ``CMSPlugin`` and the models of the installed plugins"""
+    return [model for model in apps.get_models() if issubclass(model, CMSPlugin)]
+
+
+def update_for_plugin(sender, instance, update_fields=None, **kwargs):
+    """Signal receiver of the plugin models, scheduling the update for saved or deleted plugins
+
+    Saves of only fields the documents don't hold, such as the dates, are
+    skipped.
+    """
+    if update_fields is not None and not set(update_fields) & _get_indexed_fields(type(instance)):
+        return
+    update_for_instance(sender, instance, update_fields=update_fields, **kwargs)
+
+
+class BaseSearchBackend:
+    """Search documents with ``icontains`` lookups, for databases without full-text support"""
+
+    def __init__(self, connection, model):
+        self.connection = connection
+        self.model = model
+        self.fields = SEARCH_FIELDS[model]
+
+    def setup(self):
+        """Create the database objects the backend needs, if they don't exist yet"""
+
+    def update_documents(self, documents):
+        """Update the index of saved documents"""
+
+    def search(self, documents, query, limit, offset=0, snippet_field=None, count=True):
+        """Return the matching page of results and the total number of matches
+
+        ``documents`` is a queryset of the documents that may match. Results
+        are ``(document, rank, snippet)`` in order of decreasing relevance,
+        where ``snippet`` is the text around the matches of ``snippet_field``
+        with the matches highlighted. Without ``count`` the total is ``None``.
+        """
+        terms = get_search_terms(query)
+        if not terms:
+            return [], 0
+        for term in terms:
+            condition = Q()
+            for field, _weight in self.fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            documents = documents.filter(condition)
+        ordered = documents.order_by(self.fields[0][0], 'pk')
+        results = [
+            (document, None, get_snippet(getattr(document, snippet_field), terms) if snippet_field else None)
+            for document in ordered[offset:offset + limit]
+        ]
+        return results, documents.count() if count else None
+
+    def fuzzy_search(self, documents, query, limit):
+        """Return the ``(page_id, similarity)`` of the titles most similar to ``query``
+
+        ``documents`` are page documents of one site and language. This uses an
+        in-process trigram index of their titles.
+        """
+        return get_trigram_index(documents).search(query, limit)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Search documents with a weighted ``tsvector`` and a GIN index
+
+    Fuzzy searches use pg_trgm when the extension is installed.
+    """
+
+    def setup(self):
+        table = self.model._meta.db_table
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING GIN (search_vector)')
+            if self.model is PageSearchDocument and self.has_trigram_extension():
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_title_trgm ON {table} USING GIN (title gin_trgm_ops)'
+                )
+
+    def has_trigram_extension(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            return cursor.fetchone()[0]
+
+    def fuzzy_search(self, documents, query, limit):
+        if not self.has_trigram_extension():
+            return super().fuzzy_search(documents, query, limit)
+
+        from django.contrib.postgres.lookups import TrigramSimilar
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        # The % operator of TrigramSimilar can use the trigram index
+        matches = documents.filter(TrigramSimilar(F('title'), query)).annotate(
+            similarity=TrigramSimilarity('title', query),
+        ).order_by('-similarity', 'page_id')
+        return list(matches.values_list('page_id', 'similarity')[:limit])
+
+    def update_documents(self, documents):
+        from django.contrib.postgres.search import SearchVector
+
+        vector = SearchVector(self.fields[0][0], weight=self.fields[0][1])
+        for field, weight in self.fields[1:]:
+            vector += SearchVector(field, weight=weight)
+        documents.update(search_vector=vector)
+
+    def search(self, documents, query, limit, offset=0, snippet_field=None, count=True):
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+        terms = get_search_terms(query)
+        if not terms:
+            return [], 0
+        # Prefix matches for every word, like the other backends
+        search_query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw')
+        documents = documents.filter(search_vector=search_query)
+        ranked = documents.annotate(rank=SearchRank(F('search_vector'), search_query)).order_by('-rank', 'pk')
+        if snippet_field:
+            ranked = ranked.annotate(snippet=SearchHeadline(
+                snippet_field, search_query, start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_END,
+                max_words=SNIPPET_WORDS, min_words=SNIPPET_WORDS // 2,
+            ))
+        results = [
+            (document, document.rank, getattr(document, 'snippet', None))
+            for document in ranked[offset:offset + limit]
+        ]
+        return results, documents.count() if count else None
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Search documents with an FTS5 table that triggers keep in sync"""
+
+    def __init__(self, connection, model):
+        super().__init__(connection, model)
+        self.table = model._meta.db_table
+        self.fts_table = f'{self.table}_fts'
+
+    def setup(self):
+        columns = ', '.join(field for field, _weight in self.fields)
+        new_values = ', '.join(f'new.{field}' for field, _weight in self.fields)
+        old_values = ', '.join(f'old.{field}' for field, _weight in self.fields)
+        delete = (
+            f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        insert = f'INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.id, {new_values});'
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+            f"{columns}, content='{self.table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+            f'CREATE TRIGGER IF NOT EXISTS {self.fts_table}_insert AFTER INSERT ON {self.table} BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.fts_table}_delete AFTER DELETE ON {self.table} BEGIN {delete} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.fts_table}_update AFTER UPDATE ON {self.table} '
+            f'BEGIN {delete} {insert} END',
+            # Index any documents written before the table existed
+            f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')",
+        ]
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def search(self, documents, query, limit, offset=0, snippet_field=None, count=True):
+        terms = get_search_terms(query)
+        if not terms:
+            return [], 0
+        match = ' '.join(f'"{term}"*' for term in terms)
+        documents_sql, documents_params = documents.values('pk').query.sql_with_params()
+        weights = ', '.join(str(self._get_bm25_weight(weight)) for _field, weight in self.fields)
+        snippet_sql = 'NULL'
+        if snippet_field:
+            column = [field for field, _weight in self.fields].index(snippet_field)
+            snippet_sql = (
+                f"snippet({self.fts_table}, {column}, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', {SNIPPET_WORDS})"
+            )
+        # The unary + keeps SQLite from passing the candidates to FTS5 as
+        # rowid constraints, which runs one index lookup per candidate
+        # document. The matches are filtered against the candidates instead.
+        from_sql = (
+            f'FROM {self.fts_table} WHERE {self.fts_table} MATCH %s '
+            f'AND +{self.fts_table}.rowid IN ({documents_sql})'
+        )
+        params = [match, *documents_params]
+        total = None
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({self.fts_table}, {weights}) AS rank, {snippet_sql} {from_sql} '
+                f'ORDER BY rank, rowid LIMIT %s OFFSET %s',
+                [*params, limit, offset],
+            )
+            ranks = cursor.fetchall()
+            if count:
+                cursor.execute(f'SELECT COUNT(*) {from_sql}', params)
+                total = cursor.fetchone()[0]
+
+        found = self.model.objects.in_bulk([pk for pk, _rank, _snippet in ranks])
+        # bm25 scores are negative, lower is better
+        return [(found[pk], -rank, snippet) for pk, rank, snippet in ranks if pk in found], total
+
+    def _get_bm25_weight(self, weight):
+        return {'A': 10.0, 'B': 4.0, 'C': 1.0, 'D': 0.5}[weight]
+
+
+def get_snippet(text, terms):
+    """Return the words of ``text`` around the first match of ``terms`` with the matches highlighted"""
+    words = text.split()
+    matches = [i for i, word in enumerate(words) if any(term in word.lower() for term in terms)]
+    start = max(matches[0] - SNIPPET_WORDS // 2, 0) if matches else 0
+    snippet = [
+        f'{HIGHLIGHT_START}{word}{HIGHLIGHT_END}' if i in matches else word
+        for i, word in enumerate(words[start:start + SNIPPET_WORDS], start)
+    ]
+    return ('…' if start else '') + ' '.join(snippet) + ('…' if start + SNIPPET_WORDS < len(words) else '')
+
+
+@lru_cache(maxsize=None)
+def _has_fts5(using):
+    with connections[using].cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(option == 'ENABLE_FTS5' for option, in cursor.fetchall())
+
+
+def get_search_backend(model=PageSearchDocument, using=None):
+    """Return the search backend for the database holding the documents of ``model``"""
+    using = using or model.objects.db
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend(connection, model)
+    if connection.vendor == 'sqlite' and _has_fts5(using):
+        return SQLiteSearchBackend(connection, model)
+    return BaseSearchBackend(connection, model)
+
+
+def setup_search_index(sender, using='default', **kwargs):
+    """``post_migrate`` receiver creating the database objects of the search backends"""
+    for model in SEARCH_FIELDS:
+        try:
+            get_search_backend(model, using).setup()
+        except DatabaseError:
+            logger.exception(f'Could not set up the search index of {model.__name__}')
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.urls import path
+from django.utils.module_loading import import_string
+from rest_framework.permissions import IsAuthenticated
+
+from .views import MetricsView, PageTreeExportView
+
+
+# Use the same authentication as the django-mcp-server endpoint
+authentication_classes = getattr(settings, 'DJANGO_MCP_AUTHENTICATION_CLASSES', None)
+view_kwargs = {
+    'permission_classes': [IsAuthenticated] if authentication_classes else [],
+    'authentication_classes': [import_string(cls) for cls in authentication_classes or []],
+}
+
+urlpatterns = [
+    path('page-tree.ndjson', PageTreeExportView.as_view(**view_kwargs), name='djangocms_mcp_page_tree_export'),
+    path('metrics', MetricsView.as_view(**view_kwargs), name='djangocms_mcp_metrics'),
+]
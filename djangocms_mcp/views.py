@@ -0,0 +1,46 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework.views import APIView
+
+from cms.models import Page
+
+from .mcp import iter_page_tree_records
+from .metrics import render_prometheus
+
+
+class PageTreeExportView(APIView):
+    """Stream the page tree as newline delimited JSON, one node per line"""
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            root_page_id = int(params['root_page_id']) if params.get('root_page_id') else None
+            max_depth = int(params['max_depth']) if params.get('max_depth') else None
+            site_id = int(params['site_id']) if params.get('site_id') else None
+        except ValueError:
+            return JsonResponse({'error': 'root_page_id, max_depth and site_id must be integers'}, status=400)
+
+        try:
+            records = iter_page_tree_records(
+                language=params.get('language'),
+                state=params.get('state'),
+                root_page_id=root_page_id,
+                max_depth=max_depth,
+                site_id=site_id,
+            )
+        except Page.DoesNotExist:
+            return JsonResponse({'error': f'Page with id {root_page_id} not found'}, status=404)
+
+        return StreamingHttpResponse(
+            (json.dumps(record, cls=DjangoJSONEncoder) + '\n' for record in records),
+            content_type='application/x-ndjson',
+        )
+
+
+class MetricsView(APIView):
+    """Expose the per-tool metrics of this process in the Prometheus text format"""
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,229 @@
+"""
+Synthetic sites for the large-site benchmarks
+
+``build_site`` fills the test database with a page tree of any size using
+the batched writes of ``djangocms_mcp.bulk``, so that tens of thousands of
+pages take seconds rather than the hours of ``cms.api``. The titles and
+plugin texts are drawn from a small vocabulary with a fixed seed, so the
+same arguments always build the same site and searches have matches.
+"""
+import math
+import random
+
+from cms.models import Page, PageContent, PageUrl, Placeholder
+from cms.constants import VISIBILITY_ALL, X_FRAME_OPTIONS_INHERIT
+from cms.utils.conf import get_cms_setting
+from cms.utils.placeholder import get_placeholders
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from djangocms_mcp import mcp
+from djangocms_mcp.bulk import create_page_tree, save_plugins
+from djangocms_mcp.models import MCPServerPlugin
+from djangocms_mcp.search import schedule_page_update
+
+
+WORDS = (
+    'alpine', 'amber', 'archive', 'atlas', 'beacon', 'birch', 'canyon', 'cedar', 'cobalt', 'coral',
+    'delta', 'ember', 'fjord', 'garden', 'glacier', 'harbor', 'heron', 'island', 'juniper', 'lagoon',
+    'lantern', 'maple', 'meadow', 'nebula', 'orchid', 'pebble', 'prairie', 'quartz', 'river', 'saffron',
+    'summit', 'thistle', 'tundra', 'valley', 'willow', 'zephyr',
+)
+
+# Rows inserted per batch of plugins, to bound the memory of the largest sites
+PLUGIN_BATCH_SIZE = 5000
+
+
+def get_page_specs(pages, depth, rng):
+    """Return nested specs of ``pages`` pages spread evenly over ``depth`` levels"""
+    branching = max(1, math.ceil(pages ** (1 / depth)))
+    count = 0
+
+    def make_spec():
+        nonlocal count
+        count += 1
+        return {'title': f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {count}', 'children': []}
+
+    roots = [make_spec() for _ in range(min(branching, pages))]
+    level = roots
+    for _ in range(depth - 1):
+        next_level = []
+        for spec in level:
+            for _ in range(branching):
+                if count == pages:
+                    return roots
+                child = make_spec()
+                spec['children'].append(child)
+                next_level.append(child)
+        level = next_level
+    return roots
+
+
+def _chunks(items, size=10000):
+    """Split ``items`` to keep ``__in`` lookups under SQLite's limit of query parameters"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _create_contents(items, language, number, user, content_type, versioning):
+    """Add a content with its placeholders, and with versioning an archived version, for each item
+
+    The items are ``(page, title, template)`` tuples.
+    """
+    username = user.get_username()
+    contents = PageContent.admin_manager.bulk_create([
+        PageContent(
+            page=page,
+            language=language,
+            title=title,
+            template=template,
+            created_by=username,
+            changed_by=username,
+            in_navigation=False,
+            soft_root=False,
+            limit_visibility_in_menu=VISIBILITY_ALL,
+            xframe_options=X_FRAME_OPTIONS_INHERIT,
+        )
+        for page, title, template in items
+    ])
+    Placeholder.objects.bulk_create([
+        Placeholder(slot=placeholder.slot, content_type=content_type, object_id=content.pk)
+        for content in contents
+        for placeholder in get_placeholders(content.template)
+    ])
+    if versioning:
+        from djangocms_versioning.constants import ARCHIVED
+        from djangocms_versioning.models import Version
+
+        Version.objects.bulk_create([
+            Version(content_type=content_type, object_id=content.pk, created_by=user, number=str(number),
+                    state=ARCHIVED)
+            for content in contents
+        ])
+    return contents
+
+
+def _add_plugins(contents, plugins_per_placeholder, rng):
+    """Fill every placeholder of ``contents`` with plugins and return their number"""
+    content_type = ContentType.objects.get_for_model(PageContent)
+    languages = {content.pk: content.language for content in contents}
+    count = 0
+    batch = []
+    for chunk in _chunks(list(languages)):
+        placeholders = Placeholder.objects.filter(
+            content_type=content_type, object_id__in=chunk,
+        ).values_list('pk', 'object_id')
+        for placeholder_id, content_id in placeholders:
+            batch.extend(
+                MCPServerPlugin(
+                    placeholder_id=placeholder_id,
+                    language=languages[content_id],
+                    position=position,
+                    plugin_type='MCPServerCMSPlugin',
+                    title=f'{rng.choice(WORDS).title()} server',
+                    description=' '.join(rng.choice(WORDS) for _ in range(12)),
+                )
+                for position in range(1, plugins_per_placeholder + 1)
+            )
+            if len(batch) >= PLUGIN_BATCH_SIZE:
+                count += len(save_plugins(batch))
+                batch = []
+    return count + len(save_plugins(batch))
+
+
+@transaction.atomic
+def build_site(
+    user,
+    pages,
+    depth=3,
+    languages=('en',),
+    versions_per_page=1,
+    plugins_per_placeholder=0,
+    site_id=1,
+    seed=0,
+):
+    """Build a synthetic site and return the ids of its pages in tree order with its size
+
+    Every page has a content in each of ``languages`` and, with
+    djangocms-versioning, ``versions_per_page`` versions of each: the older
+    ones archived and the latest published on every other page and a draft
+    on the rest. Every placeholder of every content gets
+    ``plugins_per_placeholder`` plugins. The search documents are updated
+    when the transaction commits, as for the bulk tools.
+    """
+    rng = random.Random(seed)
+    versioning = mcp.VERSIONING_ENABLED
+    if not versioning:
+        # Without versioning a page has a single content per language
+        versions_per_page = 1
+
+    created = create_page_tree(
+        get_page_specs(pages, depth, rng), languages[0], user, site_id,
+        default_template=get_cms_setting('TEMPLATES')[0][0], versioning=versioning,
+    )
+    site_pages = [page for _spec, page, _parent_id, _slug, _content, _version in created]
+    page_ids = [page.pk for page in site_pages]
+    items = [(page, content.title, content.template) for _spec, page, _parent_id, _slug, content, _version in created]
+    contents = [content for _spec, _page, _parent_id, _slug, content, _version in created]
+    latest = {page.pk: {languages[0]: content} for page, content in zip(site_pages, contents)}
+
+    urls = []
+    if len(languages) > 1:
+        for chunk in _chunks(page_ids):
+            Page.objects.filter(pk__in=chunk).update(languages=','.join(languages))
+        for chunk in _chunks(page_ids):
+            urls += PageUrl.objects.filter(page__in=chunk, language=languages[0]).values_list('page_id', 'path', 'slug')
+    content_type = ContentType.objects.get_for_model(PageContent)
+    for language in languages[1:]:
+        PageUrl.objects.bulk_create([
+            PageUrl(page_id=page_id, language=language, path=path, slug=slug, managed=True)
+            for page_id, path, slug in urls
+        ])
+        new_contents = _create_contents(
+            [(page, f'{title} ({language})', template) for page, title, template in items],
+            language, 1, user, content_type, versioning,
+        )
+        contents += new_contents
+        for content in new_contents:
+            latest[content.page_id][language] = content
+
+    # Each version is a copy of the content, placeholders and plugins
+    for number in range(2, versions_per_page + 1):
+        for language in languages:
+            new_contents = _create_contents(
+                [(page, latest[page.pk][language].title, template) for page, _title, template in items],
+                language, number, user, content_type, versioning,
+            )
+            contents += new_contents
+            for content in new_contents:
+                latest[content.page_id][language] = content
+
+    latest_contents = [content for by_language in latest.values() for content in by_language.values()]
+    if versioning:
+        from djangocms_versioning.constants import ARCHIVED, DRAFT, PUBLISHED
+        from djangocms_versioning.models import Version
+
+        if versions_per_page > 1:
+            # create_page_tree made the first versions drafts
+            first_ids = [content.pk for _spec, _page, _parent_id, _slug, content, _version in created]
+            for chunk in _chunks(first_ids):
+                Version.objects.filter(content_type=content_type, object_id__in=chunk).update(state=ARCHIVED)
+        order = {page_id: index for index, page_id in enumerate(page_ids)}
+        states = {PUBLISHED: [], DRAFT: []}
+        for content in latest_contents:
+            states[DRAFT if order[content.page_id] % 2 else PUBLISHED].append(content.pk)
+        for state, content_ids in states.items():
+            for chunk in _chunks(content_ids):
+                Version.objects.filter(content_type=content_type, object_id__in=chunk).update(state=state)
+
+    plugins = _add_plugins(contents, plugins_per_placeholder, rng) if plugins_per_placeholder else 0
+
+    for content in latest_contents:
+        schedule_page_update(content.page_id, content.language)
+    return {
+        'page_ids': page_ids,
+        'pages': len(page_ids),
+        'contents': len(contents),
+        'versions': len(contents) if versioning else 0,
+        'plugins': plugins,
+    }
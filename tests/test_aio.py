@@ -0,0 +1,138 @@
+"""
+Test the async variants of the read tools
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from mcp.server.fastmcp.tools import ToolManager
+
+from djangocms_mcp.aio import READ_TOOLS, AsyncReadTools, PooledToolCaller
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+
+from .test_benchmarks import requires_benchmarks
+
+
+class TestAsyncReadTools(TransactionTestCase):
+    """Test read tools run in the worker pool"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.home = create_page('Home', 'template_1.html', 'en', created_by=self.user)
+
+    async def test_async_page_tree_matches_sync(self):
+        """Test the async variant returns the same response"""
+        expected = await AsyncReadTools(self.tools).get_languages()
+        self.assertEqual(expected, self.tools.get_languages())
+
+        tree = await AsyncReadTools(self.tools).get_page_tree(language='en', fields=['title'])
+        self.assertEqual(tree['tree'][0]['title'], 'Home')
+
+    async def test_read_tools_run_concurrently(self):
+        """Test concurrent calls run at the same time in separate threads, each with its own connection"""
+        # Each call waits for the other one: run one after the other, the
+        # first would time out
+        barrier = threading.Barrier(2, timeout=10)
+        threads, connections = set(), set()
+
+        class Tools(DjangoCMSVersioningTools):
+            def get_page_tree(self, *args, **kwargs):
+                result = super().get_page_tree(*args, **kwargs)
+                threads.add(threading.get_ident())
+                connections.add(id(connection.connection))
+                barrier.wait()
+                return result
+
+        tools = AsyncReadTools(Tools())
+        with self.settings(DJANGO_CMS_MCP={'CACHE_TIMEOUT': 0}):
+            results = await asyncio.gather(*(tools.get_page_tree(language='en', fields=['title']) for _ in range(2)))
+
+        self.assertEqual([[node['title'] for node in result['tree']] for result in results], [['Home'], ['Home']])
+        self.assertEqual(len(threads), 2)
+        self.assertEqual(len(connections), 2)
+
+    async def test_pooled_tool_caller(self):
+        """Test MCP calls create a toolset instance and run the tool in the pool"""
+        caller = SimpleNamespace(
+            class_=DjangoCMSVersioningTools,
+            method_name='get_page_detail',
+            context_kwarg='_context',
+            forward_context_kwarg=False,
+        )
+
+        result = await PooledToolCaller(caller)(page_id=self.home.pk, language='en', fields=['title'], _context=None)
+
+        self.assertEqual(result['title'], 'Home')
+
+
+@pytest.mark.slow
+@requires_benchmarks
+class TestAsyncReadToolsLoad(TransactionTestCase):
+    """Measure the throughput of a read tool under concurrent clients"""
+
+    clients = 50
+    calls_per_client = 4
+
+    def setUp(self):
+        from cms.api import create_page
+
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        for i in range(5):
+            parent = create_page(f'Section {i}', 'template_1.html', 'en', created_by=user)
+            for j in range(5):
+                create_page(f'Page {i}.{j}', 'template_1.html', 'en', created_by=user, parent=parent)
+
+    async def _measure(self, get_page_tree):
+        async def client():
+            return [len((await get_page_tree(language='en'))['tree']) for _ in range(self.calls_per_client)]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(client() for _ in range(self.clients)))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(results, [[5] * self.calls_per_client] * self.clients)
+        return self.clients * self.calls_per_client / elapsed
+
+    async def test_throughput_at_50_concurrent_clients(self):
+        """Test 50 concurrent clients are served by the worker pool and report the throughput"""
+        tools = DjangoCMSVersioningTools()
+        with self.settings(DJANGO_CMS_MCP={'CACHE_TIMEOUT': 0}):
+            # What django-mcp-server does for every tool: one shared thread
+            shared = await self._measure(sync_to_async(tools.get_page_tree))
+            pooled = await self._measure(AsyncReadTools(tools).get_page_tree)
+
+        print(
+            f'\n{self.clients} clients x {self.calls_per_client} page trees: '
+            f'shared thread {shared:.0f} calls/s, worker pool {pooled:.0f} calls/s'
+        )
+
+
+class TestToolRegistration(SimpleTestCase):
+    """Test which tools are run in the worker pool"""
+
+    def test_read_tools_run_in_pool(self):
+        """Test only the read tools get the pooled caller"""
+        tools = {tool.name: tool for tool in DjangoCMSVersioningTools()._add_tools_to(ToolManager())}
+
+        for name in READ_TOOLS:
+            self.assertIsInstance(tools[name].fn, PooledToolCaller, name)
+        self.assertNotIsInstance(tools['create_pages'].fn, PooledToolCaller)
+
+    def test_unknown_tool_functions_are_refused(self):
+        """Test tool functions without the attributes of django-mcp-server 0.5 fail loudly"""
+        with self.assertRaisesMessage(ImproperlyConfigured, 'context_kwarg, forward_context_kwarg'):
+            PooledToolCaller(SimpleNamespace(class_=DjangoCMSVersioningTools, method_name='get_languages'))
+
+    def test_write_tools_have_no_async_variant(self):
+        """Test write tools can't be run in the pool"""
+        with self.assertRaises(AttributeError):
+            AsyncReadTools(DjangoCMSVersioningTools()).create_pages
@@ -0,0 +1,125 @@
+"""
+Micro-benchmarks for the hot paths of the MCP tools
+
+Their timings depend on the machine and its load, so they only run with
+``DJANGO_CMS_MCP_BENCHMARKS=1`` in the environment.
+"""
+import os
+import timeit
+import unittest
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from mcp.server.fastmcp.tools import ToolManager
+
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+from djangocms_mcp.metrics import reset_metrics
+from djangocms_mcp.models import MCPServerPlugin
+
+from .sitegen import build_site
+
+
+requires_benchmarks = unittest.skipUnless(
+    os.environ.get('DJANGO_CMS_MCP_BENCHMARKS'), 'Set DJANGO_CMS_MCP_BENCHMARKS=1 to run the benchmarks',
+)
+
+
+@pytest.mark.slow
+@requires_benchmarks
+class TestPluginSerializerBenchmark(SimpleTestCase):
+    """Compare the compiled plugin serializer with field introspection"""
+
+    def setUp(self):
+        self.tools = DjangoCMSVersioningTools()
+        now = timezone.now()
+        self.plugins = [
+            MCPServerPlugin(
+                id=i, cmsplugin_ptr_id=i, title=f'Server {i}', description='Description', language='en',
+                plugin_type='MCPServerCMSPlugin', position=i, creation_date=now, changed_date=now,
+            )
+            for i in range(2000)
+        ]
+
+    def _time(self, serialize):
+        return timeit.timeit(lambda: [serialize(plugin) for plugin in self.plugins], number=1)
+
+    def test_compiled_serializer_is_faster(self):
+        """Test serializing plugin models beats introspecting every instance"""
+        # Alternate the runs so both sides see the same machine load
+        introspected = compiled = float('inf')
+        for _ in range(10):
+            introspected = min(introspected, self._time(self.tools._serialize_plugin_fields))
+            compiled = min(compiled, self._time(self.tools._serialize_plugin))
+
+        print(
+            f'\n{len(self.plugins)} plugins: introspection {introspected * 1000:.1f}ms, '
+            f'compiled {compiled * 1000:.1f}ms ({introspected / compiled:.1f}x)'
+        )
+        self.assertLess(compiled, introspected)
+
+
+@pytest.mark.slow
+@requires_benchmarks
+class TestMetricsOverhead(TestCase):
+    """Measure the cost of recording the metrics of a tool call"""
+
+    tree_pages = int(os.environ.get('DJANGO_CMS_MCP_BENCHMARK_TREE_PAGES', 5000))
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+        self.tools = DjangoCMSVersioningTools()
+
+    def _time_overhead(self, name, plain, measured, number):
+        """Return the best times of ``number`` plain and measured calls, printing the overhead"""
+        plain_time = measured_time = float('inf')
+        for _ in range(5):
+            plain_time = min(plain_time, timeit.timeit(plain, number=number))
+            measured_time = min(measured_time, timeit.timeit(measured, number=number))
+        reset_metrics()
+
+        overhead = (measured_time - plain_time) / number
+        print(
+            f'\n{name}: {plain_time / number * 1000:.2f}ms per call, '
+            f'metrics overhead {overhead * 1e6:.0f}us ({overhead * number / plain_time:.1%})'
+        )
+        return plain_time, measured_time
+
+    def test_overhead_per_call(self):
+        """Test recording a page detail call adds a small fraction of its time"""
+        measured = self.tools.get_page_detail
+        plain = DjangoCMSVersioningTools.get_page_detail.__wrapped__.__get__(self.tools)
+
+        plain_time, measured_time = self._time_overhead(
+            'get_page_detail',
+            lambda: plain(self.page.pk, language='en'),
+            lambda: measured(self.page.pk, language='en'),
+            number=50,
+        )
+        self.assertLess(measured_time, plain_time * 1.5)
+
+    def test_overhead_on_large_tree(self):
+        """Test recording a call of a large page tree, served as JSON by the MCP server, adds a small fraction of its time"""
+        build_site(self.user, self.tree_pages)
+        # Without statistics SQLite scans the version table for each page
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        tool = {tool.name: tool for tool in self.tools._add_tools_to(ToolManager())}['get_page_tree']
+        # The tools as registered without the metrics
+        plain_tool = {
+            tool.name: tool for tool in super(DjangoCMSVersioningTools, self.tools)._add_tools_to(ToolManager())
+        }['get_page_tree']
+        plain = DjangoCMSVersioningTools.get_page_tree.__wrapped__.__get__(self.tools)
+
+        plain_time, measured_time = self._time_overhead(
+            f'get_page_tree of {self.tree_pages} pages',
+            lambda: plain_tool.fn_metadata.convert_result(plain(language='en')),
+            lambda: tool.fn_metadata.convert_result(self.tools.get_page_tree(language='en')),
+            number=3,
+        )
+        self.assertLess(measured_time, plain_time * 1.2)
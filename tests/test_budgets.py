@@ -0,0 +1,215 @@
+"""
+Test the per-tool query budgets
+"""
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from djangocms_mcp import mcp
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+
+
+# Query budgets of the tools whose cost must not grow with the size of the
+# site, checked against the synthetic site of TestToolsWithinBudget
+TOOL_BUDGETS = {
+    'get_page_tree': 6,
+    'get_page_detail': 12,
+    'get_pages_detail': 10,
+    'get_page_versions': 4,
+    'search_pages': 6,
+    'search_content': 3,
+    'list_templates': 0,
+    'list_plugin_types': 0,
+    'get_languages': 0,
+    'get_version_states': 0,
+    'get_server_metrics': 0,
+    'create_pages': 30,
+    'create_page': 30,
+    'add_plugins': 12,
+    'publish_version': 20,
+    # Copying a version copies the plugins of its placeholders
+    'create_version': 60,
+    'archive_version': 15,
+    # djangocms-versioning publishes one version at a time, with about 17
+    # queries each: this covers the 20 versions published below
+    'publish_versions': 400,
+}
+
+
+def _get_settings(budgets, mode):
+    return {'CACHE_TIMEOUT': 0, 'QUERY_BUDGETS': budgets, 'QUERY_BUDGET_MODE': mode}
+
+
+class TestQueryBudgets(TestCase):
+    """Test calls over their query budget are logged, reported or aborted"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.tools.request = SimpleNamespace(user=self.user)
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+
+    def test_log(self):
+        """Test a call over its budget is logged and returns its response"""
+        with self.settings(DJANGO_CMS_MCP=_get_settings({'get_page_detail': 1}, 'log')):
+            with self.assertLogs('djangocms_mcp.budgets', 'WARNING') as logs:
+                result = self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertEqual(result['title'], 'Landing')
+        self.assertNotIn('query_budget_warning', result)
+        self.assertIn('get_page_detail ran', logs.output[0])
+
+    def test_warn(self):
+        """Test a call over its budget reports it in the response"""
+        with self.settings(DJANGO_CMS_MCP=_get_settings({'get_page_detail': 1}, 'warn')):
+            result = self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertEqual(result['title'], 'Landing')
+        self.assertRegex(result['query_budget_warning'], r'^get_page_detail ran \d+ queries, over its budget of 1$')
+
+    def test_within_budget(self):
+        """Test a call within its budget is left alone"""
+        with self.settings(DJANGO_CMS_MCP=_get_settings({'get_page_detail': 100}, 'warn')):
+            result = self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertNotIn('query_budget_warning', result)
+
+    def test_abort(self):
+        """Test a call is stopped at the first query over its budget"""
+        with self.settings(DJANGO_CMS_MCP=_get_settings({'get_page_detail': 1}, 'abort')):
+            with self.assertLogs('djangocms_mcp.budgets', 'ERROR'):
+                result = self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertEqual(result, {'error': 'get_page_detail exceeded its budget of 1 queries'})
+
+    def test_abort_rolls_back(self):
+        """Test what an aborted call wrote is rolled back"""
+        from cms.models import Page
+
+        with self.settings(DJANGO_CMS_MCP=_get_settings({'create_pages': 3}, 'abort')):
+            result = self.tools.create_pages([{'title': 'Docs'}, {'title': 'Blog'}], language='en')
+
+        self.assertEqual(result, {'error': 'create_pages exceeded its budget of 3 queries'})
+        self.assertEqual(Page.objects.count(), 1)
+
+    def test_invalid_mode(self):
+        """Test an unknown mode is a configuration error"""
+        with self.settings(DJANGO_CMS_MCP=_get_settings({'get_languages': 1}, 'fail')):
+            with self.assertRaises(ImproperlyConfigured):
+                self.tools.get_languages()
+
+
+@override_settings(DJANGO_CMS_MCP=_get_settings(TOOL_BUDGETS, 'abort'))
+class TestToolsWithinBudget(TestCase):
+    """Test each tool stays within its query budget on a synthetic site
+
+    The site has a few hundred pages in three levels and plugins on some
+    of them. Calls run in ``abort`` mode, so a tool over its budget returns
+    an error.
+    """
+
+    sections = 6
+    pages_per_section = 8
+    children_per_page = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        from cms.models import PageContent, Placeholder
+
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        tools = cls._get_tools()
+        # The search index is updated on commit
+        with cls.captureOnCommitCallbacks(execute=True), cls.settings(cls, DJANGO_CMS_MCP={}):
+            result = tools.create_pages([
+                {'title': f'Section {i}', 'children': [
+                    {'title': f'Page {i}.{j}', 'children': [
+                        {'title': f'Article {i}.{j}.{k}'} for k in range(cls.children_per_page)
+                    ]}
+                    for j in range(cls.pages_per_section)
+                ]}
+                for i in range(cls.sections)
+            ], language='en')
+            cls.page_ids = [page['page_id'] for page in result['pages']]
+            for page_id in cls.page_ids[:10]:
+                content = PageContent.admin_manager.get(page_id=page_id, language='en')
+                placeholder = Placeholder.objects.get_for_obj(content).get(slot='content')
+                tools.add_plugins(placeholder.pk, [
+                    {'plugin_type': 'MCPServerCMSPlugin', 'data': {'title': f'Server {n}'}} for n in range(5)
+                ], language='en')
+
+    @classmethod
+    def _get_tools(cls):
+        tools = DjangoCMSVersioningTools()
+        tools.request = SimpleNamespace(user=cls.user)
+        return tools
+
+    def setUp(self):
+        self.tools = self._get_tools()
+
+    def _assert_within_budget(self, result):
+        self.assertNotIn('error', result)
+
+    def test_read_tools(self):
+        """Test the read tools stay within their budget"""
+        page_id = self.page_ids[0]
+        self._assert_within_budget(self.tools.get_page_tree(language='en'))
+        self._assert_within_budget(self.tools.get_page_tree(language='en', limit=50, root_page_id=page_id))
+        self._assert_within_budget(self.tools.get_page_detail(page_id, language='en'))
+        self._assert_within_budget(self.tools.get_page_detail(page_id, languages=['en']))
+        self._assert_within_budget(self.tools.get_pages_detail(self.page_ids[:50], language='en'))
+        result = self.tools.search_pages('Article', language='en')
+        self._assert_within_budget(result)
+        self.assertTrue(result['results'])
+        self._assert_within_budget(self.tools.search_pages('Artcle', language='en', fuzzy=True))
+        result = self.tools.search_content('Server', language='en')
+        self._assert_within_budget(result)
+        self.assertTrue(result['results'])
+        self._assert_within_budget(self.tools.list_templates())
+        self._assert_within_budget(self.tools.list_plugin_types())
+        self._assert_within_budget(self.tools.get_languages())
+        self._assert_within_budget(self.tools.get_server_metrics())
+
+    def test_version_tools(self):
+        """Test the version tools stay within their budget"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        version_ids = list(
+            Version.objects.filter(cms_pagecontent__page__in=self.page_ids[:20]).values_list('pk', flat=True)
+        )
+        result = self.tools.publish_versions(version_ids, language='en')
+        self._assert_within_budget(result)
+        self.assertEqual(result['published'], 20)
+        self._assert_within_budget(self.tools.get_page_versions(self.page_ids[0]))
+        self._assert_within_budget(self.tools.get_page_tree(language='en', state='published'))
+        self._assert_within_budget(self.tools.get_version_states())
+
+        # The first page has plugins, which create_version copies
+        result = self.tools.create_version(self.page_ids[0])
+        self._assert_within_budget(result)
+        self._assert_within_budget(self.tools.archive_version(result['version_id']))
+        version_id = Version.objects.get(cms_pagecontent__page=self.page_ids[20]).pk
+        self._assert_within_budget(self.tools.publish_version(version_id, language='en'))
+
+    def test_write_tools(self):
+        """Test the write tools stay within their budget"""
+        from cms.models import PageContent, Placeholder
+
+        result = self.tools.create_pages([
+            {'title': f'New {i}', 'children': [{'title': f'New {i}.{j}'} for j in range(10)]} for i in range(10)
+        ], language='en', parent_id=self.page_ids[0])
+        self._assert_within_budget(result)
+        self._assert_within_budget(
+            self.tools.create_page('Landing', 'template_1.html', language='en', parent_id=self.page_ids[0])
+        )
+
+        content = PageContent.admin_manager.get(page_id=self.page_ids[1], language='en')
+        placeholder = Placeholder.objects.get_for_obj(content).get(slot='content')
+        self._assert_within_budget(self.tools.add_plugins(placeholder.pk, [
+            {'plugin_type': 'MCPServerCMSPlugin', 'data': {'title': f'Server {n}'}} for n in range(20)
+        ], language='en'))
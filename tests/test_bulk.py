@@ -0,0 +1,473 @@
+"""
+Test the bulk write tools
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from djangocms_mcp import mcp
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+from djangocms_mcp.models import PageSearchDocument
+
+
+class TestCreatePages(TestCase):
+    """Test create_pages builds whole page trees in one go"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.tools.request = SimpleNamespace(user=self.user)
+        self.about = create_page('About', 'template_1.html', 'en', created_by=self.user)
+        create_page('Team', 'template_1.html', 'en', created_by=self.user, parent=self.about)
+
+    def _assert_tree_is_valid(self):
+        from cms.models import TreeNode
+
+        self.assertEqual(TreeNode.find_problems(), ([], [], [], [], []))
+
+    def test_create_nested_pages(self):
+        """Test the tree, urls and placeholders of the new pages"""
+        from cms.models import PageContent, Placeholder
+
+        result = self.tools.create_pages([
+            {'title': 'Docs', 'ref': 'docs', 'children': [
+                {'title': 'Install', 'children': [{'title': 'Linux'}]},
+                {'title': 'Usage', 'slug': 'how-to', 'meta_description': 'How to use it'},
+            ]},
+            {'title': 'Blog'},
+        ], language='en')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(
+            [(page['title'], page['slug']) for page in result['pages']],
+            [('Docs', 'docs'), ('Install', 'install'), ('Linux', 'linux'), ('Usage', 'how-to'), ('Blog', 'blog')],
+        )
+        docs, install, linux, usage, blog = result['pages']
+        self.assertEqual(docs['ref'], 'docs')
+        self.assertIsNone(docs['parent_id'])
+        self.assertEqual(linux['parent_id'], install['page_id'])
+        self._assert_tree_is_valid()
+
+        tree = self.tools.get_page_tree(language='en', fields=['title', 'slug'])['tree']
+        self.assertEqual([node['title'] for node in tree], ['About', 'Docs', 'Blog'])
+        self.assertEqual([node['title'] for node in tree[1]['children']], ['Install', 'Usage'])
+        self.assertEqual(tree[1]['children'][0]['children'][0]['slug'], 'linux')
+
+        linux_page = mcp.Page.objects.get(pk=linux['page_id'])
+        self.assertEqual(linux_page.get_path('en'), 'docs/install/linux')
+        content = PageContent.admin_manager.get(page_id=usage['page_id'])
+        self.assertEqual(content.meta_description, 'How to use it')
+        self.assertEqual(content.template, 'template_1.html')
+        self.assertTrue(Placeholder.objects.get_for_obj(content).filter(slot='content').exists())
+
+    def test_create_pages_below_existing_parent(self):
+        """Test pages are appended after the existing children with unique slugs"""
+        result = self.tools.create_pages(
+            [{'title': 'Team'}, {'title': 'Team'}, {'title': 'Jobs'}], language='en', parent_id=self.about.pk,
+        )
+
+        self.assertEqual([page['slug'] for page in result['pages']], ['team-2', 'team-3', 'jobs'])
+        self.assertEqual({page['parent_id'] for page in result['pages']}, {self.about.pk})
+        self._assert_tree_is_valid()
+
+        about = self.tools.get_page_tree(language='en', fields=['title'])['tree'][0]
+        self.assertEqual([node['title'] for node in about['children']], ['Team', 'Team', 'Team', 'Jobs'])
+
+    def test_create_pages_query_count_is_constant(self):
+        """Test the number of queries depends on the depth of the tree, not the number of pages"""
+        def spec(name, count):
+            return [{'title': f'{name} {i}', 'children': [{'title': f'{name} {i} child'}]} for i in range(count)]
+
+        from cms.models import PageContent
+        from django.contrib.contenttypes.models import ContentType
+
+        # Warm the content type cache
+        ContentType.objects.get_for_model(PageContent)
+        with CaptureQueriesContext(connection) as few:
+            self.tools.create_pages(spec('Few', 2), language='en')
+        # Small enough for SQLite to insert every model with one query
+        with CaptureQueriesContext(connection) as many:
+            result = self.tools.create_pages(spec('Many', 15), language='en')
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(result['count'], 30)
+        self._assert_tree_is_valid()
+
+    def test_create_pages_creates_draft_versions(self):
+        """Test every page gets a draft version by the requesting user"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        result = self.tools.create_pages([{'title': 'Docs', 'children': [{'title': 'Install'}]}], language='en')
+
+        for page in result['pages']:
+            version = Version.objects.get(pk=page['version_id'])
+            self.assertEqual(version.state, mcp.DRAFT)
+            self.assertEqual(version.created_by, self.user)
+            self.assertEqual(version.content.page_id, page['page_id'])
+
+        version = Version.objects.get(pk=result['pages'][0]['version_id'])
+        version.publish(self.user)
+        self.assertEqual(Version.objects.get(pk=version.pk).state, mcp.PUBLISHED)
+
+    @override_settings(DJANGO_CMS_MCP={'MAX_PAGES_PER_REQUEST': 1200})
+    def test_create_pages_with_many_siblings(self):
+        """Test a level with more pages than SQLite allows conditions in one lookup of existing urls"""
+        result = self.tools.create_pages(
+            [{'title': 'About'}] + [{'title': f'Page {i}'} for i in range(1199)], language='en',
+        )
+
+        self.assertNotIn('error', result)
+        self.assertEqual(result['pages'][0]['slug'], 'about-2')
+        self.assertEqual(len({page['slug'] for page in result['pages']}), 1200)
+        self._assert_tree_is_valid()
+
+    def test_create_pages_without_bulk_insert_returning(self):
+        """Test pages get their ids on databases that don't return bulk inserted rows, like MySQL"""
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            result = self.tools.create_pages([
+                {'title': 'Docs', 'children': [{'title': 'Install'}, {'title': 'Usage'}]},
+            ], language='en')
+
+        self.assertTrue(result['success'])
+        docs, install, usage = result['pages']
+        self.assertEqual(install['parent_id'], docs['page_id'])
+        self.assertEqual(mcp.Page.objects.get(pk=usage['page_id']).get_path('en'), 'docs/usage')
+        self._assert_tree_is_valid()
+
+    def test_create_pages_updates_search_index(self):
+        """Test the new pages are indexed once the transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.tools.create_pages([{'title': 'Changelog'}], language='en')
+
+        self.assertTrue(PageSearchDocument.objects.filter(page_id=result['pages'][0]['page_id']).exists())
+
+    def test_create_pages_validates_specs(self):
+        """Test invalid specs are rejected before anything is written"""
+        from cms.models import Page
+
+        count = Page.objects.count()
+
+        self.assertEqual(
+            self.tools.create_pages([{'title': 'Docs', 'children': [{'slug': 'x'}]}]),
+            {'error': 'Every page needs a title'},
+        )
+        self.assertEqual(
+            self.tools.create_pages([{'title': 'Docs', 'colour': 'red'}]),
+            {'error': 'Unknown page keys: colour'},
+        )
+        self.assertEqual(
+            self.tools.create_pages([{'title': 'Docs', 'template': 'missing.html'}]),
+            {'error': 'Unknown template: missing.html'},
+        )
+        self.assertEqual(
+            self.tools.create_pages([{'title': 'Docs'}], parent_id=999999),
+            {'error': 'Page with id 999999 not found'},
+        )
+        with override_settings(DJANGO_CMS_MCP={'MAX_PAGES_PER_REQUEST': 2}):
+            self.assertEqual(
+                self.tools.create_pages([{'title': 'Docs', 'children': [{'title': 'A'}, {'title': 'B'}]}]),
+                {'error': 'Too many pages: 3, at most 2 can be created at once'},
+            )
+        self.assertEqual(Page.objects.count(), count)
+
+    def test_create_pages_requires_user_with_versioning(self):
+        """Test versions can't be created without a user"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+
+        self.tools.request = None
+
+        self.assertEqual(
+            self.tools.create_pages([{'title': 'Docs'}]),
+            {'error': 'Creating versioned pages requires an authenticated user'},
+        )
+
+
+class TestAddPlugins(TestCase):
+    """Test add_plugins fills a placeholder in one go"""
+
+    def setUp(self):
+        from cms.api import create_page
+        from cms.models import PageContent, Placeholder
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.tools.request = SimpleNamespace(user=self.user)
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+        content = PageContent.admin_manager.get(page=self.page, language='en')
+        self.placeholder = Placeholder.objects.get_for_obj(content).get(slot='content')
+
+    def _specs(self, count, **data):
+        return [
+            {'plugin_type': 'MCPServerCMSPlugin', 'data': {'title': f'Server {i}', **data}}
+            for i in range(count)
+        ]
+
+    def test_add_plugins(self):
+        """Test plugins are appended in order with their data"""
+        from djangocms_mcp.models import MCPServerPlugin
+
+        self.tools.add_plugins(self.placeholder.pk, self._specs(1), language='en')
+        result = self.tools.add_plugins(
+            self.placeholder.pk, self._specs(2, description='Hello', enabled=False), language='en',
+        )
+
+        self.assertTrue(result['success'])
+        self.assertEqual([plugin['position'] for plugin in result['plugins']], [2, 3])
+        plugin = MCPServerPlugin.objects.get(pk=result['plugins'][1]['id'])
+        self.assertEqual(plugin.title, 'Server 1')
+        self.assertEqual(plugin.description, 'Hello')
+        self.assertFalse(plugin.enabled)
+        self.assertEqual(plugin.placeholder_id, self.placeholder.pk)
+        self.assertEqual(plugin.language, 'en')
+
+        detail = self.tools.get_page_detail(self.page.pk, language='en')
+        content = [placeholder for placeholder in detail['placeholders'] if placeholder['slot'] == 'content'][0]
+        self.assertEqual(
+            [plugin['data']['title'] for plugin in content['plugins']], ['Server 0', 'Server 0', 'Server 1'],
+        )
+
+    def test_add_plugins_query_count_is_constant(self):
+        """Test the number of queries does not grow with the number of plugins"""
+        with CaptureQueriesContext(connection) as few:
+            self.tools.add_plugins(self.placeholder.pk, self._specs(2), language='en')
+        with CaptureQueriesContext(connection) as many:
+            result = self.tools.add_plugins(self.placeholder.pk, self._specs(30), language='en')
+
+        self.assertEqual(len(many), len(few))
+        self.assertLessEqual(len(many), 12)
+        self.assertEqual(result['count'], 30)
+
+    def test_save_plugins_in_several_placeholders(self):
+        """Test save_plugins inserts plugins of any placeholder with a query per table"""
+        from cms.api import create_page
+        from cms.models import PageContent, Placeholder
+        from djangocms_mcp.bulk import save_plugins
+        from djangocms_mcp.models import MCPServerPlugin
+
+        other = create_page('Other', 'template_1.html', 'en', created_by=self.user)
+        other_placeholder = Placeholder.objects.get_for_obj(
+            PageContent.admin_manager.get(page=other, language='en'),
+        ).get(slot='content')
+        plugins = [
+            MCPServerPlugin(
+                placeholder=placeholder, language='en', position=position,
+                plugin_type='MCPServerCMSPlugin', title=f'Server {position}',
+            )
+            for placeholder in (self.placeholder, other_placeholder)
+            for position in (1, 2)
+        ]
+
+        with self.assertNumQueries(2):
+            save_plugins(plugins)
+
+        self.assertEqual(
+            list(MCPServerPlugin.objects.filter(placeholder=other_placeholder).values_list('title', 'position')),
+            [('Server 1', 1), ('Server 2', 2)],
+        )
+        self.assertEqual(self.placeholder.get_plugins('en').count(), 2)
+
+    def test_save_plugins_without_bulk_insert_returning(self):
+        """Test plugins are saved on databases that don't return bulk inserted rows, like MySQL"""
+        from djangocms_mcp.bulk import save_plugins
+        from djangocms_mcp.models import MCPServerPlugin
+
+        plugins = [
+            MCPServerPlugin(
+                placeholder=self.placeholder, language='en', position=position,
+                plugin_type='MCPServerCMSPlugin', title=f'Server {position}',
+            )
+            for position in (1, 2)
+        ]
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            save_plugins(plugins)
+
+        self.assertEqual(
+            list(MCPServerPlugin.objects.values_list('pk', 'title')),
+            [(plugin.pk, plugin.title) for plugin in plugins],
+        )
+
+    def test_add_plugins_marks_page_changed(self):
+        """Test the page content and its version are marked as changed"""
+        from cms.models import PageContent
+
+        PageContent.admin_manager.filter(page=self.page).update(changed_date='2020-01-01T00:00:00Z')
+        if mcp.VERSIONING_ENABLED:
+            mcp.Version.objects.filter(cms_pagecontent__page=self.page).update(modified='2020-01-01T00:00:00Z')
+        token = self.tools.get_page_tree(language='en')['version_token']
+
+        self.tools.add_plugins(self.placeholder.pk, self._specs(1), language='en')
+
+        content = PageContent.admin_manager.get(page=self.page, language='en')
+        self.assertGreater(content.changed_date.year, 2020)
+        if mcp.VERSIONING_ENABLED:
+            self.assertGreater(mcp.Version.objects.get_for_content(content).modified.year, 2020)
+        self.assertNotIn('not_modified', self.tools.get_page_tree(language='en', if_none_match=token))
+
+    def test_add_plugins_requires_editable_draft(self):
+        """Test plugins can only be added to drafts the user can modify"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+
+        self.tools.request = None
+        result = self.tools.add_plugins(self.placeholder.pk, self._specs(1), language='en')
+        self.assertEqual(result, {'error': 'Adding plugins to versioned pages requires an authenticated user'})
+
+        self.tools.request = SimpleNamespace(user=self.user)
+        mcp.Version.objects.get(cms_pagecontent__page=self.page).publish(self.user)
+        result = self.tools.add_plugins(self.placeholder.pk, self._specs(1), language='en')
+        self.assertTrue(result['error'].startswith(f'Placeholder {self.placeholder.pk} can not be edited: '))
+        self.assertEqual(self.placeholder.get_plugins('en').count(), 0)
+
+    def test_add_plugins_updates_search_index(self):
+        """Test the page's search document includes the new plugins"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tools.add_plugins(self.placeholder.pk, self._specs(1, description='Quarterly report'))
+
+        document = PageSearchDocument.objects.get(page=self.page, language='en')
+        self.assertIn('Quarterly report', document.text)
+
+    def test_add_plugins_validates_specs(self):
+        """Test invalid plugins are rejected before anything is written"""
+        from cms.models import CMSPlugin
+
+        def add(specs):
+            return self.tools.add_plugins(self.placeholder.pk, specs, language='en')
+
+        self.assertEqual(add([]), {'error': 'plugins must be a non-empty list'})
+        self.assertEqual(add([{'data': {}}]), {'error': 'Every plugin needs a plugin_type'})
+        self.assertEqual(add([{'plugin_type': 'Missing'}]), {'error': 'Unknown plugin type: Missing'})
+        self.assertEqual(
+            add([{'plugin_type': 'MCPServerCMSPlugin', 'data': {'position': 5, 'colour': 'red'}}]),
+            {'error': 'Unknown fields for MCPServerCMSPlugin: colour, position'},
+        )
+        self.assertIn('Invalid MCPServerCMSPlugin: title:', add(self._specs(1, title='x' * 300))['error'])
+        self.assertEqual(
+            self.tools.add_plugins(999999, self._specs(1)),
+            {'error': 'Placeholder with id 999999 not found'},
+        )
+        with override_settings(DJANGO_CMS_MCP={'MAX_PLUGINS_PER_REQUEST': 2}):
+            self.assertEqual(add(self._specs(3)), {'error': 'Too many plugins: 3, at most 2 can be added at once'})
+        self.assertFalse(CMSPlugin.objects.exists())
+
+    @override_settings(CMS_PLACEHOLDER_CONF={'content': {'limits': {'global': 3}}})
+    def test_add_plugins_respects_placeholder_limits(self):
+        """Test the placeholder's plugin limits apply to the whole batch"""
+        self.tools.add_plugins(self.placeholder.pk, self._specs(2), language='en')
+
+        result = self.tools.add_plugins(self.placeholder.pk, self._specs(2), language='en')
+
+        self.assertEqual(result, {'error': 'The placeholder can hold at most 3 plugins'})
+
+
+class TestPublishVersions(TestCase):
+    """Test publish_versions publishes many versions in one call"""
+
+    def setUp(self):
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.tools.request = SimpleNamespace(user=self.user)
+        result = self.tools.create_pages([{'title': f'Campaign {i}'} for i in range(5)], language='en')
+        self.pages = result['pages']
+        self.version_ids = [page['version_id'] for page in self.pages]
+
+    def _states(self):
+        from djangocms_versioning.models import Version
+
+        return list(Version.objects.filter(pk__in=self.version_ids).order_by('pk').values_list('state', flat=True))
+
+    def test_publish_versions(self):
+        """Test every version is published and reported in the order given"""
+        version_ids = list(reversed(self.version_ids))
+
+        result = self.tools.publish_versions(version_ids, language='en')
+
+        self.assertEqual(result['published'], 5)
+        self.assertEqual(result['failed'], 0)
+        self.assertEqual([item['version_id'] for item in result['results']], version_ids)
+        self.assertEqual(result['results'][0]['page_id'], self.pages[-1]['page_id'])
+        self.assertEqual(result['results'][0]['new_state'], mcp.PUBLISHED)
+        self.assertEqual(self._states(), [mcp.PUBLISHED] * 5)
+
+    def test_publish_versions_in_chunks(self):
+        """Test chunked publishing publishes every version"""
+        with patch('djangocms_mcp.mcp.transaction.atomic', wraps=mcp.transaction.atomic) as atomic:
+            result = self.tools.publish_versions(self.version_ids, chunk_size=2)
+
+        self.assertEqual(result['published'], 5)
+        # Three chunks and a savepoint per version
+        self.assertEqual(atomic.call_count, 3 + 5)
+
+    def test_publish_versions_invalid_chunk_size(self):
+        """Test chunk sizes below 1 are reported"""
+        for chunk_size in (0, -1):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    self.tools.publish_versions(self.version_ids, chunk_size=chunk_size),
+                    {'error': 'chunk_size must be at least 1'},
+                )
+        self.assertEqual(self._states(), [mcp.DRAFT] * 5)
+
+    def test_publish_versions_only_locks_versions(self):
+        """Test the rows joined to the versions, such as their content type, are not locked"""
+        select_for_update = QuerySet.select_for_update
+        with patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=select_for_update) as lock:
+            self.tools.publish_versions(self.version_ids)
+
+        lock.assert_called_once()
+        self.assertEqual(lock.call_args.kwargs, {'of': ('self',)})
+
+    def test_publish_versions_reports_errors_per_version(self):
+        """Test failures are reported without failing the other versions"""
+        from djangocms_versioning.models import Version
+
+        self.tools.publish_versions(self.version_ids[:1])
+        failing = self.version_ids[1]
+        publish = Version.publish
+
+        def fail_once(version, user):
+            if version.pk == failing:
+                Version.objects.filter(pk=version.pk).update(number='99')
+                raise RuntimeError('Publishing failed')
+            publish(version, user)
+
+        with patch.object(Version, 'publish', fail_once):
+            result = self.tools.publish_versions(self.version_ids + [999999])
+
+        self.assertEqual(result['published'], 3)
+        self.assertEqual(result['results'][0], {
+            'version_id': self.version_ids[0],
+            'error': f'Version {self.version_ids[0]} is not in draft state (current: published)',
+        })
+        self.assertEqual(result['results'][1], {'version_id': failing, 'error': 'Publishing failed'})
+        self.assertEqual(result['results'][-1], {'version_id': 999999, 'error': 'Version with id 999999 not found'})
+        # The failing version was rolled back on its own
+        self.assertEqual(Version.objects.get(pk=failing).state, mcp.DRAFT)
+        self.assertEqual(Version.objects.get(pk=failing).number, '1')
+        self.assertEqual(self._states(), [mcp.PUBLISHED, mcp.DRAFT] + [mcp.PUBLISHED] * 3)
+
+    def test_publish_versions_requires_user(self):
+        """Test publishing needs the requesting user"""
+        self.tools.request = None
+
+        self.assertEqual(
+            self.tools.publish_versions(self.version_ids),
+            {'error': 'Publishing requires an authenticated user'},
+        )
+        with override_settings(DJANGO_CMS_MCP={'MAX_VERSIONS_PER_REQUEST': 2}):
+            self.assertEqual(
+                self.tools.publish_versions(self.version_ids),
+                {'error': 'Too many versions: 5, at most 2 can be published at once'},
+            )
@@ -0,0 +1,145 @@
+"""
+Test caching of MCP tool responses
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from djangocms_mcp import mcp
+from djangocms_mcp.cache import get_cached_response, invalidate
+from djangocms_mcp.checks import check_cache_backend
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+
+
+@override_settings(DJANGO_CMS_MCP={'CACHE_TIMEOUT': 300})
+class TestCachedResponse(TestCase):
+    """Test the generation based response cache"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_response_is_cached(self):
+        """Test a response is built once and then served from the cache"""
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {'tree': []}
+
+        self.assertEqual(get_cached_response('tool', 1, 'en', None, (), build), {'tree': []})
+        self.assertEqual(get_cached_response('tool', 1, 'en', None, (), build), {'tree': []})
+        self.assertEqual(len(calls), 1)
+
+    def test_key_depends_on_language_state_site_and_params(self):
+        """Test responses for different arguments are cached separately"""
+        get_cached_response('tool', 1, 'en', None, (), lambda: {'value': 'base'})
+
+        for args in [(2, 'en', None, ()), (1, 'de', None, ()), (1, 'en', 'draft', ()), (1, 'en', None, (5,))]:
+            with self.subTest(args=args):
+                self.assertEqual(get_cached_response('tool', *args, lambda: {'value': 'other'}), {'value': 'other'})
+
+    def test_errors_are_not_cached(self):
+        """Test error responses are built again on the next call"""
+        get_cached_response('tool', 1, 'en', None, (), lambda: {'error': 'Page not found'})
+
+        self.assertEqual(get_cached_response('tool', 1, 'en', None, (), lambda: {'tree': []}), {'tree': []})
+
+    def test_invalidation_scope(self):
+        """Test invalidating a site's language leaves other languages cached"""
+        get_cached_response('tool', 1, 'en', None, (), lambda: {'value': 'old'})
+        get_cached_response('tool', 1, 'de', None, (), lambda: {'value': 'old'})
+
+        invalidate(1, 'en')
+
+        self.assertEqual(get_cached_response('tool', 1, 'en', None, (), lambda: {'value': 'new'}), {'value': 'new'})
+        self.assertEqual(get_cached_response('tool', 1, 'de', None, (), lambda: {'value': 'new'}), {'value': 'old'})
+
+        invalidate(1)
+        self.assertEqual(get_cached_response('tool', 1, 'de', None, (), lambda: {'value': 'new'}), {'value': 'new'})
+
+        invalidate()
+        self.assertEqual(get_cached_response('tool', 1, 'en', None, (), lambda: {'value': 'newer'}), {'value': 'newer'})
+
+    @override_settings(DJANGO_CMS_MCP={'CACHE_TIMEOUT': 0})
+    def test_cache_can_be_disabled(self):
+        """Test a CACHE_TIMEOUT of 0 disables caching"""
+        get_cached_response('tool', 1, 'en', None, (), lambda: {'value': 'old'})
+
+        self.assertEqual(get_cached_response('tool', 1, 'en', None, (), lambda: {'value': 'new'}), {'value': 'new'})
+
+
+@override_settings(DJANGO_CMS_MCP={'CACHE_TIMEOUT': 300})
+class TestToolResponseInvalidation(TestCase):
+    """Test saving CMS objects invalidates cached tool responses"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        cache.clear()
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.home = create_page('Home', 'template_1.html', 'en', created_by=self.user)
+
+    def test_page_tree_is_served_from_cache(self):
+        """Test a repeated call does not hit the database"""
+        self.tools.get_page_tree(language='en')
+
+        with self.assertNumQueries(0):
+            result = self.tools.get_page_tree(language='en')
+
+        self.assertEqual(result['tree'][0]['title'], 'Home')
+
+    def test_page_content_change_invalidates(self):
+        """Test changing a title is visible in the next tree and search"""
+        from cms.models import PageContent
+
+        self.tools.get_page_tree(language='en')
+        self.tools.search_pages('Welcome', language='en')
+
+        content = PageContent.admin_manager.get(page=self.home, language='en')
+        content.title = 'Welcome'
+        with self.captureOnCommitCallbacks(execute=True):
+            content.save()
+
+        self.assertEqual(self.tools.get_page_tree(language='en')['tree'][0]['title'], 'Welcome')
+        self.assertEqual(self.tools.search_pages('Welcome', language='en')['count'], 1)
+
+    def test_new_page_invalidates(self):
+        """Test a new page is visible in the next tree"""
+        from cms.api import create_page
+
+        self.tools.get_page_tree(language='en')
+        create_page('About', 'template_1.html', 'en', created_by=self.user)
+
+        self.assertEqual(len(self.tools.get_page_tree(language='en')['tree']), 2)
+
+    def test_publishing_invalidates(self):
+        """Test publishing a version is visible in the next tree"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        self.tools.get_page_tree(language='en', state=mcp.PUBLISHED)
+        Version.objects.get(cms_pagecontent__page=self.home).publish(self.user)
+
+        result = self.tools.get_page_tree(language='en', state=mcp.PUBLISHED)
+        self.assertEqual(result['tree'][0]['version_state'], mcp.PUBLISHED)
+
+
+class TestCacheBackendCheck(SimpleTestCase):
+    """Test the system check of the cache backend"""
+
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://'}}
+
+    def test_process_local_cache_warns(self):
+        """Test caching responses in a per-process cache is reported"""
+        with self.settings(CACHES=self.locmem, DJANGO_CMS_MCP={'CACHE_TIMEOUT': 300}):
+            self.assertEqual([warning.id for warning in check_cache_backend(None)], ['djangocms_mcp.W001'])
+
+    def test_shared_cache_or_disabled_cache_is_fine(self):
+        """Test a shared cache, or no caching, passes the check"""
+        with self.settings(CACHES=self.shared, DJANGO_CMS_MCP={'CACHE_TIMEOUT': 300}):
+            self.assertEqual(check_cache_backend(None), [])
+        with self.settings(CACHES=self.locmem, DJANGO_CMS_MCP={}):
+            self.assertEqual(check_cache_backend(None), [])
@@ -1,11 +1,17 @@
 """
 Test the MCP server functionality and tools
 """
+from importlib import import_module
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.db import connection
 
+from djangocms_mcp import mcp
+from djangocms_mcp.indexes import VERSION_STATE_MIGRATION, remove_version_state_index
 from djangocms_mcp.mcp import (
     PageQueryTool, 
     VersionQueryTool,
@@ -36,6 +42,26 @@ class TestMCPQueryTools(TestCase):
         from cms.models.pluginmodel import CMSPlugin
         self.assertEqual(tool.model, CMSPlugin)
 
+    def test_page_query_tool_versioned_pages(self):
+        """Test PageQueryTool lists the pages with versions with an EXISTS filter"""
+        from cms.api import create_page
+
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        versioned = create_page('Versioned', 'template_1.html', 'en', created_by=user)
+        unversioned = create_page('Unversioned', 'template_1.html', 'en', created_by=user)
+        Version.objects.filter(cms_pagecontent__page=unversioned).delete()
+
+        queryset = PageQueryTool().get_queryset()
+
+        self.assertEqual(list(queryset), [versioned])
+        sql = str(queryset.query).upper()
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('DISTINCT', sql)
+
     @patch('djangocms_mcp.mcp.VERSIONING_ENABLED', False)
     def test_page_query_tool_without_versioning(self):
         """Test PageQueryTool queryset when versioning is disabled"""
@@ -66,6 +92,84 @@ class TestMCPQueryTools(TestCase):
         result = tool.get_queryset()
         self.assertIsNone(result)
 
+    def test_version_query_tool_prefetches_contents(self):
+        """Test listing versions loads their contents and users in bulk"""
+        from cms.api import create_page
+
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        for i in range(5):
+            create_page(f'Page {i}', 'template_1.html', 'en', created_by=user)
+
+        with self.assertNumQueries(2):
+            versions = list(VersionQueryTool().get_queryset())
+            titles = sorted(version.content.title for version in versions)
+            usernames = {version.created_by.username for version in versions}
+
+        self.assertEqual(titles, [f'Page {i}' for i in range(5)])
+        self.assertEqual(usernames, {'admin'})
+        self.assertEqual(len(VersionQueryTool().get_queryset().values('pk', 'object_id')), 5)
+
+
+class TestVersionStateIndexMigration(TransactionTestCase):
+    """Test the migration adding the composite index of the version lookups"""
+
+    def _get_columns(self, model):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        index = constraints.get('djangocms_mcp_version_state')
+        return index['columns'] if index else None
+
+    def test_add_and_remove_index(self):
+        """Test the index is added to the version table and removed again"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        migration = import_module('djangocms_mcp.migrations.0003_version_state_index')
+
+        with connection.schema_editor() as schema_editor:
+            migration.add_index(None, schema_editor)
+            # Running it again is harmless
+            migration.add_index(None, schema_editor)
+        self.assertEqual(self._get_columns(Version), ['content_type_id', 'object_id', 'state', 'id'])
+
+        with connection.schema_editor() as schema_editor:
+            migration.remove_index(None, schema_editor)
+        self.assertIsNone(self._get_columns(Version))
+
+    def test_index_is_added_back_after_migrate(self):
+        """Test post_migrate adds the index back, while the migration is applied, when it was dropped"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from django.core.management.sql import emit_post_migrate_signal
+        from django.db.migrations.recorder import MigrationRecorder
+        from djangocms_versioning.models import Version
+
+        with connection.schema_editor() as schema_editor:
+            remove_version_state_index(schema_editor)
+        # The tests run without migrations
+        recorder = MigrationRecorder(connection)
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        self.assertIsNone(self._get_columns(Version))
+
+        recorder.record_applied(*VERSION_STATE_MIGRATION)
+        self.addCleanup(recorder.record_unapplied, *VERSION_STATE_MIGRATION)
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+
+        self.assertEqual(self._get_columns(Version), ['content_type_id', 'object_id', 'state', 'id'])
+
+    def test_depends_on_a_fixed_migration(self):
+        """Test the migration doesn't depend on the latest migration of djangocms-versioning"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+
+        migration = import_module('djangocms_mcp.migrations.0003_version_state_index')
+
+        self.assertIn(('djangocms_versioning', '0004_auto_20180730_1135'), migration.Migration.dependencies)
+        self.assertNotIn('__latest__', [name for _app, name in migration.Migration.dependencies])
+
 
 class TestDjangoCMSVersioningTools(TestCase):
     """Test the main MCP tools class"""
@@ -273,6 +377,28 @@ class TestDjangoCMSVersioningTools(TestCase):
         # Mock field handling might vary, but shouldn't crash
         self.assertIsInstance(result, dict)
 
+    def test_serialize_plugin_model_instance(self):
+        """Test model instances are serialized like the introspection path"""
+        from django.utils import timezone
+        from djangocms_mcp.models import MCPServerPlugin
+
+        plugin_instance = MCPServerPlugin(
+            id=7, title='Server', description='', enabled=False, changed_date=timezone.now(),
+        )
+
+        result = self.tools._serialize_plugin(plugin_instance)
+
+        self.assertEqual(result, self.tools._serialize_plugin_fields(plugin_instance))
+        self.assertEqual(result['title'], 'Server')
+        self.assertEqual(result['enabled'], 'False')
+        self.assertEqual(result['changed_date'], plugin_instance.changed_date.isoformat())
+
+    def test_plugin_serializer_is_cached_per_model(self):
+        """Test the plugin serializer is compiled once per model class"""
+        from djangocms_mcp.models import MCPServerPlugin
+
+        self.assertIs(mcp._get_plugin_serializer(MCPServerPlugin), mcp._get_plugin_serializer(MCPServerPlugin))
+
 
 class TestMCPErrorHandling(TestCase):
     """Test error handling in MCP functionality"""
@@ -284,6 +410,7 @@ class TestMCPErrorHandling(TestCase):
         """Test get_page_tree with None language uses default"""
         with patch('djangocms_mcp.mcp.settings') as mock_settings:
             mock_settings.LANGUAGE_CODE = 'en'
+            mock_settings.SITE_ID = 1
             
             # Mock empty page queryset
             with patch('djangocms_mcp.mcp.Page') as mock_page:
@@ -325,3 +452,758 @@ class TestMCPErrorHandling(TestCase):
         
         expected = {'error': 'Versioning is not enabled'}
         self.assertEqual(result, expected)
+
+
+class TestPageTree(TestCase):
+    """Test get_page_tree against a real page tree"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        # Index the pages for search_pages
+        with self.captureOnCommitCallbacks(execute=True):
+            self.home = create_page('Home', 'template_1.html', 'en', created_by=self.user)
+            self.about = create_page('About', 'template_1.html', 'en', created_by=self.user, parent=self.home)
+            self.team = create_page('Team', 'template_1.html', 'en', created_by=self.user, parent=self.about)
+            self.contact = create_page('Contact', 'template_1.html', 'en', created_by=self.user)
+
+    def test_get_page_tree_nesting(self):
+        """Test the tree is nested by treebeard depth"""
+        result = self.tools.get_page_tree(language='en')
+
+        self.assertEqual([node['title'] for node in result['tree']], ['Home', 'Contact'])
+        home = result['tree'][0]
+        self.assertEqual(home['level'], 0)
+        self.assertEqual(home['children'][0]['title'], 'About')
+        self.assertEqual(home['children'][0]['slug'], 'about')
+        self.assertEqual(home['children'][0]['level'], 1)
+        self.assertEqual(home['children'][0]['children'][0]['title'], 'Team')
+        self.assertEqual(home['children'][0]['children'][0]['level'], 2)
+
+    def test_get_page_tree_query_count_is_constant(self):
+        """Test the number of queries does not grow with the number of pages"""
+        from cms.api import create_page
+
+        with self.assertNumQueries(4):
+            self.tools.get_page_tree(language='en')
+
+        for i in range(5):
+            create_page(f'Extra {i}', 'template_1.html', 'en', created_by=self.user, parent=self.team)
+
+        with self.assertNumQueries(4):
+            result = self.tools.get_page_tree(language='en')
+
+        team = result['tree'][0]['children'][0]['children'][0]
+        self.assertEqual(len(team['children']), 5)
+
+    def test_get_page_tree_state_filter_prunes_branches(self):
+        """Test pages without a version in the state are left out with their descendants"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        home_version = Version.objects.get(cms_pagecontent__page=self.home)
+        home_version.publish(self.user)
+
+        result = self.tools.get_page_tree(language='en', state=mcp.PUBLISHED)
+
+        self.assertEqual(len(result['tree']), 1)
+        home = result['tree'][0]
+        self.assertEqual(home['id'], self.home.pk)
+        self.assertEqual(home['version_id'], home_version.pk)
+        self.assertTrue(home['is_published'])
+        self.assertEqual(home['created_by'], 'admin')
+        self.assertEqual(home['children'], [])
+
+    def test_get_page_tree_fields(self):
+        """Test only the requested node attributes are computed"""
+        with self.assertNumQueries(3):
+            result = self.tools.get_page_tree(language='en', fields=['title'])
+
+        home = result['tree'][0]
+        self.assertEqual(home, {
+            'id': self.home.pk,
+            'title': 'Home',
+            'children': home['children'],
+        })
+        self.assertEqual(home['children'][0]['title'], 'About')
+
+        with self.assertNumQueries(2):
+            result = self.tools.get_page_tree(language='en', fields=['level'])
+        self.assertEqual(result['tree'][1], {'id': self.contact.pk, 'level': 0, 'children': []})
+
+    def test_get_page_tree_if_none_match(self):
+        """Test the tree is not rebuilt while its version token is current"""
+        from cms.models import PageContent
+
+        token = self.tools.get_page_tree(language='en')['version_token']
+
+        result = self.tools.get_page_tree(language='en', if_none_match=token)
+        self.assertEqual(result, {'not_modified': True, 'version_token': token})
+
+        content = PageContent.admin_manager.get(page=self.contact, language='en')
+        content.title = 'Contact us'
+        content.save()
+        result = self.tools.get_page_tree(language='en', if_none_match=token)
+        self.assertEqual(result['tree'][1]['title'], 'Contact us')
+        self.assertNotEqual(result['version_token'], token)
+
+    def test_get_page_tree_token_follows_arguments(self):
+        """Test the token of one batch of the tree doesn't match the next"""
+        first = self.tools.get_page_tree(language='en', limit=1)
+
+        result = self.tools.get_page_tree(
+            language='en', limit=1, cursor=first['next_cursor'], if_none_match=first['version_token'],
+        )
+
+        self.assertNotIn('not_modified', result)
+        self.assertNotEqual(result['version_token'], first['version_token'])
+        self.assertNotIn('not_modified', self.tools.get_page_tree(
+            language='en', max_depth=1, if_none_match=first['version_token'],
+        ))
+
+    def test_get_page_tree_invalid_limits(self):
+        """Test limits and depths below 1 are reported"""
+        for arguments, error in (
+            ({'limit': -1}, 'limit must be at least 1'),
+            ({'limit': 0}, 'limit must be at least 1'),
+            ({'max_depth': -1}, 'max_depth must be at least 1'),
+        ):
+            with self.subTest(**arguments):
+                self.assertEqual(self.tools.get_page_tree(language='en', **arguments), {'error': error})
+
+    def test_get_page_tree_unknown_field(self):
+        """Test unknown fields are reported"""
+        result = self.tools.get_page_tree(language='en', fields=['title', 'colour'])
+
+        self.assertEqual(result, {'error': 'Unknown fields: colour'})
+
+    def test_search_pages_fields(self):
+        """Test only the requested result attributes are computed"""
+        result = self.tools.search_pages('About', language='en', fields=['slug'])
+
+        self.assertEqual(result['results'], [{'id': self.about.pk, 'slug': 'about'}])
+
+    def test_search_pages_query_count_is_constant(self):
+        """Test version metadata for search results is loaded with the pages"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from cms.api import create_page
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                create_page(f'Team {i}', 'template_1.html', 'en', created_by=self.user, parent=self.about)
+
+        # Two for the ranked matches and their total, one for the documents,
+        # the pages with their versions and their urls
+        with self.assertNumQueries(5):
+            result = self.tools.search_pages('team', language='en')
+
+        self.assertEqual(result['count'], 6)
+        self.assertTrue(all(item['version_state'] == mcp.DRAFT for item in result['results']))
+
+    def test_get_page_tree_branch_and_depth(self):
+        """Test fetching one branch a limited number of levels deep"""
+        from cms.api import create_page
+
+        create_page('Careers', 'template_1.html', 'en', created_by=self.user, parent=self.team)
+
+        result = self.tools.get_page_tree(language='en', root_page_id=self.about.pk, max_depth=2)
+
+        self.assertEqual(len(result['tree']), 1)
+        about = result['tree'][0]
+        self.assertEqual(about['id'], self.about.pk)
+        self.assertEqual(about['parent_id'], self.home.pk)
+        self.assertEqual([child['title'] for child in about['children']], ['Team'])
+        self.assertEqual(about['children'][0]['parent_id'], self.about.pk)
+        self.assertEqual(about['children'][0]['children'], [])
+        self.assertIsNone(result['next_cursor'])
+
+    def test_get_page_tree_unknown_root_page(self):
+        """Test an unknown root page returns an error"""
+        result = self.tools.get_page_tree(root_page_id=999999)
+
+        self.assertEqual(result, {'error': 'Page with id 999999 not found'})
+
+    def test_get_page_tree_cursor_pagination(self):
+        """Test paging through the tree visits every node once in tree order"""
+        seen = []
+        batches = []
+        cursor = None
+        while True:
+            result = self.tools.get_page_tree(language='en', limit=3, cursor=cursor)
+            batches.append(result['tree'])
+
+            def walk(nodes):
+                for node in nodes:
+                    seen.append(node['id'])
+                    walk(node['children'])
+
+            walk(result['tree'])
+            cursor = result['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(seen, [self.home.pk, self.about.pk, self.team.pk, self.contact.pk])
+        self.assertEqual(batches[1][0]['id'], self.contact.pk)
+
+    def test_get_page_tree_cursor_continues_branch(self):
+        """Test a branch split across batches continues at the top level"""
+        first = self.tools.get_page_tree(language='en', limit=2)
+        second = self.tools.get_page_tree(language='en', limit=2, cursor=first['next_cursor'])
+
+        self.assertEqual([node['id'] for node in second['tree']], [self.team.pk, self.contact.pk])
+        self.assertEqual(second['tree'][0]['parent_id'], self.about.pk)
+        self.assertIsNone(second['next_cursor'])
+
+
+class TestPageTreeExport(TestCase):
+    """Test the flat, streamed page tree export"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.home = create_page('Home', 'template_1.html', 'en', created_by=self.user)
+        self.about = create_page('About', 'template_1.html', 'en', created_by=self.user, parent=self.home)
+        self.team = create_page('Team', 'template_1.html', 'en', created_by=self.user, parent=self.about)
+
+    def test_iter_page_tree_records(self):
+        """Test records come in tree order with their parent ids"""
+        records = list(mcp.iter_page_tree_records(language='en', chunk_size=2))
+
+        self.assertEqual([record['id'] for record in records], [self.home.pk, self.about.pk, self.team.pk])
+        self.assertEqual(records[2], {
+            'id': self.team.pk,
+            'parent_id': self.about.pk,
+            'depth': 3,
+            'title': 'Team',
+            'slug': 'team',
+            'state': mcp.DRAFT,
+        })
+
+    def test_iter_page_tree_records_prunes_filtered_branches(self):
+        """Test descendants of pages left out by the state filter are left out"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        for page in (self.home, self.team):
+            Version.objects.get(cms_pagecontent__page=page).publish(self.user)
+
+        records = list(mcp.iter_page_tree_records(language='en', state=mcp.PUBLISHED))
+
+        self.assertEqual([record['id'] for record in records], [self.home.pk])
+
+    def test_iter_page_tree_records_unknown_root_page(self):
+        """Test an unknown root page raises before iteration starts"""
+        from cms.models import Page
+
+        with self.assertRaises(Page.DoesNotExist):
+            mcp.iter_page_tree_records(root_page_id=999999)
+
+    def test_export_view_streams_ndjson(self):
+        """Test the export view streams one JSON object per line"""
+        import json
+        from django.test import RequestFactory
+        from djangocms_mcp.views import PageTreeExportView
+
+        request = RequestFactory().get('/page-tree.ndjson', {'root_page_id': self.about.pk})
+        response = PageTreeExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['About', 'Team'])
+
+    def test_export_view_unknown_root_page(self):
+        """Test the export view returns 404 for an unknown root page"""
+        from django.test import RequestFactory
+        from djangocms_mcp.views import PageTreeExportView
+
+        request = RequestFactory().get('/page-tree.ndjson', {'root_page_id': 999999})
+        response = PageTreeExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TestPageDetail(TestCase):
+    """Test get_page_detail against a real page with plugins"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+
+    def _add_plugins(self, count, page=None):
+        from cms.models import PageContent, Placeholder
+        from djangocms_mcp.models import MCPServerPlugin
+
+        content = PageContent.admin_manager.get(page=page or self.page, language='en')
+        placeholder = Placeholder.objects.get_for_obj(content).get(slot='content')
+        position = placeholder.get_last_plugin_position('en') or 0
+        for i in range(count):
+            MCPServerPlugin.objects.create(
+                placeholder=placeholder,
+                plugin_type='MCPServerCMSPlugin',
+                language='en',
+                position=position + i + 1,
+                title=f'Server {position + i}',
+            )
+
+    def test_get_page_detail_serializes_plugins(self):
+        """Test plugins are returned downcast and in position order"""
+        self._add_plugins(3)
+
+        result = self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertEqual(result['title'], 'Landing')
+        self.assertEqual(result['template'], 'template_1.html')
+        content = [placeholder for placeholder in result['placeholders'] if placeholder['slot'] == 'content'][0]
+        self.assertEqual([plugin['data']['title'] for plugin in content['plugins']], ['Server 0', 'Server 1', 'Server 2'])
+        self.assertEqual(content['plugins'][0]['plugin_type'], 'MCPServerCMSPlugin')
+
+    def test_get_page_detail_query_count_is_constant(self):
+        """Test the number of queries does not grow with the number of plugins"""
+        self._add_plugins(1)
+        with CaptureQueriesContext(connection) as few:
+            self.tools.get_page_detail(self.page.pk, language='en')
+
+        self._add_plugins(20)
+        with CaptureQueriesContext(connection) as many:
+            result = self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertEqual(len(many), len(few))
+        content = [placeholder for placeholder in result['placeholders'] if placeholder['slot'] == 'content'][0]
+        self.assertEqual(len(content['plugins']), 21)
+
+    def test_get_page_detail_unknown_page(self):
+        """Test an unknown page returns an error"""
+        result = self.tools.get_page_detail(999999)
+
+        self.assertEqual(result, {'error': 'Page with id 999999 not found'})
+
+    def test_get_page_detail_fields(self):
+        """Test the version list and placeholders are only loaded when requested"""
+        self._add_plugins(2)
+        with CaptureQueriesContext(connection) as full:
+            self.tools.get_page_detail(self.page.pk, language='en')
+
+        with CaptureQueriesContext(connection) as projected:
+            result = self.tools.get_page_detail(self.page.pk, language='en', fields=['title', 'template'])
+
+        self.assertEqual(result, {
+            'id': self.page.pk,
+            'title': 'Landing',
+            'template': 'template_1.html',
+            'version_token': result['version_token'],
+        })
+        self.assertLess(len(projected), len(full))
+
+    def test_get_page_detail_if_none_match(self):
+        """Test an unchanged page is reported as not modified without loading it"""
+        from cms.models import PageContent
+
+        token = self.tools.get_page_detail(self.page.pk, language='en')['version_token']
+
+        with self.assertNumQueries(1):
+            result = self.tools.get_page_detail(self.page.pk, language='en', if_none_match=token)
+        self.assertEqual(result, {'not_modified': True, 'version_token': token})
+
+        self._add_plugins(1)
+        content = PageContent.admin_manager.get(page=self.page, language='en')
+        content.title = 'Landing page'
+        content.save()
+        result = self.tools.get_page_detail(self.page.pk, language='en', if_none_match=token)
+        self.assertEqual(result['title'], 'Landing page')
+        self.assertNotEqual(result['version_token'], token)
+
+    def test_get_page_detail_token_follows_arguments(self):
+        """Test the token of the latest content doesn't match an older version or other fields"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        old = Version.objects.get(cms_pagecontent__page=self.page)
+        old.publish(self.user)
+        old.copy(self.user)
+        token = self.tools.get_page_detail(self.page.pk, language='en')['version_token']
+
+        result = self.tools.get_page_detail(self.page.pk, language='en', version_id=old.pk, if_none_match=token)
+        self.assertEqual(result['version_id'], old.pk)
+        self.assertNotIn('not_modified', self.tools.get_page_detail(
+            self.page.pk, language='en', fields=['title'], if_none_match=token,
+        ))
+
+    def test_get_page_detail_token_follows_plugins(self):
+        """Test editing, adding or deleting a plugin changes the token of the page detail"""
+        from djangocms_mcp.models import MCPServerPlugin
+
+        self._add_plugins(2)
+        token = self.tools.get_page_detail(self.page.pk, language='en')['version_token']
+
+        plugin = MCPServerPlugin.objects.get(title='Server 0')
+        plugin.title = 'Renamed'
+        plugin.save()
+        result = self.tools.get_page_detail(self.page.pk, language='en', if_none_match=token)
+        self.assertEqual(result['placeholders'][0]['plugins'][0]['data']['title'], 'Renamed')
+        self.assertNotEqual(result['version_token'], token)
+
+        token = result['version_token']
+        MCPServerPlugin.objects.filter(title='Server 1').delete()
+        result = self.tools.get_page_detail(self.page.pk, language='en', if_none_match=token)
+        self.assertNotIn('not_modified', result)
+
+    def test_get_page_versions_if_none_match(self):
+        """Test the version list carries a token that changes with new versions"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        token = self.tools.get_page_versions(self.page.pk)['version_token']
+        self.assertEqual(
+            self.tools.get_page_versions(self.page.pk, if_none_match=token),
+            {'not_modified': True, 'version_token': token},
+        )
+        self.assertNotIn('not_modified', self.tools.get_page_versions(self.page.pk, limit=1, if_none_match=token))
+
+        Version.objects.get(cms_pagecontent__page=self.page).publish(self.user)
+        self.assertNotIn('not_modified', self.tools.get_page_versions(self.page.pk, if_none_match=token))
+
+    def test_get_pages_detail_matches_get_page_detail(self):
+        """Test each batch entry carries the same data as get_page_detail"""
+        self._add_plugins(2)
+
+        result = self.tools.get_pages_detail([self.page.pk], language='en')
+
+        detail = self.tools.get_page_detail(self.page.pk, language='en')
+        del detail['version_token']
+        self.assertEqual(result['pages'][self.page.pk], detail)
+
+    def test_get_pages_detail_query_count_is_constant(self):
+        """Test the number of queries does not grow with the number of pages"""
+        from cms.api import create_page
+
+        self._add_plugins(1)
+        with CaptureQueriesContext(connection) as few:
+            self.tools.get_pages_detail([self.page.pk], language='en')
+
+        page_ids = [self.page.pk]
+        for i in range(5):
+            page = create_page(f'Page {i}', 'template_1.html', 'en', created_by=self.user)
+            self._add_plugins(2, page=page)
+            page_ids.append(page.pk)
+        with CaptureQueriesContext(connection) as many:
+            result = self.tools.get_pages_detail(page_ids, language='en')
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(list(result['pages']), page_ids)
+        self.assertEqual(result['pages'][page_ids[-1]]['title'], 'Page 4')
+
+    def test_get_pages_detail_reports_errors_per_page(self):
+        """Test unknown pages get an error entry without failing the batch"""
+        result = self.tools.get_pages_detail([self.page.pk, 999999], language='en')
+
+        self.assertEqual(result['pages'][self.page.pk]['title'], 'Landing')
+        self.assertEqual(result['pages'][999999], {'error': 'Page with id 999999 not found'})
+
+    def test_get_pages_detail_include(self):
+        """Test only the requested optional sections are returned"""
+        result = self.tools.get_pages_detail([self.page.pk], language='en', include=[])
+
+        self.assertNotIn('placeholders', result['pages'][self.page.pk])
+        self.assertNotIn('all_versions', result['pages'][self.page.pk])
+
+        result = self.tools.get_pages_detail([self.page.pk], include=['plugins'])
+        self.assertEqual(result, {'error': 'Unknown sections: plugins'})
+
+    def test_get_pages_detail_invalid_ids(self):
+        """Test page ids must be a list of integers"""
+        for page_ids in ('1,2', [self.page.pk, 'all'], None):
+            with self.subTest(page_ids=page_ids):
+                self.assertEqual(self.tools.get_pages_detail(page_ids), {'error': 'page_ids must be a list of ids'})
+
+    @override_settings(DJANGO_CMS_MCP={'MAX_PAGES_DETAIL_PER_REQUEST': 2})
+    def test_get_pages_detail_too_many_pages(self):
+        """Test the number of pages per call is capped"""
+        result = self.tools.get_pages_detail([self.page.pk, 2, 3])
+
+        self.assertEqual(result, {'error': 'Too many pages: 3, at most 2 can be retrieved at once'})
+
+
+@override_settings(LANGUAGES=[('en', 'English'), ('de', 'German'), ('fr', 'French')])
+class TestPageDetailLanguages(TestCase):
+    """Test get_page_detail for several languages at once"""
+
+    def setUp(self):
+        from cms.api import create_page, create_page_content
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+        create_page_content('de', 'Startseite', self.page, created_by=self.user)
+
+    def _add_plugin(self, language, title):
+        from cms.models import PageContent, Placeholder
+        from djangocms_mcp.models import MCPServerPlugin
+
+        content = PageContent.admin_manager.get(page=self.page, language=language)
+        placeholder = Placeholder.objects.get_for_obj(content).get(slot='content')
+        MCPServerPlugin.objects.create(
+            placeholder=placeholder,
+            plugin_type='MCPServerCMSPlugin',
+            language=language,
+            position=(placeholder.get_last_plugin_position(language) or 0) + 1,
+            title=title,
+        )
+
+    def _get_plugin_titles(self, detail):
+        content = [placeholder for placeholder in detail['placeholders'] if placeholder['slot'] == 'content'][0]
+        return [plugin['data']['title'] for plugin in content['plugins']]
+
+    def test_languages_map(self):
+        """Test each language gets the same data as a single language call"""
+        self._add_plugin('en', 'Server')
+        self._add_plugin('de', 'Server DE')
+
+        result = self.tools.get_page_detail(self.page.pk, languages=['en', 'de'])
+
+        self.assertEqual(list(result['languages']), ['en', 'de'])
+        self.assertEqual(result['languages']['de']['title'], 'Startseite')
+        self.assertEqual(self._get_plugin_titles(result['languages']['de']), ['Server DE'])
+        for language in ('en', 'de'):
+            detail = self.tools.get_page_detail(self.page.pk, language=language)
+            del detail['version_token']
+            if 'all_versions' in detail:
+                # The single language version list covers all languages
+                detail['all_versions'] = [
+                    version for version in detail['all_versions']
+                    if version in result['languages'][language]['all_versions']
+                ]
+            self.assertEqual(result['languages'][language], detail)
+
+    def test_query_count_does_not_grow_with_languages(self):
+        """Test all languages are loaded with the queries of one"""
+        from cms.api import create_page_content
+
+        self._add_plugin('en', 'Server')
+        with CaptureQueriesContext(connection) as single:
+            self.tools.get_page_detail(self.page.pk, languages=['en'])
+
+        create_page_content('fr', 'Accueil', self.page, created_by=self.user)
+        self._add_plugin('fr', 'Server FR')
+        with CaptureQueriesContext(connection) as several:
+            result = self.tools.get_page_detail(self.page.pk, languages=['en', 'de', 'fr'])
+
+        self.assertEqual(len(several), len(single))
+        self.assertEqual(result['languages']['fr']['title'], 'Accueil')
+        self.assertEqual(self._get_plugin_titles(result['languages']['fr']), ['Server FR'])
+
+    def test_missing_language(self):
+        """Test a language the page has no content in doesn't fail the others"""
+        result = self.tools.get_page_detail(self.page.pk, languages=['de', 'fr'], fields=['title'])
+
+        self.assertEqual(result['languages']['de'], {'id': self.page.pk, 'title': 'Startseite'})
+        if mcp.VERSIONING_ENABLED:
+            self.assertEqual(
+                result['languages']['fr'], {'error': f'No versions found for page {self.page.pk} in fr'},
+            )
+        else:
+            self.assertEqual(result['languages']['fr'], {'id': self.page.pk, 'title': None})
+
+    def test_invalid_arguments(self):
+        """Test languages can't be empty or combined with a version"""
+        self.assertEqual(
+            self.tools.get_page_detail(self.page.pk, languages=[]), {'error': 'languages must not be empty'},
+        )
+        self.assertEqual(
+            self.tools.get_page_detail(self.page.pk, languages=['en'], version_id=1),
+            {'error': 'version_id can only be used with a single language'},
+        )
+
+    def test_version_cursor_per_language(self):
+        """Test the version list of each language continues in get_page_versions with its language"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        for language in ('en', 'de'):
+            version = Version.objects.get(cms_pagecontent__page=self.page, cms_pagecontent__language=language)
+            version.publish(self.user)
+            version.copy(self.user)
+
+        with self.settings(DJANGO_CMS_MCP={'VERSIONS_LIMIT': 1}):
+            detail = self.tools.get_page_detail(self.page.pk, languages=['en', 'de'])['languages']['de']
+            rest = self.tools.get_page_versions(
+                self.page.pk, language='de', cursor=detail['all_versions_next_cursor'],
+            )
+
+        expected = Version.objects.filter(cms_pagecontent__page=self.page, cms_pagecontent__language='de')
+        self.assertEqual(
+            [version['id'] for version in detail['all_versions'] + rest['versions']],
+            list(expected.order_by('-pk').values_list('pk', flat=True)),
+        )
+        self.assertEqual(rest['language'], 'de')
+        self.assertEqual(rest['total_versions'], 2)
+
+class TestPageVersionHistory(TestCase):
+    """Test the version lists of the page tools are paginated"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+
+    def _add_versions(self, page, count):
+        from djangocms_versioning.constants import DRAFT
+        from djangocms_versioning.models import Version
+
+        version = Version.objects.filter(cms_pagecontent__page=page).latest('pk')
+        for _ in range(count):
+            if version.state == DRAFT:
+                version.publish(self.user)
+            version = version.copy(self.user)
+
+    def test_get_page_versions_cursor(self):
+        """Test following next_cursor returns every version once, newest first"""
+        from djangocms_versioning.models import Version
+
+        self._add_versions(self.page, 6)
+        expected = list(Version.objects.filter(cms_pagecontent__page=self.page).order_by('-pk').values_list(
+            'pk', flat=True,
+        ))
+
+        seen = []
+        cursor = None
+        with self.assertNumQueries(4 * 4):
+            for _ in range(4):
+                result = self.tools.get_page_versions(self.page.pk, limit=2, cursor=cursor)
+                seen.extend(version['id'] for version in result['versions'])
+                self.assertEqual(result['total_versions'], 7)
+                cursor = result['next_cursor']
+
+        self.assertEqual(seen, expected)
+        self.assertIsNone(cursor)
+        self.assertEqual(result['versions'][-1]['created_by'], 'admin')
+
+    def test_get_page_versions_invalid_limit(self):
+        """Test limits below 1 are reported"""
+        for limit in (0, -1):
+            with self.subTest(limit=limit):
+                self.assertEqual(
+                    self.tools.get_page_versions(self.page.pk, limit=limit), {'error': 'limit must be at least 1'},
+                )
+
+    def test_get_page_versions_default_limit(self):
+        """Test the batch size defaults to the VERSIONS_LIMIT setting"""
+        self._add_versions(self.page, 3)
+
+        with self.settings(DJANGO_CMS_MCP={'VERSIONS_LIMIT': 3}):
+            result = self.tools.get_page_versions(self.page.pk)
+
+        self.assertEqual(len(result['versions']), 3)
+        self.assertEqual(result['next_cursor'], result['versions'][-1]['id'])
+
+    def test_get_page_detail_all_versions(self):
+        """Test the detail holds the newest versions and a cursor for the rest"""
+        self._add_versions(self.page, 4)
+
+        with self.settings(DJANGO_CMS_MCP={'VERSIONS_LIMIT': 2}):
+            result = self.tools.get_page_detail(self.page.pk, language='en')
+            rest = self.tools.get_page_versions(self.page.pk, cursor=result['all_versions_next_cursor'])
+
+        self.assertEqual(len(result['all_versions']), 2)
+        self.assertEqual(result['all_versions'][0]['id'], result['version_id'])
+        self.assertLess(rest['versions'][0]['id'], result['all_versions'][-1]['id'])
+
+        result = self.tools.get_page_detail(self.page.pk, language='en', include_versions=False)
+        self.assertNotIn('all_versions', result)
+        self.assertIn('placeholders', result)
+
+    def test_get_pages_detail_all_versions(self):
+        """Test each page's version list is limited within one query"""
+        from cms.api import create_page
+
+        other = create_page('Other', 'template_1.html', 'en', created_by=self.user)
+        self._add_versions(self.page, 4)
+        self._add_versions(other, 1)
+
+        with self.settings(DJANGO_CMS_MCP={'VERSIONS_LIMIT': 3}):
+            result = self.tools.get_pages_detail([self.page.pk, other.pk], language='en')
+
+        page, other = result['pages'][self.page.pk], result['pages'][other.pk]
+        self.assertEqual(len(page['all_versions']), 3)
+        self.assertEqual(page['all_versions_next_cursor'], page['all_versions'][-1]['id'])
+        self.assertEqual(page['all_versions'][0]['id'], page['version_id'])
+        self.assertEqual(len(other['all_versions']), 2)
+        self.assertIsNone(other['all_versions_next_cursor'])
+
+
+class TestVersionTools(TestCase):
+    """Test the tools creating, publishing and archiving single versions"""
+
+    def setUp(self):
+        from types import SimpleNamespace
+
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.tools.request = SimpleNamespace(user=self.user)
+
+    def test_create_page(self):
+        """Test create_page returns the draft version of the new page"""
+        from djangocms_versioning.constants import DRAFT
+
+        result = self.tools.create_page('Landing', 'template_1.html', language='en')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['title'], 'Landing')
+        self.assertEqual(result['version_state'], DRAFT)
+        self.assertEqual(result['created_by'], 'admin')
+
+    def test_publish_create_and_archive(self):
+        """Test a version is published, copied to a new draft and that draft archived"""
+        from djangocms_versioning.constants import ARCHIVED, DRAFT, PUBLISHED
+
+        page = self.tools.create_page('Landing', 'template_1.html', language='en')
+
+        published = self.tools.publish_version(page['version_id'], language='en')
+        self.assertEqual(published['new_state'], PUBLISHED)
+        self.assertEqual(published['page_id'], page['page_id'])
+        self.assertTrue(published['published_url'].endswith('/landing/'))
+
+        draft = self.tools.create_version(page['page_id'])
+        self.assertEqual(draft['copied_from_version'], page['version_id'])
+        self.assertEqual(draft['version_state'], DRAFT)
+
+        archived = self.tools.archive_version(draft['version_id'])
+        self.assertEqual(archived['new_state'], ARCHIVED)
+        self.assertEqual(archived['page_id'], page['page_id'])
+
+    def test_archive_published_version(self):
+        """Test only drafts are archived"""
+        page = self.tools.create_page('Landing', 'template_1.html', language='en')
+        self.tools.publish_version(page['version_id'])
+
+        result = self.tools.archive_version(page['version_id'])
+
+        self.assertIn('can not be archived', result['error'])
+
+    def test_version_tools_require_user(self):
+        """Test the version tools refuse anonymous calls"""
+        self.tools.request = None
+
+        self.assertIn('error', self.tools.create_page('Landing', 'template_1.html'))
+        self.assertIn('error', self.tools.publish_version(1))
+        self.assertIn('error', self.tools.create_version(1))
+        self.assertIn('error', self.tools.archive_version(1))
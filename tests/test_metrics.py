@@ -0,0 +1,121 @@
+"""
+Test the per-tool metrics
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from mcp.server.fastmcp.tools import ToolManager
+
+from djangocms_mcp.mcp import DjangoCMSVersioningTools, PageQueryTool
+from djangocms_mcp.metrics import get_metrics, measure, render_prometheus, reset_metrics
+from djangocms_mcp.views import MetricsView
+
+
+class TestMetrics(TestCase):
+    """Test tool calls are counted with their queries and responses"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+        reset_metrics()
+
+    def test_tool_calls_are_measured(self):
+        """Test a tool call records its queries and response size"""
+        with CaptureQueriesContext(connection) as queries:
+            result = self.tools.get_page_detail(self.page.pk, language='en')
+        self.tools.get_page_detail(999999)
+
+        metrics = get_metrics()['get_page_detail']
+        self.assertEqual(metrics['calls'], 2)
+        self.assertEqual(metrics['errors'], 1)
+        self.assertGreaterEqual(metrics['db_queries'], len(queries) + 1)
+        self.assertGreater(metrics['wall_time'], 0)
+        self.assertGreater(metrics['db_time'], 0)
+        # Calls from Python aren't serialized, so they add no response size
+        self.assertEqual(metrics['response_bytes'], 0)
+        self.assertEqual(result['title'], 'Landing')
+
+    def test_response_size_is_measured_where_serialized(self):
+        """Test the size of a response is taken from the JSON text the MCP server makes of it"""
+        tools = {tool.name: tool for tool in DjangoCMSVersioningTools()._add_tools_to(ToolManager())}
+
+        # What FastMCP does with the result of each tool call
+        result = self.tools.get_page_tree(language='en')
+        content, structured = tools['get_page_tree'].fn_metadata.convert_result(result)
+
+        self.assertEqual(structured['result']['tree'][0]['title'], 'Landing')
+        self.assertEqual(get_metrics()['get_page_tree']['response_bytes'], len(content[0].text.encode()))
+
+    def test_measuring_adds_no_queries(self):
+        """Test a measured call runs the same queries as the plain method"""
+        plain = DjangoCMSVersioningTools.get_page_detail.__wrapped__.__get__(self.tools)
+
+        with CaptureQueriesContext(connection) as plain_queries:
+            plain(self.page.pk, language='en')
+        with CaptureQueriesContext(connection) as measured_queries:
+            self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertEqual(
+            [query['sql'] for query in measured_queries], [query['sql'] for query in plain_queries],
+        )
+
+    def test_exceptions_are_counted(self):
+        """Test a call that raises is recorded as an error"""
+        def fail():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            measure('failing', fail)
+
+        self.assertEqual(get_metrics()['failing']['errors'], 1)
+
+    def test_metrics_disabled(self):
+        """Test nothing is recorded when METRICS_ENABLED is off"""
+        with self.settings(DJANGO_CMS_MCP={'METRICS_ENABLED': False}):
+            self.tools.get_languages()
+
+        self.assertEqual(get_metrics(), {})
+
+    def test_query_toolset_is_measured(self):
+        """Test evaluating a query toolset's queryset counts as a call of the toolset"""
+        rows = list(PageQueryTool().get_queryset().values('pk'))
+
+        metrics = get_metrics()['PageQueryTool']
+        self.assertEqual(rows, [{'pk': self.page.pk}])
+        self.assertEqual(metrics['calls'], 1)
+        self.assertEqual(metrics['db_queries'], 1)
+
+    def test_get_server_metrics(self):
+        """Test the metrics tool returns the counters of each tool"""
+        self.tools.get_languages()
+
+        result = self.tools.get_server_metrics()
+
+        self.assertEqual(result['tools']['get_languages']['calls'], 1)
+        self.assertTrue(result['metrics_enabled'])
+        self.assertIn('since', result)
+
+    def test_prometheus_view(self):
+        """Test the view renders the counters in the Prometheus text format"""
+        self.tools.get_languages()
+
+        response = MetricsView.as_view()(RequestFactory().get('/metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('# TYPE djangocms_mcp_tool_calls_total counter', text)
+        self.assertIn('djangocms_mcp_tool_calls_total{tool="get_languages"} 1', text)
+        self.assertEqual(text, render_prometheus())
+
+    def test_tool_signatures_are_kept(self):
+        """Test measured methods are still registered with their parameters and docs"""
+        tools = {tool.name: tool for tool in DjangoCMSVersioningTools()._add_tools_to(ToolManager())}
+
+        self.assertIn('page_id', tools['get_page_detail'].parameters['properties'])
+        self.assertIn('get_server_metrics', tools)
+        self.assertTrue(tools['get_page_detail'].description.startswith('Retrieve full page content'))
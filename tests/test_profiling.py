@@ -0,0 +1,169 @@
+"""
+Test the profiling dumps of tool calls
+"""
+import json
+import os
+import pstats
+import stat
+import tempfile
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from mcp.server.fastmcp.tools import ToolManager
+
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+from djangocms_mcp.profiling import profile_call
+
+
+class TestProfiling(TestCase):
+    """Test profiled calls dump their profile, SQL and timings"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.page = create_page('Landing', 'template_1.html', 'en', created_by=self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.profile_dir = directory.name
+
+    def _settings(self, **settings):
+        return self.settings(DJANGO_CMS_MCP={'CACHE_TIMEOUT': 0, 'PROFILE_DIR': self.profile_dir, **settings})
+
+    def _read_call(self, path):
+        with open(os.path.join(path, 'call.json')) as f:
+            return json.load(f)
+
+    def test_profile_argument(self):
+        """Test a call with profile=True writes a dump and returns its path"""
+        with self._settings():
+            result = self.tools.get_page_detail(self.page.pk, language='en', profile=True)
+
+        self.assertEqual(result['title'], 'Landing')
+        path = result['profile_dump']
+        self.assertEqual(os.path.dirname(path), self.profile_dir)
+        self.assertIn('get_page_detail', os.path.basename(path))
+        self.assertEqual(sorted(os.listdir(path)), ['call.json', 'profile.pstats', 'profile.txt'])
+
+        stats = pstats.Stats(os.path.join(path, 'profile.pstats'))
+        self.assertTrue(any(function == 'get_page_detail' for _file, _line, function in stats.stats))
+        call = self._read_call(path)
+        self.assertEqual(call['tool'], 'get_page_detail')
+        self.assertEqual(call['arguments'], {'args': [self.page.pk], 'kwargs': {'language': 'en'}})
+        self.assertIsNone(call['error'])
+        self.assertGreater(call['wall_time'], 0)
+        self.assertEqual(call['db_queries'], len(call['queries']))
+        self.assertTrue(any('cms_page' in query['sql'] for query in call['queries']))
+        self.assertIn(self.page.pk, [param for query in call['queries'] for param in query['params'] or []])
+
+    def test_not_profiled_by_default(self):
+        """Test calls are not profiled without the argument or DEBUG_MODE"""
+        with self._settings():
+            result = self.tools.get_page_detail(self.page.pk, language='en')
+
+        self.assertNotIn('profile_dump', result)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_debug_mode(self):
+        """Test DEBUG_MODE profiles every call"""
+        with self._settings(DEBUG_MODE=True):
+            detail = self.tools.get_page_detail(self.page.pk, language='en')
+            languages = self.tools.get_languages()
+
+        self.assertNotEqual(detail['profile_dump'], languages['profile_dump'])
+        self.assertEqual(len(os.listdir(self.profile_dir)), 2)
+
+    def test_errors_are_recorded(self):
+        """Test the error a call returns is part of its dump"""
+        with self._settings():
+            result = self.tools.get_page_detail(999999, profile=True)
+
+        self.assertEqual(self._read_call(result['profile_dump'])['error'], result['error'])
+
+    def test_exceptions_are_dumped(self):
+        """Test a call that raises is dumped before the exception propagates"""
+        def fail(instance):
+            raise RuntimeError('boom')
+
+        with self._settings(), self.assertRaises(RuntimeError):
+            profile_call('failing', fail, self.tools)
+
+        [path] = os.listdir(self.profile_dir)
+        self.assertEqual(self._read_call(os.path.join(self.profile_dir, path))['error'], 'The call raised an exception')
+
+    def test_unwritable_directory(self):
+        """Test a dump that can't be written is logged and the call still answers"""
+        blocker = os.path.join(self.profile_dir, 'file')
+        open(blocker, 'w').close()
+
+        with self.settings(DJANGO_CMS_MCP={'PROFILE_DIR': blocker}):
+            with self.assertLogs('djangocms_mcp.profiling', 'ERROR'):
+                result = self.tools.get_languages(profile=True)
+
+        self.assertNotIn('profile_dump', result)
+        self.assertIn('languages', result)
+
+    def test_profile_dir_required(self):
+        """Test calls are not profiled until PROFILE_DIR is set"""
+        with self.settings(DJANGO_CMS_MCP={'CACHE_TIMEOUT': 0}):
+            with self.assertLogs('djangocms_mcp.profiling', 'WARNING'):
+                result = self.tools.get_languages(profile=True)
+
+        self.assertNotIn('profile_dump', result)
+        self.assertIn('languages', result)
+
+    def test_directories_are_private(self):
+        """Test the dump directories are only accessible to their owner"""
+        profile_dir = os.path.join(self.profile_dir, 'profiles')
+
+        with self.settings(DJANGO_CMS_MCP={'PROFILE_DIR': profile_dir}):
+            result = self.tools.get_languages(profile=True)
+
+        for path in (profile_dir, result['profile_dump']):
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o700)
+
+    def test_concurrent_calls(self):
+        """Test a call made while another is profiled runs without a profile"""
+        barrier = threading.Barrier(4)
+        results = []
+
+        def call(instance):
+            barrier.wait(timeout=10)
+            return {'success': True}
+
+        def run():
+            results.append(profile_call('concurrent', call, self.tools))
+
+        threads = [threading.Thread(target=run) for _ in range(barrier.parties)]
+        with self._settings():
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(results), barrier.parties)
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(sum('profile_dump' in result for result in results), 1)
+        self.assertEqual(len(os.listdir(self.profile_dir)), 1)
+
+    def test_other_profiler_active(self):
+        """Test a call runs without a profile while another profiler is active"""
+        with self._settings(), patch('cProfile.Profile.enable', side_effect=ValueError('Another profiler')):
+            result = self.tools.get_languages(profile=True)
+
+        self.assertNotIn('profile_dump', result)
+        self.assertIn('languages', result)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_tools_have_profile_parameter(self):
+        """Test the MCP tools take the profile argument"""
+        tools = {tool.name: tool for tool in DjangoCMSVersioningTools()._add_tools_to(ToolManager())}
+
+        for name in ('get_page_detail', 'get_languages', 'create_pages'):
+            parameter = tools[name].parameters['properties']['profile']
+            self.assertEqual(parameter['type'], 'boolean')
+            self.assertIs(parameter['default'], False)
+        self.assertNotIn('profile', tools['get_page_detail'].parameters.get('required', []))
@@ -0,0 +1,430 @@
+"""
+Test the full-text page search index
+"""
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from djangocms_mcp import mcp
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+from djangocms_mcp.models import MCPServerPlugin, PageSearchDocument, PluginSearchDocument
+from djangocms_mcp import search
+from djangocms_mcp.search import (
+    BaseSearchBackend,
+    get_plugin_text,
+    get_search_backend,
+    TrigramIndex,
+    get_snippet,
+    get_trigrams,
+    rebuild_search_index,
+)
+
+
+class SearchTestCase(TestCase):
+    """Base class creating two indexed pages"""
+
+    def setUp(self):
+        from cms.api import create_page
+
+        cache.clear()
+        self.tools = DjangoCMSVersioningTools()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pricing = create_page(
+                'Pricing', 'template_1.html', 'en', created_by=self.user, meta_description='Plans and costs',
+            )
+            self.about = create_page('About', 'template_1.html', 'en', created_by=self.user)
+
+    def _add_plugin(self, page, description):
+        from cms.models import PageContent, Placeholder
+
+        content = PageContent.admin_manager.get(page=page, language='en')
+        placeholder = Placeholder.objects.get_for_obj(content).get(slot='content')
+        with self.captureOnCommitCallbacks(execute=True):
+            return MCPServerPlugin.objects.create(
+                placeholder=placeholder,
+                plugin_type='MCPServerCMSPlugin',
+                language='en',
+                position=(placeholder.get_last_plugin_position('en') or 0) + 1,
+                title='Server',
+                description=description,
+            )
+
+
+    def _get_fts_plans(self, call):
+        """Return the query plans of the FTS5 queries ``call`` runs, one line per step"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Not running on SQLite')
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                if ' MATCH ' in query['sql']:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                    plans.append([detail for *_ids, detail in cursor.fetchall()])
+        return plans
+
+    def assertMatchesScannedOnce(self, plans):
+        """Assert the FTS5 table is searched without a rowid constraint
+
+        A constraint on the rowid is checked with an index lookup per
+        candidate document, so the time of the query would grow with the
+        number of documents of the site rather than with the matches.
+        """
+        self.assertTrue(plans)
+        for plan in plans:
+            [scan] = [step for step in plan if 'VIRTUAL TABLE INDEX' in step]
+            self.assertNotIn('=', scan.split(':', 1)[1], plan)
+
+
+class TestPageSearchIndex(SearchTestCase):
+    """Test search documents follow the pages and their plugins"""
+
+    def test_pages_are_indexed_when_created(self):
+        """Test a document is created for each page content"""
+        document = PageSearchDocument.objects.get(page=self.pricing, language='en')
+
+        self.assertEqual(document.title, 'Pricing')
+        self.assertEqual(document.slug, 'pricing')
+        self.assertEqual(document.meta_description, 'Plans and costs')
+
+    def test_plugin_text_is_indexed(self):
+        """Test plugin changes update the document of their page"""
+        plugin = self._add_plugin(self.about, '<p>Our <b>history</b> &amp; team</p>')
+
+        document = PageSearchDocument.objects.get(page=self.about, language='en')
+        self.assertEqual(document.text, 'Server Our history & team')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plugin.delete()
+        self.assertEqual(PageSearchDocument.objects.get(page=self.about, language='en').text, '')
+
+    def test_plugin_save_finds_its_page_in_one_query(self):
+        """Test the page of a saved plugin is looked up with one query"""
+        plugin = self._add_plugin(self.about, 'Team')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(search._get_page_and_language(plugin), (self.about.pk, 'en'))
+
+    def test_plugin_save_without_indexed_fields(self):
+        """Test saving only fields the documents don't hold schedules no update"""
+        plugin = self._add_plugin(self.about, 'Team')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            plugin.save(update_fields=['changed_date'])
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            plugin.save(update_fields=['description'])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_failed_update_is_logged(self):
+        """Test a page whose document can't be updated doesn't stop the others"""
+        update = search.update_page_document
+
+        def update_page_document(page_id, language):
+            if page_id == self.about.pk:
+                raise ValueError('broken')
+            update(page_id, language)
+
+        from cms.models import PageContent
+
+        PageSearchDocument.objects.filter(page=self.pricing).delete()
+        with patch('djangocms_mcp.search.update_page_document', update_page_document):
+            with self.assertLogs('djangocms_mcp.search', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    for content in PageContent.admin_manager.filter(language='en'):
+                        content.save()
+
+        self.assertTrue(PageSearchDocument.objects.filter(page=self.pricing).exists())
+
+    def test_deleted_page_is_removed(self):
+        """Test deleting a page removes its documents"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.about.delete()
+
+        self.assertFalse(PageSearchDocument.objects.filter(page_id=self.about.pk).exists())
+
+    def test_get_plugin_text(self):
+        """Test the text fields of plugins are joined without markup"""
+        plugin = MCPServerPlugin(title='Title', description='<h1>Big</h1>\n\n<p>text&nbsp;here</p>')
+
+        self.assertEqual(get_plugin_text(plugin), 'Title Big text here')
+
+    def test_search_pages_matches_plugin_text_and_meta_description(self):
+        """Test pages are found by the text of their plugins and meta description"""
+        self._add_plugin(self.about, 'Meet the founders')
+
+        result = self.tools.search_pages('founders', language='en')
+        self.assertEqual([item['id'] for item in result['results']], [self.about.pk])
+
+        result = self.tools.search_pages('costs', language='en')
+        self.assertEqual([item['id'] for item in result['results']], [self.pricing.pk])
+
+    def test_search_pages_ranks_titles_first(self):
+        """Test a title match ranks above a match in the plugin text"""
+        self._add_plugin(self.about, 'See our pricing page')
+
+        result = self.tools.search_pages('pricing', language='en')
+
+        self.assertEqual([item['id'] for item in result['results']], [self.pricing.pk, self.about.pk])
+        self.assertGreater(result['results'][0]['rank'], result['results'][1]['rank'])
+
+    def test_search_pages_limit_and_offset(self):
+        """Test results are paginated and the total is reported"""
+        from cms.api import create_page
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                create_page(f'Guide {i}', 'template_1.html', 'en', created_by=self.user)
+
+        first = self.tools.search_pages('guide', language='en', limit=2)
+        second = self.tools.search_pages('guide', language='en', limit=2, offset=2)
+
+        self.assertEqual(first['total'], 5)
+        self.assertEqual(first['count'], 2)
+        self.assertEqual(second['count'], 2)
+        self.assertFalse({item['id'] for item in first['results']} & {item['id'] for item in second['results']})
+
+    def test_search_pages_prefix_and_operators(self):
+        """Test words match as prefixes and search syntax is ignored"""
+        result = self.tools.search_pages('pric"* -', language='en')
+
+        self.assertEqual([item['id'] for item in result['results']], [self.pricing.pk])
+        self.assertEqual(self.tools.search_pages('" -', language='en')['results'], [])
+
+    def test_search_pages_state_filter(self):
+        """Test only pages with a version in the state are searched"""
+        if not mcp.VERSIONING_ENABLED:
+            self.skipTest('djangocms-versioning is not installed')
+        from djangocms_versioning.models import Version
+
+        Version.objects.get(cms_pagecontent__page=self.pricing).publish(self.user)
+
+        result = self.tools.search_pages('pricing', language='en', state=mcp.PUBLISHED)
+        self.assertEqual(result['total'], 1)
+        self.assertEqual(self.tools.search_pages('about', language='en', state=mcp.PUBLISHED)['total'], 0)
+
+    def test_basic_backend(self):
+        """Test the fallback backend for databases without full-text support"""
+        documents = PageSearchDocument.objects.filter(language='en')
+
+        matches, total = BaseSearchBackend(connection, PageSearchDocument).search(
+            documents, 'plans cost', limit=10, snippet_field='meta_description',
+        )
+
+        self.assertEqual(total, 1)
+        document, _rank, snippet = matches[0]
+        self.assertEqual(document.page_id, self.pricing.pk)
+        self.assertEqual(snippet, '<mark>Plans</mark> and <mark>costs</mark>')
+
+    def test_search_vector_column(self):
+        """Test the search vector is a tsvector on PostgreSQL only, so that other databases can migrate"""
+        field = PageSearchDocument._meta.get_field('search_vector')
+        data_types = {'TextField': 'longtext', 'SearchVectorField': 'tsvector'}
+
+        mysql = Mock(vendor='mysql', data_types=data_types)
+        postgresql = Mock(vendor='postgresql', data_types=data_types)
+
+        self.assertEqual(field.db_type(mysql), 'longtext')
+        self.assertEqual(field.db_type(postgresql), 'tsvector')
+
+    def test_sqlite_backend_is_used(self):
+        """Test the FTS5 backend is picked on SQLite"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Not running on SQLite')
+
+        self.assertEqual(type(get_search_backend()).__name__, 'SQLiteSearchBackend')
+
+    def test_search_pages_does_not_look_up_candidates(self):
+        """Test the page search runs one full-text query, not one per document of the site"""
+        plans = self._get_fts_plans(lambda: self.tools.search_pages('pricing', language='en'))
+
+        self.assertEqual(len(plans), 2)
+        self.assertMatchesScannedOnce(plans)
+
+    def test_rebuild_search_index(self):
+        """Test the index can be rebuilt from scratch"""
+        PageSearchDocument.objects.all().delete()
+
+        self.assertEqual(rebuild_search_index(), 2)
+        self.assertEqual(self.tools.search_pages('about', language='en')['count'], 1)
+
+        call_command('rebuild_mcp_search_index', stdout=StringIO())
+        self.assertEqual(PageSearchDocument.objects.count(), 2)
+
+
+class TestContentSearch(SearchTestCase):
+    """Test searching the text of plugins"""
+
+    def test_search_content(self):
+        """Test matching plugins are returned with their page, slot and a snippet"""
+        plugin = self._add_plugin(self.about, '<p>We started in a garage in 1999.</p>')
+
+        result = self.tools.search_content('garage', language='en')
+
+        self.assertEqual(result['results'], [{
+            'page_id': self.about.pk,
+            'page_title': 'About',
+            'slot': 'content',
+            'plugin_id': plugin.pk,
+            'plugin_type': 'MCPServerCMSPlugin',
+            'snippet': 'Server We started in a <mark>garage</mark> in 1999.',
+            'rank': result['results'][0]['rank'],
+        }])
+
+    def test_search_content_ranks_results(self):
+        """Test plugins with more matches rank first"""
+        once = self._add_plugin(self.about, 'A word about servers')
+        twice = self._add_plugin(self.pricing, 'Servers, servers and more servers for everyone in the world')
+
+        result = self.tools.search_content('servers', language='en')
+
+        self.assertEqual([item['plugin_id'] for item in result['results']], [twice.pk, once.pk])
+
+    @override_settings(DJANGO_CMS_MCP={'MAX_SEARCH_RESULTS': 2})
+    def test_search_content_limit_is_capped(self):
+        """Test no more than MAX_SEARCH_RESULTS results are returned"""
+        for i in range(3):
+            self._add_plugin(self.about, f'Release notes {i}')
+
+        result = self.tools.search_content('release', language='en', limit=10)
+
+        self.assertEqual(result['count'], 2)
+        self.assertEqual(self.tools.search_content('release', language='en', limit=-1)['count'], 1)
+
+    @override_settings(DJANGO_CMS_MCP={'MAX_SEARCH_RESULTS': 2})
+    def test_search_pages_limit_is_capped(self):
+        """Test search_pages returns between 1 and MAX_SEARCH_RESULTS results from a non-negative offset"""
+        from cms.api import create_page
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                create_page(f'Guide {i}', 'template_1.html', 'en', created_by=self.user)
+
+        self.assertEqual(self.tools.search_pages('guide', language='en', limit=10)['count'], 2)
+        self.assertEqual(self.tools.search_pages('guide', language='en', limit=-1)['count'], 1)
+        result = self.tools.search_pages('guide', language='en', limit=2, offset=-1)
+        self.assertEqual((result['count'], result['offset']), (2, 0))
+        fuzzy = self.tools.search_pages('guide', language='en', fuzzy=True, limit=-1, offset=-2)
+        self.assertEqual(fuzzy['count'], 1)
+
+    def test_search_content_does_not_look_up_candidates(self):
+        """Test the plugin search runs one full-text query, not one per plugin of the site"""
+        for i in range(3):
+            self._add_plugin(self.about, f'Release notes {i}')
+
+        plans = self._get_fts_plans(lambda: self.tools.search_content('release', language='en'))
+
+        self.assertEqual(len(plans), 1)
+        self.assertMatchesScannedOnce(plans)
+
+    def test_plugin_documents_follow_plugins(self):
+        """Test deleting a plugin removes its document"""
+        plugin = self._add_plugin(self.about, 'Temporary')
+        self.assertTrue(PluginSearchDocument.objects.filter(plugin_id=plugin.pk).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plugin.delete()
+
+        self.assertFalse(PluginSearchDocument.objects.filter(plugin_id=plugin.pk).exists())
+        self.assertEqual(self.tools.search_content('temporary', language='en')['results'], [])
+
+    def test_get_snippet(self):
+        """Test snippets are cut around the first match"""
+        text = ' '.join(f'word{i}' for i in range(40)) + ' needle ' + ' '.join(f'word{i}' for i in range(40))
+
+        snippet = get_snippet(text, ['needle'])
+
+        self.assertTrue(snippet.startswith('…word32 '))
+        self.assertIn('<mark>needle</mark>', snippet)
+        self.assertTrue(snippet.endswith('…'))
+
+
+class TestFuzzySearch(SearchTestCase):
+    """Test fuzzy title search"""
+
+    def test_misspelled_title_is_found(self):
+        """Test titles are matched by trigram similarity"""
+        result = self.tools.search_pages('prcing', language='en', fuzzy=True)
+
+        self.assertEqual([item['id'] for item in result['results']], [self.pricing.pk])
+        self.assertEqual(result['results'][0]['title'], 'Pricing')
+        self.assertGreater(result['results'][0]['rank'], 0.3)
+        self.assertIsNone(result['total'])
+
+    def test_fuzzy_limit_and_offset(self):
+        """Test the most similar titles are returned first"""
+        from cms.api import create_page
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_page('Pricing plans', 'template_1.html', 'en', created_by=self.user)
+            create_page('Pricing plans for teams', 'template_1.html', 'en', created_by=self.user)
+
+        first = self.tools.search_pages('pricing', language='en', fuzzy=True, limit=1)
+        rest = self.tools.search_pages('pricing', language='en', fuzzy=True, limit=5, offset=1)
+
+        self.assertEqual([item['id'] for item in first['results']], [self.pricing.pk])
+        self.assertEqual([item['title'] for item in rest['results']], ['Pricing plans', 'Pricing plans for teams'])
+
+    def test_index_follows_changes(self):
+        """Test the in-process index is rebuilt when pages change"""
+        from cms.api import create_page
+
+        self.assertEqual(self.tools.search_pages('contact', language='en', fuzzy=True)['results'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            contact = create_page('Contact', 'template_1.html', 'en', created_by=self.user)
+
+        result = self.tools.search_pages('contakt', language='en', fuzzy=True)
+        self.assertEqual([item['id'] for item in result['results']], [contact.pk])
+
+    def test_index_follows_changes_of_other_processes(self):
+        """Test the index is rebuilt for changes that didn't touch this process's cache"""
+        self.tools.search_pages('pricing', language='en', fuzzy=True)
+        document = PageSearchDocument.objects.get(page=self.about, language='en')
+        document.title = 'Contact'
+        document.save()
+
+        result = self.tools.search_pages('contakt', language='en', fuzzy=True)
+        self.assertEqual([item['id'] for item in result['results']], [self.about.pk])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_dummy_cache(self):
+        """Test fuzzy search works and follows changes with a cache that stores nothing"""
+        from cms.api import create_page
+
+        result = self.tools.search_pages('prcing', language='en', fuzzy=True)
+        self.assertEqual([item['id'] for item in result['results']], [self.pricing.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            contact = create_page('Contact', 'template_1.html', 'en', created_by=self.user)
+
+        result = self.tools.search_pages('contakt', language='en', fuzzy=True)
+        self.assertEqual([item['id'] for item in result['results']], [contact.pk])
+
+    def test_get_trigrams(self):
+        """Test words are padded like pg_trgm does"""
+        self.assertEqual(get_trigrams('Ab c'), {'  a', ' ab', 'ab ', '  c', ' c '})
+
+    def test_trigram_index_matches_exhaustive_ranking(self):
+        """Test stopping early returns the same results as scoring every title"""
+        titles = [(i, f'{word} {i}') for i, word in enumerate(
+            ['pricing', 'prices', 'page', 'privacy', 'products', 'pricing page', 'print'] * 20
+        )]
+        index = TrigramIndex(titles)
+
+        query = 'pricing page'
+        query_trigrams = get_trigrams(query)
+        exhaustive = sorted(
+            ((key, len(query_trigrams & get_trigrams(title)) / len(query_trigrams | get_trigrams(title)))
+             for key, title in titles),
+            key=lambda item: (-item[1], item[0]),
+        )[:5]
+
+        self.assertEqual(index.search(query, limit=5), exhaustive)
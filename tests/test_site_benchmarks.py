@@ -0,0 +1,279 @@
+"""
+Benchmarks of every MCP tool on synthetic sites of increasing size
+
+The sites are built by ``tests.sitegen`` and their shape is set with
+environment variables:
+
+- ``DJANGO_CMS_MCP_BENCHMARK_SIZES``: comma separated numbers of pages,
+  ``1000`` by default; the full run is ``1000,10000,50000``
+- ``DJANGO_CMS_MCP_BENCHMARK_DEPTH``: levels of the page tree, ``3``
+- ``DJANGO_CMS_MCP_BENCHMARK_LANGUAGES``: languages of every page, ``en,de``
+- ``DJANGO_CMS_MCP_BENCHMARK_VERSIONS``: versions per page and language, ``3``
+- ``DJANGO_CMS_MCP_BENCHMARK_PLUGINS``: plugins per placeholder, ``2``
+- ``DJANGO_CMS_MCP_BENCHMARK_REPEAT``: timed calls per tool, ``5``
+
+The benchmarks only run with ``DJANGO_CMS_MCP_BENCHMARKS`` set. The
+results are printed, and written as JSON to ``DJANGO_CMS_MCP_BENCHMARK_OUTPUT``
+when it is set. When ``DJANGO_CMS_MCP_BENCHMARK_BASELINE`` names the results
+of an earlier run, the change of every timing is printed.
+"""
+import json
+import os
+import platform
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+import cms
+import django
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from djangocms_mcp import mcp
+from djangocms_mcp.indexes import VERSION_STATE_INDEX, get_version_model, has_index
+from djangocms_mcp.mcp import DjangoCMSVersioningTools
+from djangocms_mcp.metrics import QueryTimer
+
+from .sitegen import build_site, get_page_specs
+from .test_benchmarks import requires_benchmarks
+
+
+# Tools that must succeed on every site
+READ_TOOLS = (
+    'get_page_tree', 'get_page_tree_page', 'get_page_tree_subtree', 'get_page_detail',
+    'get_page_detail_languages', 'get_pages_detail', 'search_pages', 'search_pages_fuzzy', 'search_content',
+)
+WRITE_TOOLS = ('create_page', 'create_pages', 'add_plugins')
+VERSION_TOOLS = ('get_page_versions', 'publish_version', 'publish_versions', 'create_version', 'archive_version')
+
+
+def _get_env(name, default):
+    return os.environ.get(f'DJANGO_CMS_MCP_BENCHMARK_{name}', default)
+
+
+def get_benchmark_config():
+    """Return the shape of the benchmark sites from the environment"""
+    return {
+        'sizes': [int(size) for size in _get_env('SIZES', '1000').split(',')],
+        'depth': int(_get_env('DEPTH', '3')),
+        'languages': _get_env('LANGUAGES', 'en,de').split(','),
+        'versions_per_page': int(_get_env('VERSIONS', '3')),
+        'plugins_per_placeholder': int(_get_env('PLUGINS', '2')),
+        'repeat': int(_get_env('REPEAT', '5')),
+    }
+
+
+def compare_results(baseline, results):
+    """Return a line per tool and size giving the change of its median time since ``baseline``"""
+    lines = []
+    for size, run in results['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size, {}).get('tools', {})
+        for name, timings in run['tools'].items():
+            if name not in previous:
+                continue
+            before, after = previous[name]['median'], timings['median']
+            change = (after - before) / before * 100 if before else 0
+            lines.append(
+                f'{size:>6} {name:<32} {before * 1000:9.2f}ms -> {after * 1000:9.2f}ms ({change:+.0f}%), '
+                f'{previous[name]["queries"]} -> {timings["queries"]} queries'
+            )
+    return lines
+
+
+def _time_call(call, repeat):
+    """Time ``repeat`` calls, each rolled back so that writes start from the same site"""
+    durations = []
+    for _ in range(repeat):
+        timer = QueryTimer()
+        savepoint = transaction.savepoint()
+        try:
+            with connection.execute_wrapper(timer):
+                start = time.perf_counter()
+                result = call()
+                durations.append(time.perf_counter() - start)
+        finally:
+            transaction.savepoint_rollback(savepoint)
+    return {
+        'min': min(durations),
+        'median': statistics.median(durations),
+        'max': max(durations),
+        'queries': timer.queries,
+        'db_time': timer.time,
+        'error': result.get('error') if isinstance(result, dict) else None,
+    }
+
+
+def _prepare_database():
+    """Make the test database match a live one before timing
+
+    The index of the version table is created here in case a test dropped
+    it, and the planner gets statistics: without them SQLite scans the
+    version table for each page of the page tree.
+    """
+    with connection.cursor() as cursor:
+        Version = get_version_model(connection)
+        if Version is not None and not has_index(connection, Version, VERSION_STATE_INDEX):
+            cursor.execute(str(VERSION_STATE_INDEX.create_sql(Version, connection.schema_editor())))
+        cursor.execute('ANALYZE')
+
+
+class TestSiteGenerator(SimpleTestCase):
+    """Test the page specs of the synthetic sites"""
+
+    def _count(self, specs, depth=1):
+        return sum(1 + self._count(spec['children'], depth + 1) for spec in specs)
+
+    def _depth(self, specs):
+        return max((1 + self._depth(spec['children']) for spec in specs), default=0)
+
+    def test_page_specs(self):
+        """Test the specs have the requested number of pages and levels"""
+        for pages, depth in ((1, 3), (10, 1), (1000, 3), (1234, 4)):
+            specs = get_page_specs(pages, depth, random.Random(0))
+            self.assertEqual(self._count(specs), pages)
+            self.assertLessEqual(self._depth(specs), depth)
+
+
+@pytest.mark.slow
+@requires_benchmarks
+class TestSiteBenchmarks(TestCase):
+    """Time every tool on synthetic sites and write the results as JSON"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.config = get_benchmark_config()
+        self.tools = DjangoCMSVersioningTools()
+        self.tools.request = SimpleNamespace(user=self.user)
+
+    def _get_calls(self, site):
+        """Return the tool calls to time, by name, on a site from ``build_site``"""
+        from cms.models import PageContent, Placeholder
+
+        tools = self.tools
+        languages = self.config['languages']
+        language = languages[0]
+        page_ids = site['page_ids']
+        root_id = page_ids[0]
+        page_id = page_ids[len(page_ids) // 2]
+        content = PageContent.admin_manager.filter(page_id=page_id, language=language).latest('pk')
+        plugins = [{'plugin_type': 'MCPServerCMSPlugin', 'data': {'title': f'Server {n}'}} for n in range(20)]
+        drafts = []
+        if mcp.VERSIONING_ENABLED:
+            from djangocms_versioning.constants import DRAFT
+            from djangocms_versioning.models import Version
+
+            drafts = list(Version.objects.filter(
+                cms_pagecontent__page__in=page_ids[:100], cms_pagecontent__language=language, state=DRAFT,
+            ).values_list('pk', flat=True)[:20])
+            # Plugins are only added to drafts
+            content = Version.objects.get(pk=drafts[0]).content
+        placeholder_id = Placeholder.objects.get_for_obj(content).values_list('pk', flat=True).first()
+
+        calls = {
+            'get_page_tree': lambda: tools.get_page_tree(language=language),
+            'get_page_tree_page': lambda: tools.get_page_tree(language=language, limit=100),
+            'get_page_tree_subtree': lambda: tools.get_page_tree(language=language, root_page_id=root_id, max_depth=2),
+            'get_page_detail': lambda: tools.get_page_detail(page_id, language=language),
+            'get_page_detail_languages': lambda: tools.get_page_detail(page_id, languages=languages),
+            'get_pages_detail': lambda: tools.get_pages_detail(page_ids[:50], language=language),
+            'search_pages': lambda: tools.search_pages('river', language=language),
+            'search_pages_fuzzy': lambda: tools.search_pages('rivr', language=language, fuzzy=True),
+            'search_content': lambda: tools.search_content('glacier', language=language),
+            'list_templates': tools.list_templates,
+            'list_plugin_types': tools.list_plugin_types,
+            'get_languages': tools.get_languages,
+            'get_version_states': tools.get_version_states,
+            'get_server_metrics': tools.get_server_metrics,
+            'create_page': lambda: tools.create_page('Benchmark', 'template_1.html', language=language),
+            'create_pages': lambda: tools.create_pages([
+                {'title': f'Section {i}', 'children': [{'title': f'Page {i}.{j}'} for j in range(10)]}
+                for i in range(10)
+            ], language=language, parent_id=root_id),
+            'add_plugins': lambda: tools.add_plugins(placeholder_id, plugins, language=language),
+        }
+        if mcp.VERSIONING_ENABLED:
+            # Each call is rolled back, so every one starts from the same drafts
+            calls.update({
+                'get_page_versions': lambda: tools.get_page_versions(page_id),
+                'publish_version': lambda: tools.publish_version(drafts[0], language=language),
+                'publish_versions': lambda: tools.publish_versions(drafts, language=language),
+                'create_version': lambda: tools.create_version(page_id),
+                'archive_version': lambda: tools.archive_version(drafts[0]),
+            })
+        return calls
+
+    def _run_size(self, pages):
+        config = self.config
+        savepoint = transaction.savepoint()
+        try:
+            start = time.perf_counter()
+            # The search index is updated on commit
+            with self.captureOnCommitCallbacks(execute=True):
+                site = build_site(
+                    self.user,
+                    pages,
+                    depth=config['depth'],
+                    languages=config['languages'],
+                    versions_per_page=config['versions_per_page'],
+                    plugins_per_placeholder=config['plugins_per_placeholder'],
+                )
+            build_time = time.perf_counter() - start
+            _prepare_database()
+            tools = {name: _time_call(call, config['repeat']) for name, call in self._get_calls(site).items()}
+        finally:
+            transaction.savepoint_rollback(savepoint)
+        return {
+            'build_seconds': build_time,
+            'site': {key: value for key, value in site.items() if key != 'page_ids'},
+            'tools': tools,
+        }
+
+    def test_tools_on_large_sites(self):
+        """Test timing every tool at each site size"""
+        config = self.config
+        languages = [(code, code) for code in config['languages']]
+        # Uncached: the benchmarks measure the queries, not the cache
+        with self.settings(LANGUAGES=languages, DJANGO_CMS_MCP={'CACHE_TIMEOUT': 0}):
+            sizes = {str(pages): self._run_size(pages) for pages in config['sizes']}
+
+        results = {
+            'created': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'django_cms': cms.__version__,
+                'versioning': mcp.VERSIONING_ENABLED,
+                'database': connection.vendor,
+            },
+            'config': config,
+            'sizes': sizes,
+        }
+        output = _get_env('OUTPUT', None)
+        if output:
+            with open(output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f'\nResults written to {output}')
+
+        for size, run in sizes.items():
+            print(f'{size} pages, built in {run["build_seconds"]:.1f}s: {run["site"]}')
+            for name, timings in run['tools'].items():
+                print(
+                    f'  {name:<32} {timings["median"] * 1000:9.2f}ms {timings["queries"]:5} queries'
+                    + (f' (error: {timings["error"]})' if timings['error'] else '')
+                )
+        baseline = _get_env('BASELINE', None)
+        if baseline:
+            with open(baseline) as f:
+                print('\n'.join(['Compared with ' + baseline] + compare_results(json.load(f), results)))
+
+        for pages, run in zip(config['sizes'], sizes.values()):
+            self.assertEqual(run['site']['pages'], pages)
+            for name in READ_TOOLS + WRITE_TOOLS + (VERSION_TOOLS if mcp.VERSIONING_ENABLED else ()):
+                self.assertIsNone(run['tools'][name]['error'], name)